@@ -0,0 +1,78 @@
+"""
+Benchmark: detección de movimiento por resolución de análisis y zonas de interés
+Usa grabaciones (un video o la carpeta capturas_fotogramas/) y reporta FPS,
+uso de CPU y detecciones para cada configuración.
+
+Uso:
+    python benchmark_deteccion_movimiento.py [video_o_carpeta] [frames]
+"""
+
+import sys
+import os
+import time
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.detector_movimiento_camara import DetectorMovimientoCamara
+from controllers.frame_source import abrir_fuente
+
+
+CONFIGURACIONES = [
+    ("Completa 1280x720", {"resolucion": None}),
+    ("640x360", {"resolucion": (640, 360)}),
+    ("320x180", {"resolucion": (320, 180)}),
+    ("320x180 + ROI mitad inferior", {"resolucion": (320, 180), "rois": [(0.0, 0.5, 1.0, 0.5)]}),
+]
+
+
+def cargar_grabacion(origen):
+    """Carga a memoria los frames de un video o de una carpeta de JPEG a 1280x720"""
+    fuente = abrir_fuente(origen, tiempo_real=False)
+    frames = []
+    while True:
+        ret, img = fuente.read()
+        if not ret:
+            break
+        frames.append(img)
+    fuente.release()
+    return frames
+
+
+def medir(frames, total, opciones):
+    """Ejecuta la detección sobre `total` frames y retorna (fps, cpu %, detecciones)"""
+    detector = DetectorMovimientoCamara()
+    detector.configurar_analisis(**opciones)
+
+    detecciones = 0
+    inicio_reloj = time.perf_counter()
+    inicio_cpu = time.process_time()
+    for i in range(total):
+        if detector._detectar_movimiento(frames[i % len(frames)]):
+            detecciones += 1
+    reloj = time.perf_counter() - inicio_reloj
+    cpu = time.process_time() - inicio_cpu
+
+    return total / reloj, 100 * cpu / reloj, detecciones
+
+
+def benchmark(origen="capturas_fotogramas", total=300):
+    print("=" * 80)
+    print("BENCHMARK: Detección de movimiento")
+    print("=" * 80)
+
+    frames = cargar_grabacion(origen)
+    if len(frames) < 2:
+        print(f"\n❌ Se necesitan al menos 2 frames en {origen}")
+        return
+
+    print(f"\n🎞️ {len(frames)} frames de {origen}, {total} iteraciones por configuración\n")
+    print(f"   {'Configuración':<32} {'FPS':>10} {'CPU %':>8} {'Detecciones':>12}")
+    for nombre, opciones in CONFIGURACIONES:
+        fps, cpu, detecciones = medir(frames, total, opciones)
+        print(f"   {nombre:<32} {fps:>10.1f} {cpu:>8.0f} {detecciones:>12}")
+
+
+if __name__ == "__main__":
+    origen = sys.argv[1] if len(sys.argv) > 1 else "capturas_fotogramas"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    benchmark(origen, total)
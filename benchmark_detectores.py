@@ -0,0 +1,120 @@
+"""
+Benchmark: throughput de los detectores de cámara sin hardware
+Ejecuta el loop real de DetectorMovimientoCamara y DetectorPlacas sobre una
+fuente reproducida (video, carpeta de JPEG o secuencia sintética) en modo
+tiempo real y en modo tan rápido como sea posible, y reporta frames/seg y
+detecciones de cada uno.
+
+Uso:
+    python benchmark_detectores.py [sintetico|video|carpeta] [frames]
+"""
+
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.frame_source import abrir_fuente
+from controllers.detector_movimiento_camara import DetectorMovimientoCamara
+from controllers.detector_placas import DetectorPlacas
+
+
+MODOS = [
+    ("Tiempo real", True),
+    ("Máxima velocidad", False),
+]
+
+
+def crear_fuente(origen, total, tiempo_real):
+    """Crea la fuente; la sintética genera `total` frames, las demás se reproducen completas"""
+    if origen == "sintetico":
+        return abrir_fuente(origen, total_frames=total, tiempo_real=tiempo_real)
+    return abrir_fuente(origen, tiempo_real=tiempo_real)
+
+
+def ejecutar(detector, fuente, limite_segundos=120, antes_de_detener=None):
+    """Corre el loop del detector hasta agotar la fuente; retorna (frames, segundos)"""
+    detector.cooldown_segundos = 0  # Contar cada detección, no solo una cada 5 s
+    detector.pausa_loop = 0  # El ritmo lo marca la fuente
+    detector.iniciar_camara(fuente)
+
+    inicio = time.perf_counter()
+    detector.iniciar_deteccion()
+    while not fuente.agotada and time.perf_counter() - inicio < limite_segundos:
+        time.sleep(0.01)
+    segundos = time.perf_counter() - inicio
+    if antes_de_detener:
+        antes_de_detener()
+    detector.detener_deteccion()
+    detector.detener_camara()
+
+    return fuente.frames_entregados, segundos
+
+
+def medir_movimiento(origen, total, tiempo_real, carpeta):
+    detector = DetectorMovimientoCamara(
+        carpeta_capturas=carpeta / "fotogramas",
+        carpeta_historial=carpeta / "historial"
+    )
+    fuente = crear_fuente(origen, total, tiempo_real)
+    frames, segundos = ejecutar(detector, fuente)
+    stats = detector.obtener_estadisticas()
+    return frames, segundos, f"{stats['movimientos_detectados']} mov. / {stats['capturas_guardadas']} capturas"
+
+
+def medir_placas(origen, total, tiempo_real, carpeta):
+    detector = DetectorPlacas(
+        carpeta_capturas=carpeta / "placas",
+        archivo_placas=carpeta / "placas_autorizadas.json"
+    )
+    fuente = crear_fuente(origen, total, tiempo_real)
+    # Los análisis de placa corren en el pool OCR; esperar a que terminen
+    frames, segundos = ejecutar(
+        detector, fuente,
+        antes_de_detener=lambda: detector.pool_ocr.esperar(timeout=30)
+    )
+
+    eventos = 0
+    while detector.obtener_evento() is not None:
+        eventos += 1
+    estadisticas = detector.obtener_estadisticas()
+    ocr = estadisticas['ocr']
+    for etapa, datos in estadisticas['etapas_ocr'].items():
+        tiempo = datos['tiempo_ms']
+        print(f"      · {etapa:<16} {datos['aciertos']}/{datos['llamadas']} aciertos, p50 {tiempo['p50']} ms, p90 {tiempo['p90']} ms")
+    latencia = ocr['latencia_ms']
+    return frames, segundos, (
+        f"{detector.movimientos_detectados} mov. / {ocr['procesados']} análisis "
+        f"({ocr['descartados']} descartados, p50 {latencia['p50']} ms, p99 {latencia['p99']} ms) / {eventos} placas"
+    )
+
+
+def benchmark(origen="sintetico", total=300):
+    print("=" * 80)
+    print("BENCHMARK: Detectores de cámara con fuente reproducida")
+    print("=" * 80)
+
+    if origen != "sintetico" and not Path(origen).exists():
+        print(f"\n❌ No existe la fuente {origen}")
+        return
+
+    print(f"\n🎞️ Fuente: {origen}" + (f" ({total} frames)" if origen == "sintetico" else ""))
+    print(f"\n   {'Detector':<12} {'Modo':<18} {'Frames':>7} {'FPS':>9}   Detecciones")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp)
+        for nombre, medir in (("Movimiento", medir_movimiento), ("Placas", medir_placas)):
+            for modo, tiempo_real in MODOS:
+                frames, segundos, detecciones = medir(origen, total, tiempo_real, carpeta)
+                fps = frames / segundos if segundos else 0
+                print(f"   {nombre:<12} {modo:<18} {frames:>7} {fps:>9.1f}   {detecciones}")
+
+
+if __name__ == "__main__":
+    origen = sys.argv[1] if len(sys.argv) > 1 else "sintetico"
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    benchmark(origen, total)
@@ -0,0 +1,131 @@
+"""
+Benchmark: latencia y rendimiento del login con hash lento
+Compara el SHA-256 sin sal anterior con scrypt/PBKDF2, mide cuánto bloquea
+al thread de Tk cada forma de llamar al login y la latencia/rendimiento
+con intentos concurrentes a través del pool de verificación.
+
+Uso:
+    python benchmark_login.py [intentos] [usuarios]
+"""
+
+import sys
+import os
+import hashlib
+import tempfile
+import threading
+import time
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import password_hashing
+from models.password_hashing import VerificationPool, hash_password, verify_password
+from utils.estadisticas import percentiles_ms
+from models.user_manager import UserManager
+
+PASSWORD = "Clave123"
+
+
+def medir_hash_individual(repeticiones=20):
+    """Costo de una verificación con cada formato"""
+    print("\n1. Verificación individual")
+    print("-" * 80)
+    casos = [
+        ("SHA-256 sin sal (anterior)", hashlib.sha256(PASSWORD.encode()).hexdigest()),
+        ("Actual", hash_password(PASSWORD)),
+    ]
+    for nombre, guardado in casos:
+        muestras = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            ok, _ = verify_password(PASSWORD, guardado)
+            muestras.append(time.perf_counter() - inicio)
+        formato = guardado.split("$")[0] if "$" in guardado else "sha256"
+        print(f"   {nombre:<28} [{formato}] ok={ok}  {percentiles_ms(muestras)}")
+
+
+def crear_usuarios(user_manager, cantidad):
+    for i in range(cantidad):
+        user_manager.register(f"usuario{i}@bench.local", PASSWORD, f"bench_{i}")
+
+
+def medir_bloqueo_tk(user_manager, repeticiones=10):
+    """Tiempo que el llamador (thread de Tk) queda bloqueado por login"""
+    print("\n2. Bloqueo del thread que llama (Tk)")
+    print("-" * 80)
+    sincrono, asincrono = [], []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        user_manager.login("usuario0@bench.local", PASSWORD)
+        sincrono.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        future = user_manager.login_async("usuario0@bench.local", PASSWORD)
+        asincrono.append(time.perf_counter() - inicio)
+        future.result()
+    print(f"   login()        {percentiles_ms(sincrono)}")
+    print(f"   login_async()  {percentiles_ms(asincrono)}  (el hash corre en el pool)")
+
+
+def medir_concurrencia(user_manager, intentos, usuarios, trabajadores, max_pendientes):
+    """`intentos` logins lanzados a la vez contra un pool con `trabajadores` threads"""
+    pool = VerificationPool(workers=trabajadores, max_pending=max_pendientes)
+    password_hashing._pool = pool  # login_async usa el pool compartido
+
+    latencias = []
+    lock = threading.Lock()
+    inicio = time.perf_counter()
+    futures = []
+    for i in range(intentos):
+        enviado = time.perf_counter()
+        future = user_manager.login_async(f"usuario{i % usuarios}@bench.local", PASSWORD)
+
+        def registrar(f, enviado=enviado):
+            with lock:
+                latencias.append((time.perf_counter() - enviado, f.result()[0]))
+        future.add_done_callback(registrar)
+        futures.append(future)
+    for future in futures:
+        future.result()
+    total = time.perf_counter() - inicio
+    pool.shutdown()
+
+    aceptados = [lat for lat, ok in latencias if ok]
+    print(f"   {trabajadores} threads, máx {max_pendientes:>3} pendientes: "
+          f"{len(aceptados):>3}/{intentos} verificados, {pool.rejected:>3} rechazados por límite, "
+          f"{len(aceptados) / total:6.1f} logins/s, latencia {percentiles_ms(aceptados)}")
+
+
+def main():
+    intentos = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    usuarios = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print("=" * 80)
+    print("BENCHMARK DE LOGIN")
+    print("=" * 80)
+    algoritmo = (f"scrypt n={password_hashing.SCRYPT_N} r={password_hashing.SCRYPT_R} p={password_hashing.SCRYPT_P}"
+                 if password_hashing.HAS_SCRYPT else
+                 f"PBKDF2-SHA256 {password_hashing.PBKDF2_ITERATIONS} iteraciones")
+    print(f"KDF: {algoritmo} | CPUs: {os.cpu_count()} | intentos: {intentos} | usuarios: {usuarios}")
+
+    medir_hash_individual()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        user_manager = UserManager(carpeta)
+        crear_usuarios(user_manager, usuarios)
+
+        medir_bloqueo_tk(user_manager)
+
+        print("\n3. Intentos concurrentes")
+        print("-" * 80)
+        for trabajadores in (1, 2, 4):
+            medir_concurrencia(user_manager, intentos, usuarios, trabajadores, max_pendientes=intentos)
+        # Con el límite por defecto una ráfaga se recorta en vez de acumularse
+        medir_concurrencia(user_manager, intentos, usuarios, 2, max_pendientes=8)
+
+        user_manager.store.cerrar()
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: velocidad del parser del protocolo del hardware
+Mide parseos por segundo de utils.protocol y de EventService.
+"""
+
+import sys
+import os
+import time
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.protocol import (
+    parse_event_line,
+    parse_event_lines,
+    parse_device_line,
+    parse_device_lines,
+)
+from services.event_service import EventService
+
+
+MENSAJES_EVENT = [
+    "EVENT:PIR:DETECTADO",
+    "EVENT:HUMO:DETECTADO",
+    "EVENT:PUERTA:ABIERTA",
+    "EVENT:PUERTA:CERRADA",
+    "EVENT:LASER:INTERRUMPIDO",
+    "EVENT:LASER:OK",
+    "EVENT:CERRADURA:ABIERTA",
+    "EVENT:PANICO",
+    "HEARTBEAT:OK",
+    "OK:ACTIVADO:PIR",
+]
+
+MENSAJES_DISPOSITIVO = [
+    "PIR:MOTION:SALA_PRINCIPAL:INTENSIDAD=85",
+    "HUMO:SMOKE:COCINA:NIVEL=ALTO",
+    "PUERTA:OPEN:ENTRADA_PRINCIPAL:",
+    "PANICO:PANIC:DORMITORIO:URGENTE",
+    "TEMPERATURA:TEMPERATURE_HIGH:COCINA:VALOR=42",
+]
+
+
+def _medir(nombre, funcion, total):
+    """Ejecuta la función y reporta parseos por segundo"""
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"   {nombre:<40} {total / duracion:>14,.0f} parseos/s")
+
+
+def benchmark(repeticiones=20000):
+    print("=" * 80)
+    print("BENCHMARK: Parser del protocolo")
+    print("=" * 80)
+
+    lote_event = MENSAJES_EVENT * repeticiones
+    lote_dispositivo = MENSAJES_DISPOSITIVO * repeticiones
+    servicio = EventService()
+
+    print(f"\n📊 EVENT:TIPO:ESTADO ({len(lote_event):,} mensajes)")
+    _medir("parse_event_line (uno a uno)",
+           lambda: [parse_event_line(m) for m in lote_event], len(lote_event))
+    _medir("parse_event_lines (lote)",
+           lambda: parse_event_lines(lote_event), len(lote_event))
+    _medir("EventService.parse_event",
+           lambda: [servicio.parse_event(m) for m in lote_event], len(lote_event))
+    _medir("EventService.parse_events (lote)",
+           lambda: servicio.parse_events(lote_event), len(lote_event))
+
+    print(f"\n📊 DISPOSITIVO:EVENTO:ZONA:DATOS ({len(lote_dispositivo):,} mensajes)")
+    _medir("parse_device_line (uno a uno)",
+           lambda: [parse_device_line(m) for m in lote_dispositivo], len(lote_dispositivo))
+    _medir("parse_device_lines (lote)",
+           lambda: parse_device_lines(lote_dispositivo), len(lote_dispositivo))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,93 @@
+"""
+Benchmark: latencia de lectura de SerialCommunicator
+Usa un pseudo-terminal (pty) como sustituto del Pico, sin hardware.
+Solo funciona en Linux/macOS (os.openpty).
+"""
+
+import sys
+import os
+import time
+import threading
+import statistics
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.serial_comm import SerialCommunicator
+
+
+def _crear_pty():
+    """Crea un par pty y retorna (fd_maestro, fd_esclavo, ruta_esclavo)"""
+    import tty
+    maestro, esclavo = os.openpty()
+    tty.setraw(esclavo)
+    return maestro, esclavo, os.ttyname(esclavo)
+
+
+def medir_latencia(comm, maestro, muestras=200):
+    """Mide la latencia de evento individual (escritura → get_event)"""
+    latencias = []
+    for i in range(muestras):
+        inicio = time.perf_counter()
+        os.write(maestro, f"EVENT:PIR:DETECTADO:{i}\n".encode())
+        evento = comm.get_event(timeout=2)
+        fin = time.perf_counter()
+        if evento is None:
+            print(f"⚠️ Evento {i} perdido")
+            continue
+        latencias.append((fin - inicio) * 1000)
+        time.sleep(0.005)
+    return latencias
+
+
+def medir_rafaga(comm, maestro, lineas=1000):
+    """Mide cuánto tarda en llegar a la cola una ráfaga de líneas"""
+    rafaga = "".join(f"EVENT:LASER:INTERRUMPIDO:{i}\n" for i in range(lineas)).encode()
+    recibidos = 0
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=os.write, args=(maestro, rafaga))
+    hilo.start()
+    while recibidos < lineas:
+        if comm.get_event(timeout=2) is None:
+            break
+        recibidos += 1
+    hilo.join()
+    return recibidos, (time.perf_counter() - inicio) * 1000
+
+
+def benchmark():
+    print("=" * 80)
+    print("BENCHMARK: Latencia de lectura serial (pty)")
+    print("=" * 80)
+
+    if not hasattr(os, "openpty"):
+        print("\n❌ os.openpty no disponible en esta plataforma")
+        return
+
+    maestro, esclavo, ruta = _crear_pty()
+    comm = SerialCommunicator(puerto=ruta, baud=115200)
+    if not comm.start():
+        print("\n❌ No se pudo abrir el pty")
+        os.close(esclavo)
+        os.close(maestro)
+        return
+
+    try:
+        latencias = medir_latencia(comm, maestro)
+        if latencias:
+            latencias.sort()
+            print(f"\n📊 Eventos individuales ({len(latencias)} muestras)")
+            print(f"   p50: {statistics.median(latencias):.3f} ms")
+            print(f"   p95: {latencias[int(len(latencias) * 0.95) - 1]:.3f} ms")
+            print(f"   max: {latencias[-1]:.3f} ms")
+
+        recibidos, total_ms = medir_rafaga(comm, maestro)
+        print(f"\n📊 Ráfaga: {recibidos} líneas en {total_ms:.1f} ms")
+    finally:
+        comm.stop()
+        os.close(esclavo)
+        os.close(maestro)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,157 +1,223 @@
 import contextlib
-import requests
 import json
+import threading
 import time
 from models.user_manager import UserManager  # ← CORREGIDO: Importar desde models
+from controllers.telegram_outbox import TelegramOutbox, completed_future
+from controllers.alert_throttle import AlertThrottle
 
 
 class TelegramBot:
-    def __init__(self, bot_token):
+    def __init__(self, bot_token, api_url="https://api.telegram.org", user_manager=None,
+                 alert_window=30, alert_rate=1.0, alert_burst=3):
         self.bot_token = bot_token
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
-        self.user_manager = UserManager()
+        self.base_url = f"{api_url}/bot{bot_token}"
+        self.user_manager = user_manager or UserManager()
         self.chat_ids = self._load_chat_ids()
 
+        # Cola de envío en segundo plano con conexiones HTTP reutilizables
+        self.outbox = TelegramOutbox(self.base_url)
+
+        # Límite por chat y agrupación de alertas repetidas de sensores
+        self.alertas = AlertThrottle(
+            self.send_message_async,
+            window_seconds=alert_window,
+            rate=alert_rate,
+            burst=alert_burst
+        )
+
+        # Long-polling de getUpdates: último update_id procesado y manejadores
+        self.offset_file = self.user_manager.data_dir / "telegram_offset.json"
+        self.last_update_id = self._load_update_offset()
+        self.update_handlers = []
+        self.polling = False
+        self.poll_thread = None
+        self._updates_lock = threading.Lock()
+
     def _load_chat_ids(self):
         """Carga los IDs de chat guardados para cada usuario"""
-        chat_ids_file = self.user_manager.data_dir / "chat_ids.json"
-        if chat_ids_file.exists():
+        try:
+            return self.user_manager.get_chat_ids()
+        except Exception as e:
+            print(f"Error cargando chat_ids: {e}")
+            return {}
+
+    def _load_update_offset(self):
+        """Carga el último update_id procesado"""
+        if self.offset_file.exists():
             try:
-                with open(chat_ids_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.offset_file, 'r', encoding='utf-8') as f:
+                    return int(json.load(f).get('last_update_id', 0))
             except Exception:
-                return {}
-        return {}
+                return 0
+        return 0
+
+    def _save_update_offset(self):
+        """Guarda el último update_id procesado"""
+        with open(self.offset_file, 'w', encoding='utf-8') as f:
+            json.dump({'last_update_id': self.last_update_id}, f)
+
+    def add_update_handler(self, handler):
+        """
+        Registra un manejador para cada update nuevo recibido.
+
+        Args:
+            handler: function(update) - Recibe el dict del update de Telegram
+        """
+        self.update_handlers.append(handler)
+
+    def remove_update_handler(self, handler):
+        """Elimina un manejador registrado"""
+        with contextlib.suppress(ValueError):
+            self.update_handlers.remove(handler)
+
+    def _fetch_updates(self, timeout=0):
+        """Pide a Telegram solo los updates posteriores al último procesado"""
+        url = f"{self.base_url}/getUpdates"
+        params = {
+            'offset': self.last_update_id + 1,
+            'timeout': timeout,
+            'allowed_updates': json.dumps(["message"])
+        }
+        response = self.outbox.session.get(url, params=params, timeout=timeout + self.outbox.timeout)
+        return response.json()
 
-    def _save_chat_ids(self):
-        """Guarda los IDs de chat en un archivo JSON"""
-        chat_ids_file = self.user_manager.data_dir / "chat_ids.json"
-        with open(chat_ids_file, 'w', encoding='utf-8') as f:
-            json.dump(self.chat_ids, f, indent=4, ensure_ascii=False)
+    def _process_updates(self, updates):
+        """
+        Procesa updates nuevos: vincula chat_ids, avisa a los manejadores y
+        persiste el offset para no volver a procesarlos.
+        Retorna True si se vinculó algún usuario.
+        """
+        updated = False
+        for update in updates:
+            self.last_update_id = max(self.last_update_id, update.get('update_id', 0))
 
-    def get_updates(self):
-        """Obtiene las actualizaciones recientes del bot y actualiza los IDs de chat"""
-        url = f"{self.base_url}/getUpdates"
+            if 'message' in update:
+                chat_id = str(update['message']['chat']['id'])
+                user_name = update['message']['chat'].get('first_name', 'Usuario')
+                username = update['message']['chat'].get('username', '')
 
-        try:
-            response = requests.get(url)
-            data = response.json()
+                print(f"Chat ID: {chat_id} - Usuario: {user_name} (@{username})")
 
-            if data['ok'] and data['result']:
-                updated = False
-                for update in data['result']:
-                    if 'message' in update:
-                        chat_id = str(update['message']['chat']['id'])
-                        user_name = update['message']['chat'].get('first_name', 'Usuario')
-                        username = update['message']['chat'].get('username', '')
+                # Buscar usuario por nombre de Telegram y guardar chat_id
+                if self._find_and_save_user_chat_id(user_name, username, chat_id):
+                    updated = True
+
+            for handler in list(self.update_handlers):
+                try:
+                    handler(update)
+                except Exception as e:
+                    print(f"Error en manejador de updates: {e}")
 
-                        print(f"Chat ID: {chat_id} - Usuario: {user_name} (@{username})")
+        if updates:
+            self._save_update_offset()
+        return updated
 
-                        # Buscar usuario por nombre de Telegram y guardar chat_id
-                        user_found = self._find_and_save_user_chat_id(user_name, username, chat_id)
-                        if user_found:
-                            updated = True
+    def get_updates(self):
+        """Obtiene las actualizaciones nuevas del bot y actualiza los IDs de chat"""
+        # Con long-polling activo los mensajes ya se procesan al llegar
+        if self.polling:
+            return True
 
-                if updated:
-                    self._save_chat_ids()
+        try:
+            with self._updates_lock:
+                data = self._fetch_updates()
 
-                return True
-            else:
-                print("No hay mensajes recientes. Envía un mensaje al bot primero.")
-                return False
+                if data['ok'] and data['result']:
+                    self._process_updates(data['result'])
+                    return True
+                else:
+                    print("No hay mensajes recientes. Envía un mensaje al bot primero.")
+                    return False
 
         except Exception as e:
             print(f"Error obteniendo updates: {e}")
             return False
 
-    def _find_and_save_user_chat_id(self, first_name, username, chat_id):
-        """Busca usuario por nombre de Telegram y guarda su chat_id"""
-        # Buscar en todos los perfiles de usuario
-        users_data = {}
-        users_file = self.user_manager.data_dir / "users.json"
-
-        if users_file.exists():
-            with contextlib.suppress(Exception):
-                with open(users_file, 'r', encoding='utf-8') as f:
-                    users_data = json.load(f)
-        # Buscar en los directorios de usuarios
-        user_dirs = [d for d in self.user_manager.user_data_dir.iterdir() if d.is_dir()]
-
-        for user_dir in user_dirs:
-            profile_file = user_dir / "profile.json"
-            if profile_file.exists():
-                try:
-                    with open(profile_file, 'r', encoding='utf-8') as f:
-                        profile = json.load(f)
-
-                    telegram_field = profile.get('telegram', '').lower()
-                    user_email = profile.get('email', '')
-
-                    # Comparar con diferentes formatos del campo telegram
-                    search_terms = [
-                        first_name.lower(),
-                        username.lower() if username else '',
-                        f"@{username.lower()}" if username else ''
-                    ]
+    def start_polling(self, timeout=30):
+        """
+        Inicia un hilo que consume getUpdates con long-polling.
+        Cada mensaje nuevo se procesa una sola vez, en cuanto llega.
+        """
+        if self.polling:
+            return
+        self.polling = True
+        self.poll_thread = threading.Thread(
+            target=self._poll_loop,
+            args=(timeout,),
+            daemon=True
+        )
+        self.poll_thread.start()
+
+    def stop_polling(self):
+        """Detiene el hilo de long-polling"""
+        self.polling = False
+        if self.poll_thread:
+            # La petición en curso puede durar hasta `timeout`; el hilo es daemon
+            self.poll_thread.join(timeout=1)
+            self.poll_thread = None
+
+    def _poll_loop(self, timeout):
+        """Ciclo de long-polling (ejecuta en hilo)"""
+        while self.polling:
+            try:
+                data = self._fetch_updates(timeout=timeout)
+                if not self.polling:
+                    break
+                if data.get('ok') and data.get('result'):
+                    with self._updates_lock:
+                        self._process_updates(data['result'])
+            except Exception as e:
+                print(f"Error en long-polling de Telegram: {e}")
+                time.sleep(5)
 
-                    for term in search_terms:
-                        if term and term in telegram_field:
-                            # Guardar el chat_id para este usuario
-                            self.chat_ids[user_email] = chat_id
-                            print(f"✅ Chat ID {chat_id} asignado a usuario: {user_email}")
+    def _find_and_save_user_chat_id(self, first_name, username, chat_id):
+        """Busca usuario por nombre de Telegram (índice en memoria) y guarda su chat_id"""
+        # Primero el @usuario (único en Telegram), luego el nombre
+        user_email = self.user_manager.find_user_by_telegram(username, first_name)
 
-                            # Actualizar también el perfil del usuario
-                            self._update_user_profile_chat_id(user_email, chat_id)
-                            return True
+        if user_email:
+            # Guardar el chat_id para este usuario (una fila del almacén)
+            self.chat_ids[user_email] = chat_id
+            self.user_manager.save_chat_id(user_email, chat_id)
+            print(f"✅ Chat ID {chat_id} asignado a usuario: {user_email}")
 
-                except Exception as e:
-                    print(f"Error procesando perfil {user_dir}: {e}")
+            # Actualizar también el perfil del usuario
+            self._update_user_profile_chat_id(user_email, chat_id)
+            return True
 
         print(f"⚠️ Usuario de Telegram '{first_name}' (@{username}) no encontrado en la base de datos")
         return False
 
     def _update_user_profile_chat_id(self, email, chat_id):
         """Actualiza el perfil del usuario con el chat_id"""
-        user_dir = self.user_manager._get_user_dir(email)
-        profile_file = user_dir / "profile.json"
-
-        if profile_file.exists():
-            try:
-                with open(profile_file, 'r', encoding='utf-8') as f:
-                    profile = json.load(f)
-
-                profile['chat_id'] = chat_id
-                profile['telegram_linked'] = True
-
-                with open(profile_file, 'w', encoding='utf-8') as f:
-                    json.dump(profile, f, indent=4, ensure_ascii=False)
-
+        try:
+            if self.user_manager.update_user_profile(email, {'chat_id': chat_id, 'telegram_linked': True}):
                 print(f"✅ Perfil actualizado para {email} con chat_id: {chat_id}")
 
-            except Exception as e:
-                print(f"Error actualizando perfil: {e}")
+        except Exception as e:
+            print(f"Error actualizando perfil: {e}")
 
     def send_message(self, chat_id, text, parse_mode='HTML'):
-        """Envía un mensaje de texto"""
-        url = f"{self.base_url}/sendMessage"
-
+        """Envía un mensaje de texto (espera la respuesta de Telegram)"""
         payload = {
             'chat_id': chat_id,
             'text': text,
             'parse_mode': parse_mode
         }
+        return self.outbox.call("sendMessage", payload)
 
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-
-            result = response.json()
-            return result['ok'], result.get('result', {})
-
-        except requests.exceptions.RequestException as e:
-            return False, f"Error de conexión: {e}"
-        except Exception as e:
-            return False, f"Error: {e}"
+    def send_message_async(self, chat_id, text, parse_mode='HTML'):
+        """
+        Encola un mensaje de texto para enviarlo en segundo plano.
+        Retorna un Future que se resuelve con (success, result).
+        """
+        payload = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': parse_mode
+        }
+        return self.outbox.submit("sendMessage", payload)
 
     def send_message_to_user(self, email, text, parse_mode='HTML'):
         """Envía mensaje a un usuario específico por email"""
@@ -161,11 +227,33 @@ class TelegramBot:
         else:
             return False, f"No se encontró chat_id para el usuario: {email}"
 
+    def send_message_to_user_async(self, email, text, parse_mode='HTML'):
+        """Encola un mensaje para un usuario por email. Retorna un Future con (success, result)"""
+        chat_id = self.chat_ids.get(email)
+        if chat_id:
+            return self.send_message_async(chat_id, text, parse_mode)
+        return completed_future((False, f"No se encontró chat_id para el usuario: {email}"))
+
+    def send_alert_to_user_async(self, email, device, event_type, title, text, priority=3):
+        """
+        Encola una alerta de sensor para un usuario pasando por el límite por
+        chat y la agrupación de repeticiones (prioridad 1 = inmediata).
+        Retorna un Future con (success, result).
+        """
+        chat_id = self.chat_ids.get(email)
+        if not chat_id:
+            return completed_future((False, f"No se encontró chat_id para el usuario: {email}"))
+        return self.alertas.submit(chat_id, device, event_type, title, text, priority)
+
     def broadcast_to_all_users(self, text, parse_mode='HTML'):
         """Envía un mensaje a todos los usuarios registrados"""
+        futures = {
+            email: self.send_message_async(chat_id, text, parse_mode)
+            for email, chat_id in self.chat_ids.items()
+        }
         results = {}
-        for email, chat_id in self.chat_ids.items():
-            success, result = self.send_message(chat_id, text, parse_mode)
+        for email, future in futures.items():
+            success, result = future.result()
             results[email] = {
                 'success': success,
                 'result': result
@@ -175,9 +263,15 @@ class TelegramBot:
     def get_me(self):
         """Obtiene información del bot"""
         url = f"{self.base_url}/getMe"
-        response = requests.get(url)
+        response = self.outbox.session.get(url, timeout=self.outbox.timeout)
         return response.json()
 
+    def close(self):
+        """Detiene el long-polling, encola los resúmenes de alertas, espera los envíos y cierra las conexiones"""
+        self.stop_polling()
+        self.alertas.flush()
+        self.outbox.shutdown()
+
     def get_user_chat_id(self, email):
         """Obtiene el chat_id de un usuario por email"""
         return self.chat_ids.get(email)
@@ -192,17 +286,8 @@ class TelegramBot:
             return
 
         for email, chat_id in self.chat_ids.items():
-            user_dir = self.user_manager._get_user_dir(email)
-            profile_file = user_dir / "profile.json"
-
-            telegram_name = "Desconocido"
-            if profile_file.exists():
-                try:
-                    with open(profile_file, 'r', encoding='utf-8') as f:
-                        profile = json.load(f)
-                    telegram_name = profile.get('telegram', 'Desconocido')
-                except:
-                    pass
+            profile = self.user_manager.get_user_profile(email) or {}
+            telegram_name = profile.get('telegram', 'Desconocido')
 
             print(f"📧 {email}")
             print(f"   👤 Telegram: {telegram_name}")
@@ -0,0 +1,182 @@
+"""
+Limitador y agrupador de alertas de Telegram
+Evita inundar al usuario (y chocar con los límites por chat de Telegram)
+cuando un sensor dispara muchas veces seguidas.
+"""
+
+import threading
+import time
+
+from controllers.telegram_outbox import completed_future
+
+
+class TokenBucket:
+    """
+    Cubeta de fichas: permite ráfagas de hasta `capacity` mensajes y luego
+    `rate` mensajes por segundo.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.last = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def try_acquire(self):
+        """Consume una ficha si hay disponible. Retorna True si se pudo"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self):
+        """Segundos hasta que haya una ficha disponible"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class _Ventana:
+    """Eventos repetidos de un mismo (chat, dispositivo, tipo) pendientes de resumen"""
+
+    __slots__ = ("inicio", "pendientes", "enviadas", "title", "device", "timer")
+
+    def __init__(self, inicio, title, device):
+        self.inicio = inicio
+        self.pendientes = 0
+        self.enviadas = 0
+        self.title = title
+        self.device = device
+        self.timer = None
+
+
+class AlertThrottle:
+    """
+    Aplica un límite de envío por chat y agrupa alertas repetidas.
+
+    - La primera alerta de un (chat, dispositivo, tipo) sale de inmediato si
+      el límite del chat lo permite y abre una ventana de agrupación.
+    - Las repeticiones dentro de la ventana no se envían; al cerrarla se manda
+      un único resumen con el total, p. ej. "PIR: 14 detecciones en 30 s".
+    - Las alertas de prioridad 1 (pánico, humo) siempre salen al instante.
+    """
+
+    def __init__(self, send_fn, window_seconds=30, rate=1.0, burst=3, clock=time.monotonic):
+        """
+        Args:
+            send_fn: function(chat_key, text) -> Future - Envío real
+            window_seconds: Duración de la ventana de agrupación
+            rate: Mensajes por segundo permitidos por chat
+            burst: Ráfaga máxima por chat
+        """
+        self.send_fn = send_fn
+        self.window_seconds = window_seconds
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+
+        self._buckets = {}
+        self._ventanas = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, chat_key):
+        bucket = self._buckets.get(chat_key)
+        if bucket is None:
+            bucket = self._buckets[chat_key] = TokenBucket(self.rate, self.burst, self.clock)
+        return bucket
+
+    def submit(self, chat_key, device, event_type, title, text, priority=3):
+        """
+        Envía o agrupa una alerta.
+
+        Args:
+            chat_key: Identificador del chat destino (límite por chat)
+            device: str - Nombre del dispositivo (para el resumen)
+            event_type: str - Tipo de evento (agrupa junto con device)
+            title: str - Título usado en el resumen
+            text: str - Mensaje completo de la alerta individual
+            priority: int - 1=Crítico ... 4=Bajo
+
+        Returns:
+            Future con (success, result); las alertas agrupadas se resuelven
+            de inmediato con (True, "Alerta agrupada")
+        """
+        if priority == 1:
+            with self._lock:
+                # Consume ficha si hay, pero nunca retrasa una alerta crítica
+                self._bucket(chat_key).try_acquire()
+            return self.send_fn(chat_key, text)
+
+        key = (chat_key, device, event_type)
+        with self._lock:
+            ventana = self._ventanas.get(key)
+            if ventana is not None:
+                ventana.pendientes += 1
+                return completed_future((True, "Alerta agrupada"))
+
+            ventana = self._ventanas[key] = _Ventana(self.clock(), title, device)
+            enviar_ahora = self._bucket(chat_key).try_acquire()
+            if enviar_ahora:
+                ventana.enviadas = 1
+            else:
+                ventana.pendientes = 1
+            self._programar(key, ventana, self.window_seconds)
+
+        if enviar_ahora:
+            return self.send_fn(chat_key, text)
+        return completed_future((True, "Alerta agrupada"))
+
+    def _programar(self, key, ventana, segundos):
+        ventana.timer = threading.Timer(segundos, self._cerrar_ventana, args=(key,))
+        ventana.timer.daemon = True
+        ventana.timer.start()
+
+    def _cerrar_ventana(self, key, forzar=False):
+        """
+        Envía el resumen de la ventana (si hubo repeticiones) y la cierra.
+        Con `forzar` el resumen sale aunque el chat no tenga fichas.
+        """
+        with self._lock:
+            ventana = self._ventanas.get(key)
+            if ventana is None:
+                return
+            if ventana.pendientes == 0:
+                del self._ventanas[key]
+                return
+
+            bucket = self._bucket(key[0])
+            if not bucket.try_acquire() and not forzar:
+                # Sin fichas: reintentar cuando haya una disponible
+                self._programar(key, ventana, bucket.wait_time())
+                return
+
+            del self._ventanas[key]
+
+        # El resumen cuenta todas las detecciones de la ventana, incluida la ya enviada
+        total = ventana.enviadas + ventana.pendientes
+        segundos = int(round(self.clock() - ventana.inicio))
+        detecciones = "detección" if total == 1 else "detecciones"
+        resumen = (
+            f"🔔 <b>{ventana.title}</b>\n\n"
+            f"{ventana.device}: {total} {detecciones} en {segundos} s"
+        )
+        self.send_fn(key[0], resumen)
+
+    def flush(self):
+        """
+        Cierra todas las ventanas abiertas y encola sus resúmenes antes de
+        retornar (sin esperar fichas), para que un cierre no los pierda.
+        """
+        with self._lock:
+            keys = list(self._ventanas)
+            for key in keys:
+                if self._ventanas[key].timer:
+                    self._ventanas[key].timer.cancel()
+        for key in keys:
+            self._cerrar_ventana(key, forzar=True)
@@ -8,6 +8,7 @@ from config import WINDOW_CONFIG, COLORS
 from models import DeviceManager, UserManager
 from views import SplashScreen, LoginScreen, RegisterScreen, MainMenu
 from controllers.serial_comm import init_serial, close_serial
+from services.capture_retention import obtener_gestor_retencion
 
 
 class App(tk.Tk):
@@ -29,6 +30,12 @@ class App(tk.Tk):
         if not self.serial_connected:
             print("⚠ Advertencia: No se pudo conectar al puerto serial")
 
+        # Retención de capturas en segundo plano (cuota, antigüedad, archivo diario)
+        self.retencion = obtener_gestor_retencion()
+        self.retencion.agregar_carpeta("capturas_fotogramas")
+        self.retencion.agregar_carpeta("capturas_placas")
+        self.retencion.iniciar()
+
         # Inicialmente ocultar ventana principal para mostrar splash
         self.withdraw()
         self.splash = SplashScreen(self, self.show_login)
@@ -44,9 +51,8 @@ class App(tk.Tk):
 
     def show_menu(self):
         """Muestra el menú principal"""
-        # Cargar dispositivos del usuario actual
-        devices_file = self.user_manager.get_user_devices_file()
-        self.device_manager.set_devices_file(devices_file)
+        # Cargar dispositivos del usuario actual desde el almacén de usuarios
+        self.device_manager.set_user_store(self.user_manager.store, self.user_manager.current_user)
         
         self._switch_frame(MainMenu(self, self.device_manager, self.user_manager))
 
@@ -58,6 +64,8 @@ class App(tk.Tk):
         self.current_frame.pack(fill="both", expand=True)
     
     def destroy(self):
-        """Cierra la aplicación y la conexión serial"""
+        """Cierra la aplicación, la retención de capturas y la conexión serial"""
+        self.device_manager.flush()
+        self.retencion.detener()
         close_serial()
         super().destroy()
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Escritor asíncrono de capturas
+Redimensiona, codifica a JPEG y escribe en disco fuera del thread de
+detección, con una cola acotada. El archivo de historial queda abierto y se
+vacía a disco por lotes.
+"""
+
+import queue
+import threading
+import time
+
+import cv2
+
+
+class EscritorCapturas:
+    """
+    Un thread escritor que consume una cola de capacidad limitada.
+
+    - guardar(): encola una captura; si la cola sigue llena tras
+      `espera_maxima` segundos la captura se descarta (no se frena la detección)
+    - esperar(): bloquea hasta escribir todo lo pendiente
+    - vaciar_historial(): lleva a disco las líneas ya escritas del historial
+      sin esperar las capturas en cola
+    - detener(): escribe lo pendiente, cierra el historial y termina el thread
+    """
+
+    def __init__(self, archivo_historial=None, capacidad=16, lote_historial=8,
+                 intervalo_flush=1.0, espera_maxima=0.05):
+        self.archivo_historial = archivo_historial
+        self.lote_historial = lote_historial
+        self.intervalo_flush = intervalo_flush
+        self.espera_maxima = espera_maxima
+
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Historial abierto por el thread escritor; el lock permite vaciarlo
+        # desde otro thread (p. ej. para leerlo desde la interfaz)
+        self._historial = None
+        self._lock_historial = threading.RLock()
+        self._lineas_sin_flush = 0
+        self._ultimo_flush = time.monotonic()
+
+        # Estadísticas
+        self.escritas = 0
+        self.descartadas = 0
+        self.errores = 0
+
+    def _asegurar_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._trabajar, name="escritor-capturas", daemon=True)
+                self._thread.start()
+
+    def guardar(self, ruta, frame, tamano=None, calidad_jpeg=None, linea_historial=None,
+                al_terminar=None, copiar=True):
+        """
+        Encola una captura. Retorna False si se descartó por cola llena.
+
+        Args:
+            ruta: Archivo destino (.jpg)
+            frame: Imagen BGR; se copia salvo copiar=False (p. ej. si es un
+                   slot del anillo de frames que se va a sobrescribir)
+            tamano: (ancho, alto) para redimensionar, o None
+            calidad_jpeg: Calidad JPEG 0-100, o None para la de OpenCV
+            linea_historial: Texto a agregar al historial tras escribir
+            al_terminar: Callback(ok) que corre en el thread escritor
+        """
+        self._asegurar_thread()
+        trabajo = (ruta, frame.copy() if copiar else frame, tamano, calidad_jpeg,
+                   linea_historial, al_terminar)
+        try:
+            self._cola.put(trabajo, timeout=self.espera_maxima)
+            return True
+        except queue.Full:
+            self.descartadas += 1
+            print(f"⚠️ Cola de capturas llena, se descarta {ruta}")
+            return False
+
+    def _trabajar(self):
+        while True:
+            try:
+                trabajo = self._cola.get(timeout=self.intervalo_flush)
+            except queue.Empty:
+                self._flush_historial()
+                continue
+
+            if trabajo is None:
+                self._flush_historial(cerrar=True)
+                self._cola.task_done()
+                return
+
+            try:
+                self._escribir(*trabajo)
+            finally:
+                # Con la cola vacía no hay lote que esperar
+                if self._cola.empty():
+                    self._flush_historial()
+                self._cola.task_done()
+
+    def _escribir(self, ruta, frame, tamano, calidad_jpeg, linea_historial, al_terminar):
+        ok = False
+        try:
+            if tamano is not None and frame.shape[1::-1] != tuple(tamano):
+                frame = cv2.resize(frame, tamano)
+            parametros = [cv2.IMWRITE_JPEG_QUALITY, calidad_jpeg] if calidad_jpeg is not None else []
+            ok = cv2.imwrite(str(ruta), frame, parametros)
+            if ok:
+                self.escritas += 1
+                if linea_historial:
+                    self._agregar_historial(linea_historial)
+            else:
+                self.errores += 1
+                print(f"Error guardando captura: {ruta}")
+        except Exception as e:
+            self.errores += 1
+            print(f"Error guardando captura: {e}")
+
+        if al_terminar:
+            try:
+                al_terminar(ok)
+            except Exception as e:
+                print(f"Error en callback de captura: {e}")
+
+    def _agregar_historial(self, linea):
+        if self.archivo_historial is None:
+            return
+        with self._lock_historial:
+            if self._historial is None:
+                self._historial = open(self.archivo_historial, 'a', encoding='utf-8')
+            self._historial.write(linea)
+            self._lineas_sin_flush += 1
+            if (self._lineas_sin_flush >= self.lote_historial or
+                    time.monotonic() - self._ultimo_flush >= self.intervalo_flush):
+                self._flush_historial()
+
+    def _flush_historial(self, cerrar=False):
+        with self._lock_historial:
+            if self._historial is None:
+                return
+            try:
+                if self._lineas_sin_flush:
+                    self._historial.flush()
+                if cerrar:
+                    self._historial.close()
+                    self._historial = None
+            except Exception as e:
+                print(f"Error escribiendo historial: {e}")
+            self._lineas_sin_flush = 0
+            self._ultimo_flush = time.monotonic()
+
+    def vaciar_historial(self):
+        """Lleva a disco las líneas de historial ya escritas (no espera la cola)"""
+        self._flush_historial()
+
+    def esperar(self):
+        """Bloquea hasta que todas las capturas encoladas estén escritas"""
+        if self._thread is not None and self._thread.is_alive():
+            self._cola.join()
+
+    def detener(self, timeout=5.0):
+        """Escribe lo pendiente, cierra el historial y termina el thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self._cola.put(None)
+        thread.join(timeout=timeout)
+
+    def estadisticas(self):
+        return {
+            'pendientes': self._cola.qsize(),
+            'escritas': self.escritas,
+            'descartadas': self.descartadas,
+            'errores': self.errores,
+        }
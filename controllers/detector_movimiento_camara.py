@@ -11,7 +11,10 @@ import queue
 import time
 import os
 from pathlib import Path
-from collections import deque
+from controllers.frame_source import abrir_fuente
+from controllers.capture_writer import EscritorCapturas
+from models.capture_catalog import obtener_catalogo
+from controllers.frame_ring import FrameRing
 
 
 class DetectorMovimientoCamara:
@@ -31,13 +34,19 @@ class DetectorMovimientoCamara:
         self.archivo_historial = self.carpeta_historial / "historial_movimientos.txt"
         self._inicializar_historial()
         
+        # Codificación JPEG, escritura e historial fuera del thread de detección
+        self.escritor = EscritorCapturas(archivo_historial=self.archivo_historial)
+        
+        # Índice de capturas para galerías y contadores
+        self.catalogo = obtener_catalogo(self.carpeta_capturas)
+        self.dispositivo = None  # ID del dispositivo dueño de las capturas
+        
         # Configuración de cámara
         self.camara = None
-        self.frame_actual = None
         self.frame_anterior = None
         
-        # Buffer para estabilización
-        self.buffer_frames = deque(maxlen=10)
+        # Anillo preasignado: la cámara escribe directo en él, sin copias por frame
+        self.frames = FrameRing(capacidad=4, forma=(720, 1280, 3))
         
         # Control de threading
         self.thread_captura = None
@@ -55,11 +64,21 @@ class DetectorMovimientoCamara:
         self.ultimo_tiempo_captura = 0
         self.cooldown_segundos = 5
         
+        # Pausa entre iteraciones del loop (0 = tan rápido como la fuente entregue)
+        self.pausa_loop = 0.03
+        
         # Configuración de detección
         self._umbral_movimiento = 2500
         self._calidad_jpeg = 75
         self._redimensionar_a = (1280, 720)
         
+        # Resolución de análisis (None = resolución completa) y zonas de interés.
+        # El umbral se expresa siempre en píxeles de la imagen completa.
+        self._resolucion_analisis = (320, 180)
+        self._rois = None       # Lista de (x, y, ancho, alto) en fracciones 0-1
+        self._mascara = None    # Imagen en escala de grises (!= 0 = se analiza)
+        self._parametros_analisis = None
+        
         # Configuración de estabilización
         self.frames_estabilizacion = 5
         self.contador_estabilizacion = 0
@@ -82,25 +101,28 @@ class DetectorMovimientoCamara:
                 f.write("=== HISTORIAL DE MOVIMIENTOS ===\n")
                 f.write(f"Creado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
     
-    def _registrar_en_historial(self, nombre_archivo, tipo="automatica"):
-        """Registra captura en historial"""
+    def _linea_historial(self, nombre_archivo, tipo="automatica"):
+        """Línea del historial para una captura (la escribe el escritor)"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         tipo_texto = "Captura manual" if tipo == "manual" else "Movimiento detectado"
-        linea = f"{timestamp} - {tipo_texto} - {nombre_archivo}\n"
-        
-        with open(self.archivo_historial, 'a', encoding='utf-8') as f:
-            f.write(linea)
+        return f"{timestamp} - {tipo_texto} - {nombre_archivo}\n"
     
     def set_callback_notificacion(self, callback):
         """Establece callback para notificaciones"""
         self.callback_notificacion = callback
     
     def iniciar_camara(self, indice=0):
-        """Inicia la cámara"""
+        """
+        Inicia la cámara.
+        `indice` puede ser un índice de cámara, un video, una carpeta de JPEG,
+        "sintetico" o una FrameSource ya creada.
+        """
         if self.camara is not None:
             self.detener_camara()
             
-        self.camara = cv2.VideoCapture(indice)
+        # Índice de cámara, video, carpeta de JPEG, "sintetico" o FrameSource
+        self.camara = abrir_fuente(indice)
+        self.frames.reiniciar()
         if not self.camara.isOpened():
             raise Exception(f"No se pudo abrir cámara {indice}")
         
@@ -145,6 +167,9 @@ class DetectorMovimientoCamara:
         
         if self.thread_captura:
             self.thread_captura.join(timeout=2)
+        
+        # Terminar de escribir las capturas pendientes y cerrar el historial
+        self.escritor.detener()
     
     def pausar_deteccion(self):
         """Pausa la detección"""
@@ -162,17 +187,13 @@ class DetectorMovimientoCamara:
                     time.sleep(0.1)
                     continue
                 
-                # Leer frame
-                ret, frame = self.camara.read()
-                if not ret:
+                # Leer frame directamente sobre el siguiente slot del anillo
+                ret, frame = self.camara.read(image=self.frames.siguiente_slot())
+                if not ret or frame is None:
                     time.sleep(0.1)
                     continue
                 
-                with self.lock:
-                    self.frame_actual = frame.copy()
-                
-                # Añadir al buffer
-                self.buffer_frames.append(frame.copy())
+                self.frames.publicar(frame)
                 
                 # Detectar movimiento
                 if self._detectar_movimiento(frame):
@@ -191,17 +212,72 @@ class DetectorMovimientoCamara:
                     self._capturar_y_guardar(frame, "manual")
                     self.captura_manual_solicitada = False
                 
-                time.sleep(0.03)  # ~30 FPS
+                time.sleep(self.pausa_loop)  # ~30 FPS
                 
             except Exception as e:
                 print(f"Error en loop: {e}")
                 time.sleep(0.1)
     
+    def _preparar_analisis(self, forma_frame):
+        """
+        Calcula (una vez por resolución de cámara) el tamaño de análisis,
+        el kernel de desenfoque, el umbral escalado y la máscara de zonas.
+        """
+        alto, ancho = forma_frame[:2]
+        if self._parametros_analisis and self._parametros_analisis['forma'] == (alto, ancho):
+            return self._parametros_analisis
+        
+        if self._resolucion_analisis:
+            tamano = self._resolucion_analisis
+        else:
+            tamano = (ancho, alto)
+        escala = tamano[0] / ancho
+        
+        # Mantener el desenfoque equivalente a 21x21 en 1280 px (kernel impar >= 3)
+        kernel = max(3, int(round(21 * tamano[0] / 1280)) | 1)
+        
+        # Umbral en píxeles de análisis
+        umbral = self._umbral_movimiento * (tamano[0] * tamano[1]) / (ancho * alto)
+        
+        # Máscara de zonas de interés a resolución de análisis
+        mascara = None
+        if self._mascara is not None:
+            mascara = cv2.resize(self._mascara, tamano, interpolation=cv2.INTER_NEAREST)
+            mascara = np.where(mascara > 0, 255, 0).astype(np.uint8)
+        if self._rois:
+            mascara_rois = np.zeros((tamano[1], tamano[0]), dtype=np.uint8)
+            for x, y, w, h in self._rois:
+                x0, y0 = int(x * tamano[0]), int(y * tamano[1])
+                x1, y1 = int((x + w) * tamano[0]), int((y + h) * tamano[1])
+                mascara_rois[y0:y1, x0:x1] = 255
+            mascara = mascara_rois if mascara is None else cv2.bitwise_and(mascara, mascara_rois)
+        
+        self._parametros_analisis = {
+            'forma': (alto, ancho),
+            'tamano': tamano,
+            'escala': escala,
+            'kernel': (kernel, kernel),
+            'umbral': umbral,
+            'mascara': mascara
+        }
+        self.frame_anterior = None
+        return self._parametros_analisis
+    
     def _detectar_movimiento(self, frame):
-        """Detecta movimiento en el frame"""
-        # Convertir a escala de grises
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        """
+        Detecta movimiento en el frame.
+        Trabaja sobre una copia reducida (resolución de análisis); el frame
+        completo solo se vuelve a usar si se guarda una captura.
+        """
+        params = self._preparar_analisis(frame.shape)
+        
+        # Reducir antes de convertir: todo el trabajo posterior es sobre la imagen pequeña
+        if params['escala'] != 1:
+            pequeno = cv2.resize(frame, params['tamano'], interpolation=cv2.INTER_LINEAR)
+        else:
+            pequeno = frame
+        gray = cv2.cvtColor(pequeno, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, params['kernel'], 0)
         
         # Primer frame
         if self.frame_anterior is None:
@@ -213,14 +289,18 @@ class DetectorMovimientoCamara:
         thresh = cv2.threshold(frame_diff, 25, 255, cv2.THRESH_BINARY)[1]
         thresh = cv2.dilate(thresh, None, iterations=2)
         
+        # Limitar a las zonas de interés
+        if params['mascara'] is not None:
+            thresh = cv2.bitwise_and(thresh, params['mascara'])
+        
         # Calcular área de cambio
-        area_cambio = np.sum(thresh) / 255
+        area_cambio = cv2.countNonZero(thresh)
         
         # Actualizar frame anterior
         self.frame_anterior = gray
         
         # Retornar si hay movimiento
-        return area_cambio > self._umbral_movimiento
+        return area_cambio > params['umbral']
     
     def _puede_capturar(self):
         """Verifica si puede capturar (cooldown)"""
@@ -230,7 +310,7 @@ class DetectorMovimientoCamara:
         return True
     
     def _capturar_y_guardar(self, frame, tipo="automatica"):
-        """Captura y guarda el frame"""
+        """Encola la captura en el escritor; el evento se emite al quedar escrita"""
         try:
             # Actualizar tiempo
             self.ultimo_tiempo_captura = time.time()
@@ -241,48 +321,60 @@ class DetectorMovimientoCamara:
             nombre_archivo = f"captura_{tipo_prefijo}_{timestamp}.jpg"
             ruta_completa = self.carpeta_capturas / nombre_archivo
             
-            # Redimensionar
-            frame_guardado = cv2.resize(frame, self._redimensionar_a)
-            
-            # Guardar
-            cv2.imwrite(str(ruta_completa), frame_guardado, 
-                       [cv2.IMWRITE_JPEG_QUALITY, self._calidad_jpeg])
-            
-            # Registrar
-            self.capturas_guardadas += 1
-            self._registrar_en_historial(nombre_archivo, tipo)
-            
-            # Notificar
-            evento = {
-                'tipo': 'captura_guardada',
-                'archivo': nombre_archivo,
-                'ruta': str(ruta_completa),
-                'tipo_captura': tipo,
-                'timestamp': datetime.now()
-            }
+            def al_terminar(ok):
+                if ok:
+                    self._notificar_captura(nombre_archivo, ruta_completa, tipo)
             
-            self.cola_eventos.put(evento)
-            
-            # Callback
-            if self.callback_notificacion:
-                self.callback_notificacion(evento)
-            
-            return True
+            # El frame es un slot del anillo: el escritor guarda su propia copia
+            return self.escritor.guardar(
+                ruta_completa, frame,
+                tamano=self._redimensionar_a,
+                calidad_jpeg=self._calidad_jpeg,
+                linea_historial=self._linea_historial(nombre_archivo, tipo),
+                al_terminar=al_terminar
+            )
             
         except Exception as e:
             print(f"Error guardando captura: {e}")
             return False
     
+    def _notificar_captura(self, nombre_archivo, ruta_completa, tipo):
+        """Registra y notifica una captura ya escrita (corre en el thread escritor)"""
+        self.capturas_guardadas += 1
+        self.catalogo.registrar(ruta_completa, tipo=tipo, dispositivo=self.dispositivo)
+        
+        evento = {
+            'tipo': 'captura_guardada',
+            'archivo': nombre_archivo,
+            'ruta': str(ruta_completa),
+            'tipo_captura': tipo,
+            'timestamp': datetime.now()
+        }
+        
+        self.cola_eventos.put(evento)
+        
+        # Callback
+        if self.callback_notificacion:
+            self.callback_notificacion(evento)
+    
     def solicitar_captura_manual(self):
         """Solicita una captura manual"""
         self.captura_manual_solicitada = True
     
     def obtener_frame_actual(self):
-        """Obtiene el frame actual (thread-safe)"""
-        with self.lock:
-            if self.frame_actual is not None:
-                return self.frame_actual.copy()
-        return None
+        """
+        Obtiene el frame actual como vista de solo lectura (sin copia).
+        La vista es válida mientras el anillo no la sobrescriba; para
+        conservarla más tiempo usar obtener_frame_con_secuencia() o copiarla.
+        """
+        return self.frames.ultimo()[1]
+    
+    def obtener_frame_con_secuencia(self):
+        """
+        Retorna (secuencia, frame de solo lectura) del último fotograma.
+        Con frames.vigente(secuencia) se verifica si sigue sin sobrescribirse.
+        """
+        return self.frames.ultimo()
     
     def obtener_evento(self):
         """Obtiene evento de la cola (no bloqueante)"""
@@ -299,16 +391,41 @@ class DetectorMovimientoCamara:
             'ejecutando': self.ejecutando,
             'pausado': self.pausado,
             'cooldown': self.cooldown_segundos,
-            'umbral': self._umbral_movimiento
+            'umbral': self._umbral_movimiento,
+            'resolucion_analisis': self._resolucion_analisis
         }
     
     def configurar_sensibilidad(self, umbral):
         """Configura la sensibilidad (solo si está detenido)"""
         if not self.ejecutando:
             self._umbral_movimiento = umbral
+            self._parametros_analisis = None
             return True
         return False
     
+    def configurar_analisis(self, resolucion=(320, 180), rois=None, mascara=None):
+        """
+        Configura la resolución de análisis y las zonas de interés (solo si está detenido).
+        
+        Args:
+            resolucion: (ancho, alto) de análisis o None para resolución completa
+            rois: Lista de (x, y, ancho, alto) en fracciones 0-1 del frame
+            mascara: Ruta o imagen en escala de grises; píxeles != 0 se analizan
+        """
+        if self.ejecutando:
+            return False
+        
+        if isinstance(mascara, (str, Path)):
+            mascara = cv2.imread(str(mascara), cv2.IMREAD_GRAYSCALE)
+            if mascara is None:
+                raise ValueError("No se pudo leer la máscara")
+        
+        self._resolucion_analisis = tuple(resolucion) if resolucion else None
+        self._rois = list(rois) if rois else None
+        self._mascara = mascara
+        self._parametros_analisis = None
+        return True
+    
     def configurar_cooldown(self, segundos):
         """Configura el tiempo de cooldown"""
         self.cooldown_segundos = segundos
@@ -316,6 +433,10 @@ class DetectorMovimientoCamara:
     def leer_historial(self, ultimas_lineas=50):
         """Lee el historial"""
         try:
+            # Líneas ya escritas pero en el búfer; las capturas aún en cola
+            # aparecen en la próxima lectura (no se bloquea a la interfaz)
+            self.escritor.vaciar_historial()
+            
             if not self.archivo_historial.exists():
                 return []
             
@@ -332,12 +453,7 @@ class DetectorMovimientoCamara:
     def obtener_capturas_recientes(self, n=10):
         """Obtiene las N capturas más recientes"""
         try:
-            archivos = sorted(
-                self.carpeta_capturas.glob("*.jpg"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            return [str(f) for f in archivos[:n]]
+            return [str(c.ruta) for c in self.catalogo.recientes(n)]
         except Exception as e:
             print(f"Error obteniendo capturas: {e}")
             return []
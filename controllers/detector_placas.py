@@ -12,8 +12,15 @@ import queue
 import time
 import os
 from pathlib import Path
+from controllers.frame_source import abrir_fuente
+from controllers.ocr_pool import PoolOCR
+from controllers.plate_tracker import SeguidorPlacas
+from controllers.plate_store import AlmacenPlacas
+from controllers.plate_matcher import IndiceDifuso
+from controllers.capture_writer import EscritorCapturas
+from models.capture_catalog import obtener_catalogo
+from utils.estadisticas import percentiles_ms
 from collections import deque
-import json
 import re
 
 # Intentar importar pytesseract para OCR
@@ -43,17 +50,32 @@ class DetectorPlacas:
         self.carpeta_capturas = Path(carpeta_capturas)
         self.carpeta_capturas.mkdir(exist_ok=True)
         
-        # Archivo de placas autorizadas
+        # Placas autorizadas: búsqueda O(1), cambios en journal y recarga si
+        # otro proceso edita el archivo (la vigilancia corre con la detección)
         self.archivo_placas = Path(archivo_placas)
-        self.placas_autorizadas = self._cargar_placas()
+        self.placas = AlmacenPlacas(
+            self.archivo_placas,
+            placas_iniciales=['123456', '789012', '345678']
+        )
+        
+        # Tolerancia a dígitos confundidos por el OCR (8/3, 1/7, 0/8...)
+        self.indice_difuso = IndiceDifuso(self.placas.autorizada, costo_maximo=0.8, max_sustituciones=2,
+                                          registrada=self.placas.registrada)
         
         # Configuración de cámara
         self.camara = None
         self.frame_actual = None
         self.frame_anterior = None
         
-        # Buffer para estabilización
+        # Buffer de frames recientes; al detectar movimiento se eligen los
+        # más nítidos y con candidatos a placa para el OCR
         self.buffer_frames = deque(maxlen=10)
+        self.frames_ocr_por_evento = 3  # top-k frames que pasan al OCR (votan entre sí)
+        self.max_candidatos_ocr = 4     # recortes por llamada a tesseract
+        
+        # Tiempos y aciertos por etapa de la cascada OCR
+        self._etapas_ocr = {}
+        self._lock_etapas = threading.Lock()
         
         # Control de threading
         self.thread_captura = None
@@ -63,76 +85,58 @@ class DetectorPlacas:
         # Cola de eventos para notificaciones
         self.cola_eventos = queue.Queue()
         
+        # Pool acotado de OCR: cada análisis puede lanzar hasta 3 procesos de
+        # tesseract, así que se limita la concurrencia y los frames en espera
+        self.trabajadores_ocr = 2
+        self.capacidad_cola_ocr = 4
+        self.pool_ocr = None
+        
         # Configuración de detección
         self.sensibilidad = 25  # Umbral para detección de movimiento
         self.min_area_movimiento = 5000  # Área mínima para considerar movimiento
         
-        # Cooldown para evitar múltiples detecciones
+        # Cooldown entre análisis; cada análisis vota con varios frames del evento
         self.ultimo_analisis = 0
         self.cooldown_segundos = 5  # Segundos entre análisis
         
+        # Votación por pasada de vehículo y supresión de repetidos (TTL)
+        self.seguidor = SeguidorPlacas(lecturas_minimas=2, ventana_segundos=3.0, ttl_segundos=60)
+        
+        # Estadísticas
+        self.movimientos_detectados = 0
+        self.analisis_realizados = 0
+        self.frames_ocr = 0
+        
+        # Pausa entre iteraciones del loop (0 = tan rápido como la fuente entregue)
+        self.pausa_loop = 0.03
+        
         # Callback para notificaciones
         self.callback_notificacion = None
         
+        # Codificación JPEG y escritura de capturas fuera de los threads de análisis
+        self.escritor = EscritorCapturas()
+        
+        # Índice de capturas para galerías y contadores
+        self.catalogo = obtener_catalogo(self.carpeta_capturas)
+        self.dispositivo = None  # ID del dispositivo dueño de las capturas
+        
         # Estado
         self.estado = "Detenido"
         
-    def _cargar_placas(self):
-        """Carga las placas autorizadas desde el archivo JSON"""
-        if self.archivo_placas.exists():
-            try:
-                with open(self.archivo_placas, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return set(data.get('placas_autorizadas', []))
-            except Exception as e:
-                print(f"Error cargando placas: {e}")
-                return set()
-        else:
-            # Crear archivo con placas de ejemplo
-            placas_ejemplo = {
-                'placas_autorizadas': [
-                    '123456',
-                    '789012',
-                    '345678'
-                ]
-            }
-            try:
-                with open(self.archivo_placas, 'w', encoding='utf-8') as f:
-                    json.dump(placas_ejemplo, f, indent=2)
-                print(f"✅ Archivo de placas creado: {self.archivo_placas}")
-                return set(placas_ejemplo['placas_autorizadas'])
-            except Exception as e:
-                print(f"Error creando archivo de placas: {e}")
-                return set()
-    
-    def agregar_placa_autorizada(self, placa):
-        """Agrega una placa a la lista de autorizadas"""
+    def agregar_placa_autorizada(self, placa, desde=None, hasta=None):
+        """
+        Agrega una placa a la lista de autorizadas.
+        `desde`/`hasta` (datetime) limitan su vigencia, p. ej. una visita de hoy.
+        """
         placa = self._normalizar_placa(placa)
         if self._validar_formato_placa(placa):
-            self.placas_autorizadas.add(placa)
-            self._guardar_placas()
+            self.placas.agregar(placa, desde, hasta)
             return True
         return False
     
     def eliminar_placa_autorizada(self, placa):
         """Elimina una placa de la lista de autorizadas"""
-        placa = self._normalizar_placa(placa)
-        if placa in self.placas_autorizadas:
-            self.placas_autorizadas.remove(placa)
-            self._guardar_placas()
-            return True
-        return False
-    
-    def _guardar_placas(self):
-        """Guarda las placas autorizadas en el archivo JSON"""
-        try:
-            data = {
-                'placas_autorizadas': sorted(list(self.placas_autorizadas))
-            }
-            with open(self.archivo_placas, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error guardando placas: {e}")
+        return self.placas.eliminar(self._normalizar_placa(placa))
     
     def _normalizar_placa(self, placa):
         """Normaliza una placa: solo dígitos, 6 caracteres"""
@@ -147,11 +151,16 @@ class DetectorPlacas:
         return bool(re.match(r'^\d{6}$', placa))
     
     def iniciar_camara(self, indice_camara=0):
-        """Inicia la cámara"""
+        """
+        Inicia la cámara.
+        `indice_camara` puede ser un índice de cámara, un video, una carpeta
+        de JPEG, "sintetico" o una FrameSource ya creada.
+        """
         if self.camara is not None:
             self.camara.release()
         
-        self.camara = cv2.VideoCapture(indice_camara)
+        # Índice de cámara, video, carpeta de JPEG, "sintetico" o FrameSource
+        self.camara = abrir_fuente(indice_camara)
         if not self.camara.isOpened():
             raise Exception(f"No se pudo abrir la cámara {indice_camara}")
         
@@ -181,6 +190,14 @@ class DetectorPlacas:
         self.pausado = False
         self.estado = "Detectando"
         
+        self.pool_ocr = PoolOCR(
+            self._analizar_y_notificar,
+            trabajadores=self.trabajadores_ocr,
+            capacidad=self.capacidad_cola_ocr
+        )
+        
+        self.placas.iniciar_vigilancia()
+        
         self.thread_captura = threading.Thread(target=self._loop_deteccion, daemon=True)
         self.thread_captura.start()
         
@@ -194,6 +211,18 @@ class DetectorPlacas:
         if self.thread_captura is not None:
             self.thread_captura.join(timeout=2.0)
         
+        # Los frames aún en cola ya no son relevantes
+        if self.pool_ocr is not None:
+            self.pool_ocr.detener()
+        
+        # Emitir la pasada que quedó abierta
+        for confirmada in self.seguidor.pasadas_vencidas(forzar=True):
+            self._notificar_placa(confirmada)
+        
+        self.placas.detener_vigilancia()
+        self.placas.compactar()
+        self.escritor.detener()
+        
         print("✅ Detección de placas detenida")
     
     def pausar(self):
@@ -224,28 +253,30 @@ class DetectorPlacas:
                     time.sleep(0.1)
                     continue
                 
-                # Guardar frame actual
+                # Guardar frame actual y agregarlo al buffer (misma copia)
                 self.frame_actual = frame.copy()
+                self.buffer_frames.append(self.frame_actual)
                 
-                # Agregar al buffer
-                self.buffer_frames.append(frame.copy())
+                # Emitir pasadas cuya ventana venció sin llegar a mayoría
+                for confirmada in self.seguidor.pasadas_vencidas():
+                    self._notificar_placa(confirmada)
                 
                 # Detectar movimiento
                 if self._detectar_movimiento(frame):
-                    # Verificar cooldown
+                    self.movimientos_detectados += 1
+                    # Verificar cooldown; si la pasada ya está confirmada no hace falta más OCR
                     tiempo_actual = time.time()
-                    if tiempo_actual - self.ultimo_analisis >= self.cooldown_segundos:
+                    if (tiempo_actual - self.ultimo_analisis >= self.cooldown_segundos
+                            and not self.seguidor.en_pasada_confirmada()):
                         print("🚗 Movimiento detectado - Analizando placa...")
                         self.ultimo_analisis = tiempo_actual
+                        self.analisis_realizados += 1
                         
-                        # Analizar placa en thread separado para no bloquear
-                        threading.Thread(
-                            target=self._analizar_y_notificar,
-                            args=(frame.copy(),),
-                            daemon=True
-                        ).start()
+                        # Encolar los frames recientes en el pool OCR (descarta el
+                        # evento más viejo si está lleno); la selección corre allí
+                        self.pool_ocr.enviar(list(self.buffer_frames))
                 
-                time.sleep(0.03)  # ~30 FPS
+                time.sleep(self.pausa_loop)  # ~30 FPS
                 
             except Exception as e:
                 print(f"❌ Error en loop de detección: {e}")
@@ -286,47 +317,64 @@ class DetectorPlacas:
         
         return movimiento_detectado
     
-    def _analizar_y_notificar(self, frame):
-        """Analiza el frame, extrae placa y notifica si es necesario"""
+    def _puntuar_frame(self, frame):
+        """
+        Puntúa un frame para OCR: (tiene candidatos a placa, nitidez).
+        Ambos se calculan sobre el frame a mitad de resolución.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        reducido = cv2.resize(gray, (gray.shape[1] // 2, gray.shape[0] // 2), interpolation=cv2.INTER_AREA)
+        nitidez = cv2.Laplacian(reducido, cv2.CV_64F).var()
+        return (bool(self._candidatos_placa(reducido, escala=0.5)), nitidez)
+    
+    def _seleccionar_mejores_frames(self, frames):
+        """
+        Retorna los `frames_ocr_por_evento` mejores frames, del mejor al peor,
+        como (tiene_candidatos, frame). Con un solo frame no se puntúa y se
+        asume que puede tener candidatos.
+        """
+        if len(frames) <= 1:
+            return [(True, frame) for frame in frames]
+        puntuados = []
+        for i, frame in enumerate(frames):
+            # Ante empate se prefiere el más reciente
+            puntuados.append((self._puntuar_frame(frame), i, frame))
+        puntuados.sort(key=lambda p: (p[0], p[1]), reverse=True)
+        return [(puntaje[0], frame) for puntaje, _, frame in puntuados[:self.frames_ocr_por_evento]]
+    
+    def _analizar_y_notificar(self, frames):
+        """Elige los mejores frames del evento, extrae placa y notifica si es necesario"""
         try:
-            # Guardar captura
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            ruta_captura = self.carpeta_capturas / f"captura_{timestamp}.jpg"
-            cv2.imwrite(str(ruta_captura), frame)
+            seleccion = self._seleccionar_mejores_frames(frames)
+            if not seleccion:
+                return
+            if not OCR_DISPONIBLE:
+                print("⚠️ OCR no disponible")
+                return
             
-            # Extraer placa con OCR
-            placa_detectada = self._extraer_placa_ocr(frame)
+            # Votan solo las lecturas de recortes (una llamada a tesseract por
+            # frame); los frames sin candidatos a placa no se leen
+            lecturas = []
+            for tiene_candidatos, candidato in seleccion:
+                if not tiene_candidatos:
+                    continue
+                self.frames_ocr += 1
+                placa_detectada = self._ocr_por_recortes(candidato)
+                if placa_detectada:
+                    lecturas.append((placa_detectada, candidato))
             
-            if placa_detectada:
-                print(f"📋 Placa detectada: {placa_detectada}")
-                
-                # Verificar si está autorizada
-                if placa_detectada in self.placas_autorizadas:
-                    print(f"✅ Placa autorizada: {placa_detectada}")
-                    evento = {
-                        'tipo': 'placa_autorizada',
-                        'placa': placa_detectada,
-                        'timestamp': datetime.now(),
-                        'imagen': str(ruta_captura)
-                    }
-                else:
-                    print(f"⚠️ PLACA NO AUTORIZADA: {placa_detectada}")
-                    evento = {
-                        'tipo': 'placa_no_autorizada',
-                        'placa': placa_detectada,
-                        'timestamp': datetime.now(),
-                        'imagen': str(ruta_captura)
-                    }
-                    
-                    # Notificar al callback si existe
-                    if self.callback_notificacion:
-                        try:
-                            self.callback_notificacion(evento)
-                        except Exception as e:
-                            print(f"Error en callback: {e}")
-                
-                # Agregar a cola de eventos
-                self.cola_eventos.put(evento)
+            if not lecturas:
+                # Último recurso, una sola vez por evento y sobre el mejor frame
+                mejor = seleccion[0][1]
+                placa_detectada = self._ocr_frame_completo(mejor)
+                if placa_detectada:
+                    lecturas.append((placa_detectada, mejor))
+            
+            if lecturas:
+                print(f"📋 Lecturas: {', '.join(placa for placa, _ in lecturas)}")
+                for placa_detectada, frame in lecturas:
+                    for confirmada in self.seguidor.agregar_lectura(placa_detectada, frame):
+                        self._notificar_placa(confirmada)
             else:
                 print("⚠️ No se pudo detectar placa en la imagen")
                 
@@ -335,54 +383,182 @@ class DetectorPlacas:
             import traceback
             traceback.print_exc()
     
-    def _extraer_placa_ocr(self, frame):
-        """Extrae el número de placa usando OCR"""
-        if not OCR_DISPONIBLE:
-            print("⚠️ OCR no disponible")
-            return None
+    def _notificar_placa(self, confirmada):
+        """Guarda la captura (en el escritor) y emite el evento de una placa confirmada"""
+        try:
+            placa_detectada = confirmada.placa
+            print(f"📋 Placa confirmada: {placa_detectada} ({confirmada.lecturas} lecturas)")
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ruta_captura = self.carpeta_capturas / f"captura_{timestamp}.jpg"
+            
+            # Verificar si está autorizada (exacta o a pocos dígitos confundidos)
+            coincidencia = self.indice_difuso.mejor(placa_detectada)
+            if coincidencia:
+                placa_autorizada, costo = coincidencia
+                if costo:
+                    print(f"✅ Placa autorizada: {placa_autorizada} (leída {placa_detectada}, costo {costo})")
+                else:
+                    print(f"✅ Placa autorizada: {placa_autorizada}")
+                evento = {
+                    'tipo': 'placa_autorizada',
+                    'placa': placa_autorizada,
+                    'placa_leida': placa_detectada,
+                    'costo_coincidencia': costo,
+                    'timestamp': datetime.now(),
+                    'imagen': str(ruta_captura),
+                    'lecturas': confirmada.lecturas
+                }
+            else:
+                print(f"⚠️ PLACA NO AUTORIZADA: {placa_detectada}")
+                evento = {
+                    'tipo': 'placa_no_autorizada',
+                    'placa': placa_detectada,
+                    'timestamp': datetime.now(),
+                    'imagen': str(ruta_captura),
+                    'lecturas': confirmada.lecturas
+                }
+            
+            # El evento sale cuando la imagen ya está en disco; si la cola del
+            # escritor está llena se notifica igual, sin imagen
+            # (los frames del buffer son copias propias: no hace falta copiar)
+            def al_terminar(ok):
+                if ok:
+                    self.catalogo.registrar(ruta_captura, tipo=evento['tipo'],
+                                            dispositivo=self.dispositivo, placa=evento['placa'])
+                self._emitir_evento(evento)
+            
+            if not self.escritor.guardar(ruta_captura, confirmada.frame, copiar=False,
+                                         al_terminar=al_terminar):
+                self._emitir_evento(evento)
+            
+        except Exception as e:
+            print(f"❌ Error notificando placa: {e}")
+    
+    def _emitir_evento(self, evento):
+        """Encola el evento y llama al callback si la placa no está autorizada"""
+        if evento['tipo'] == 'placa_no_autorizada' and self.callback_notificacion:
+            try:
+                self.callback_notificacion(evento)
+            except Exception as e:
+                print(f"Error en callback: {e}")
         
+        # Agregar a cola de eventos
+        self.cola_eventos.put(evento)
+    
+    def _ocr_por_recortes(self, frame):
+        """
+        Primeras etapas de la cascada OCR, las que votan en cada frame:
+        1. 'candidatos': busca regiones con forma de placa
+        2. 'recortes': OCR de todos los recortes en una sola llamada a tesseract
+        """
         try:
-            # Preprocesar imagen para mejorar OCR
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
-            # Aplicar threshold adaptativo
+            inicio = time.perf_counter()
+            candidatos = self._candidatos_placa(gray)[:self.max_candidatos_ocr]
+            self._registrar_etapa('candidatos', inicio, bool(candidatos))
+            if not candidatos:
+                return None
+            
+            inicio = time.perf_counter()
+            placa = self._ocr_recortes(gray, candidatos)
+            self._registrar_etapa('recortes', inicio, placa is not None)
+            return placa
+        
+        except Exception as e:
+            print(f"Error en OCR: {e}")
+            return None
+    
+    def _ocr_frame_completo(self, frame):
+        """
+        Último recurso, una vez por evento, si ningún recorte dio lectura:
+        3. 'frame_completo': umbral adaptativo sobre todo el frame
+        4. 'alternativo': umbral simple e invertido sobre todo el frame
+        """
+        try:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            
+            inicio = time.perf_counter()
             thresh = cv2.adaptiveThreshold(
                 gray, 255,
                 cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                 cv2.THRESH_BINARY,
                 11, 2
             )
-            
-            # Intentar detectar región de la placa (opcional - mejora precisión)
-            placa_region = self._detectar_region_placa(gray)
-            
-            if placa_region is not None:
-                # OCR solo en la región de la placa
-                imagen_ocr = placa_region
-            else:
-                # OCR en toda la imagen
-                imagen_ocr = thresh
-            
-            # Configurar OCR para solo números
-            config_ocr = '--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789'
-            
-            # Extraer texto
-            texto = pytesseract.image_to_string(imagen_ocr, config=config_ocr)
-            
-            # Limpiar y normalizar
-            placa = self._normalizar_placa(texto)
-            
-            # Validar formato
-            if self._validar_formato_placa(placa):
+            texto = pytesseract.image_to_string(thresh, config=self._config_ocr(7))
+            placa = self._placa_de_texto(texto)
+            self._registrar_etapa('frame_completo', inicio, placa is not None)
+            if placa:
                 return placa
-            else:
-                # Intentar con diferentes preprocesa mientos
-                return self._ocr_alternativo(frame)
+            
+            inicio = time.perf_counter()
+            placa = self._ocr_alternativo(frame)
+            self._registrar_etapa('alternativo', inicio, placa is not None)
+            return placa
                 
         except Exception as e:
             print(f"Error en OCR: {e}")
             return None
     
+    def _placa_de_texto(self, texto):
+        """
+        Placa leída por OCR, o None si el texto no trae al menos 6 dígitos
+        (sin esto, una lectura vacía se normalizaba a '000000').
+        """
+        placa = self._normalizar_placa(texto)
+        if sum(c.isdigit() for c in texto) < 6 or not self._validar_formato_placa(placa):
+            return None
+        return placa
+    
+    def _config_ocr(self, psm):
+        """Configuración de tesseract: solo dígitos con el modo de página `psm`"""
+        return f'--psm {psm} --oem 3 -c tessedit_char_whitelist=0123456789'
+    
+    def _mosaico_recortes(self, gray, candidatos, alto=64, margen=16):
+        """
+        Une los recortes de las placas candidatas en una sola imagen binarizada,
+        uno debajo del otro y normalizados a `alto` px, para una sola llamada OCR.
+        """
+        filas = []
+        for x, y, w, h in candidatos:
+            recorte = gray[y:y+h, x:x+w]
+            ancho = max(1, round(w * alto / h))
+            recorte = cv2.resize(recorte, (ancho, alto), interpolation=cv2.INTER_LINEAR)
+            _, recorte = cv2.threshold(recorte, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+            filas.append(recorte)
+        
+        ancho_total = max(f.shape[1] for f in filas) + 2 * margen
+        alto_total = len(filas) * (alto + margen) + margen
+        mosaico = np.full((alto_total, ancho_total), 255, dtype=np.uint8)
+        for i, fila in enumerate(filas):
+            y = margen + i * (alto + margen)
+            mosaico[y:y+alto, margen:margen+fila.shape[1]] = fila
+        return mosaico
+    
+    def _ocr_recortes(self, gray, candidatos):
+        """OCR de todos los candidatos en una llamada; retorna la primera placa válida"""
+        mosaico = self._mosaico_recortes(gray, candidatos)
+        texto = pytesseract.image_to_string(mosaico, config=self._config_ocr(6))
+        
+        # Una línea por recorte, en el orden de los candidatos
+        for linea in texto.splitlines():
+            digitos = ''.join(c for c in linea if c.isdigit())
+            if len(digitos) == 6:
+                return digitos
+        return None
+    
+    def _registrar_etapa(self, etapa, inicio, acierto):
+        """Registra la duración y el resultado de una etapa de la cascada OCR"""
+        duracion = time.perf_counter() - inicio
+        with self._lock_etapas:
+            stats = self._etapas_ocr.setdefault(
+                etapa, {'llamadas': 0, 'aciertos': 0, 'tiempos': deque(maxlen=200)}
+            )
+            stats['llamadas'] += 1
+            stats['aciertos'] += int(acierto)
+            stats['tiempos'].append(duracion)
+    
     def _ocr_alternativo(self, frame):
         """Intenta OCR con diferentes preprocessamientos"""
         try:
@@ -390,17 +566,17 @@ class DetectorPlacas:
             
             # Intentar con threshold simple
             _, thresh1 = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-            config_ocr = '--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789'
+            config_ocr = self._config_ocr(7)
             texto1 = pytesseract.image_to_string(thresh1, config=config_ocr)
-            placa1 = self._normalizar_placa(texto1)
-            if self._validar_formato_placa(placa1):
+            placa1 = self._placa_de_texto(texto1)
+            if placa1:
                 return placa1
             
             # Intentar con inversión
             _, thresh2 = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV)
             texto2 = pytesseract.image_to_string(thresh2, config=config_ocr)
-            placa2 = self._normalizar_placa(texto2)
-            if self._validar_formato_placa(placa2):
+            placa2 = self._placa_de_texto(texto2)
+            if placa2:
                 return placa2
             
             return None
@@ -409,11 +585,13 @@ class DetectorPlacas:
             print(f"Error en OCR alternativo: {e}")
             return None
     
-    def _detectar_region_placa(self, gray):
+    def _candidatos_placa(self, gray, escala=1.0):
         """
-        Intenta detectar la región de la placa en la imagen.
-        Retorna la región recortada o None si no se encuentra.
+        Busca rectángulos con proporción de placa.
+        `escala` ajusta el tamaño mínimo si la imagen fue reducida.
+        Retorna una lista de (x, y, w, h), del contorno más grande al más pequeño.
         """
+        candidatos = []
         try:
             # Aplicar detección de bordes
             edges = cv2.Canny(gray, 50, 200)
@@ -437,16 +615,13 @@ class DetectorPlacas:
                     aspect_ratio = w / float(h)
                     
                     # Placas típicamente tienen aspect ratio entre 2:1 y 5:1
-                    if 2.0 <= aspect_ratio <= 5.0 and w > 100 and h > 20:
-                        # Recortar región
-                        placa_region = gray[y:y+h, x:x+w]
-                        return placa_region
-            
-            return None
+                    if 2.0 <= aspect_ratio <= 5.0 and w > 100 * escala and h > 20 * escala:
+                        candidatos.append((x, y, w, h))
             
         except Exception as e:
             print(f"Error detectando región de placa: {e}")
-            return None
+        
+        return candidatos
     
     def obtener_frame_actual(self):
         """Obtiene el frame actual de la cámara"""
@@ -454,7 +629,7 @@ class DetectorPlacas:
     
     def obtener_placas_autorizadas(self):
         """Obtiene la lista de placas autorizadas"""
-        return sorted(list(self.placas_autorizadas))
+        return self.placas.listar()
     
     def set_callback_notificacion(self, callback):
         """
@@ -471,6 +646,30 @@ class DetectorPlacas:
             return self.cola_eventos.get_nowait()
         except queue.Empty:
             return None
+    
+    def obtener_estadisticas(self):
+        """Obtiene estadísticas de detección y del pool OCR (latencias en ms)"""
+        return {
+            'estado': self.estado,
+            'movimientos_detectados': self.movimientos_detectados,
+            'analisis_realizados': self.analisis_realizados,
+            'frames_ocr': self.frames_ocr,
+            'seguimiento': self.seguidor.estadisticas(),
+            'ocr': self.pool_ocr.estadisticas() if self.pool_ocr is not None else None,
+            'etapas_ocr': self.obtener_tiempos_etapas()
+        }
+    
+    def obtener_tiempos_etapas(self):
+        """Llamadas, aciertos y percentiles (ms) de cada etapa de la cascada OCR"""
+        with self._lock_etapas:
+            return {
+                etapa: {
+                    'llamadas': stats['llamadas'],
+                    'aciertos': stats['aciertos'],
+                    'tiempo_ms': percentiles_ms(stats['tiempos'])
+                }
+                for etapa, stats in self._etapas_ocr.items()
+            }
 
 
 # Función de prueba
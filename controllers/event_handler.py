@@ -101,17 +101,15 @@ class DeviceEventHandler:
         # Crear mensaje de pánico
         message = self._create_panic_message(zone, current_user, data)
 
-        # Enviar al número de emergencia
-        success, result = self.telegram_bot.send_message(
+        # Enviar al número de emergencia (en segundo plano)
+        future = self.telegram_bot.send_message_async(
             emergency_chat_id,
             message,
             parse_mode='HTML'
         )
-
-        if success:
-            print(f"Alerta de pánico enviada al número de emergencia")
-        else:
-            print(f"Error enviando alerta de pánico: {result}")
+        future.add_done_callback(
+            lambda f: self._report_result(f, "Alerta de pánico enviada al número de emergencia")
+        )
 
     def _handle_normal_event(self, hardware_id, event_type, zone, data, current_user):
         """Maneja eventos normales (envía al número principal del usuario)"""
@@ -124,14 +122,20 @@ class DeviceEventHandler:
         # Generar y enviar mensaje
         message = self._create_normal_message(hardware_id, event_type, zone, data)
 
-        success, result = self.telegram_bot.send_message(
+        future = self.telegram_bot.send_message_async(
             chat_id,
             message,
             parse_mode='HTML'
         )
+        future.add_done_callback(
+            lambda f: self._report_result(f, f"Notificacion enviada a {current_user} - {hardware_id}:{event_type}")
+        )
 
+    def _report_result(self, future, success_message):
+        """Informa el resultado de un envío asíncrono"""
+        success, result = future.result()
         if success:
-            print(f"Notificacion enviada a {current_user} - {hardware_id}:{event_type}")
+            print(success_message)
         else:
             print(f"Error enviando notificacion: {result}")
 
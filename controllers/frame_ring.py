@@ -0,0 +1,75 @@
+"""
+Buffer circular de fotogramas preasignado
+La cámara escribe directamente en el siguiente slot (VideoCapture.read(image=...))
+y los consumidores reciben vistas de solo lectura, sin copias por fotograma.
+"""
+
+import threading
+import numpy as np
+
+
+class FrameRing:
+    """
+    Anillo de `capacidad` fotogramas con número de secuencia.
+
+    El productor pide `siguiente_slot()`, lee la cámara sobre ese arreglo y
+    llama `publicar()`. Mientras se escribe el slot siguiente, los últimos
+    `capacidad - 1` fotogramas publicados permanecen intactos; `vigente(seq)`
+    indica si un fotograma entregado todavía no ha sido sobrescrito.
+    """
+
+    def __init__(self, capacidad=4, forma=(720, 1280, 3), dtype=np.uint8):
+        if capacidad < 2:
+            raise ValueError("El anillo necesita al menos 2 slots")
+        self.capacidad = capacidad
+        self._slots = [np.empty(forma, dtype=dtype) for _ in range(capacidad)]
+        self.secuencia = 0  # Secuencia del último fotograma publicado (0 = ninguno)
+        self._lock = threading.Lock()
+
+    def siguiente_slot(self):
+        """Arreglo donde el productor debe escribir el próximo fotograma"""
+        return self._slots[(self.secuencia + 1) % self.capacidad]
+
+    def publicar(self, frame):
+        """
+        Publica el fotograma recién escrito y retorna su número de secuencia.
+        Si la cámara entregó otro arreglo (p. ej. cambió la resolución), ese
+        arreglo pasa a ocupar el slot para las siguientes lecturas.
+        """
+        with self._lock:
+            indice = (self.secuencia + 1) % self.capacidad
+            if frame is not self._slots[indice]:
+                self._slots[indice] = frame
+            self.secuencia += 1
+            return self.secuencia
+
+    def _vista(self, indice):
+        vista = self._slots[indice].view()
+        vista.flags.writeable = False
+        return vista
+
+    def vigente(self, seq):
+        """True si el fotograma `seq` sigue disponible sin sobrescribir"""
+        return 0 < seq and self.secuencia - seq < self.capacidad - 1
+
+    def ultimo(self):
+        """
+        Retorna (secuencia, vista de solo lectura) del último fotograma,
+        o (0, None) si aún no hay ninguno.
+        """
+        with self._lock:
+            if self.secuencia == 0:
+                return 0, None
+            return self.secuencia, self._vista(self.secuencia % self.capacidad)
+
+    def obtener(self, seq):
+        """Vista de solo lectura del fotograma `seq`, o None si ya fue sobrescrito"""
+        with self._lock:
+            if not self.vigente(seq):
+                return None
+            return self._vista(seq % self.capacidad)
+
+    def reiniciar(self):
+        """Descarta los fotogramas publicados (conserva la memoria)"""
+        with self._lock:
+            self.secuencia = 0
@@ -0,0 +1,196 @@
+"""
+Fuentes de fotogramas intercambiables para los detectores de cámara
+Permiten reproducir un video, una carpeta de JPEG (p. ej. capturas_placas/)
+o una secuencia sintética con la misma interfaz que cv2.VideoCapture, para
+medir y probar los detectores sin hardware.
+"""
+
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """
+    Base de las fuentes reproducidas. Imita la parte de cv2.VideoCapture que
+    usan los detectores: isOpened(), read(image=None), set(), release().
+
+    - tiempo_real=True: entrega los fotogramas al ritmo de `fps`
+    - tiempo_real=False: tan rápido como los pida el consumidor
+    """
+
+    def __init__(self, fps=30, tiempo_real=True, repetir=False, tamano=(1280, 720)):
+        self.fps = fps
+        self.tiempo_real = tiempo_real
+        self.repetir = repetir
+        self.tamano = tamano
+        self.frames_entregados = 0
+        self.agotada = False
+        self._abierta = True
+        self._proximo = None
+
+    # Interfaz compatible con cv2.VideoCapture
+
+    def isOpened(self):
+        return self._abierta
+
+    def set(self, propiedad, valor):
+        """Las propiedades de captura no aplican a una reproducción"""
+        return False
+
+    def release(self):
+        self._abierta = False
+
+    def read(self, image=None):
+        """Retorna (ret, frame) como cv2.VideoCapture.read"""
+        if not self._abierta or self.agotada:
+            return False, None
+
+        frame = self._siguiente()
+        if frame is None and self.repetir and self.frames_entregados:
+            self._reiniciar()
+            frame = self._siguiente()
+        if frame is None:
+            self.agotada = True
+            return False, None
+
+        if frame.shape[1::-1] != tuple(self.tamano):
+            frame = cv2.resize(frame, self.tamano)
+
+        self._esperar_turno()
+        self.frames_entregados += 1
+
+        # Escribir sobre el arreglo del consumidor si es compatible (p. ej. FrameRing)
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def _esperar_turno(self):
+        """En tiempo real, espera hasta el instante del siguiente fotograma"""
+        if not self.tiempo_real:
+            return
+        ahora = time.perf_counter()
+        if self._proximo is None:
+            self._proximo = ahora
+        elif self._proximo > ahora:
+            time.sleep(self._proximo - ahora)
+        self._proximo = max(self._proximo, ahora) + 1 / self.fps
+
+    # A implementar por cada fuente
+
+    def _siguiente(self):
+        """Retorna el siguiente fotograma BGR o None al terminar"""
+        raise NotImplementedError
+
+    def _reiniciar(self):
+        """Vuelve al primer fotograma"""
+        raise NotImplementedError
+
+
+class VideoFileSource(FrameSource):
+    """Reproduce un archivo de video"""
+
+    def __init__(self, ruta, **kwargs):
+        self.ruta = str(ruta)
+        self._captura = cv2.VideoCapture(self.ruta)
+        if "fps" not in kwargs:
+            kwargs["fps"] = self._captura.get(cv2.CAP_PROP_FPS) or 30
+        super().__init__(**kwargs)
+        self._abierta = self._captura.isOpened()
+
+    def _siguiente(self):
+        ret, frame = self._captura.read()
+        return frame if ret else None
+
+    def _reiniciar(self):
+        self._captura.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        self._captura.release()
+
+
+class ImageFolderSource(FrameSource):
+    """Reproduce en orden los JPEG de una carpeta (p. ej. capturas_fotogramas/)"""
+
+    def __init__(self, carpeta, patron="*.jpg", **kwargs):
+        super().__init__(**kwargs)
+        self.carpeta = Path(carpeta)
+        self.archivos = sorted(self.carpeta.glob(patron))
+        self._indice = 0
+        self._abierta = bool(self.archivos)
+
+    def _siguiente(self):
+        while self._indice < len(self.archivos):
+            frame = cv2.imread(str(self.archivos[self._indice]))
+            self._indice += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _reiniciar(self):
+        self._indice = 0
+
+
+class SyntheticSource(FrameSource):
+    """
+    Genera una escena sintética: un "vehículo" con placa que cruza el cuadro
+    cada `periodo` fotogramas, con pausas sin movimiento entre pasadas.
+    """
+
+    def __init__(self, total_frames=300, placa="123456", periodo=60, **kwargs):
+        super().__init__(**kwargs)
+        self.total_frames = total_frames
+        self.placa = placa
+        self.periodo = periodo
+        self._indice = 0
+        ancho, alto = self.tamano
+        self._fondo = np.full((alto, ancho, 3), 90, dtype=np.uint8)
+        cv2.rectangle(self._fondo, (0, int(alto * 0.75)), (ancho, alto), (60, 60, 60), -1)
+
+    def _siguiente(self):
+        if self._indice >= self.total_frames:
+            return None
+        fase = self._indice % self.periodo
+        self._indice += 1
+
+        frame = self._fondo.copy()
+        # El vehículo cruza durante la primera mitad del periodo
+        if fase < self.periodo // 2:
+            ancho, alto = self.tamano
+            avance = fase / (self.periodo // 2)
+            x = int(-400 + avance * (ancho + 400))
+            y = int(alto * 0.35)
+            cv2.rectangle(frame, (x, y), (x + 400, y + 220), (40, 40, 160), -1)
+            # Placa: rectángulo blanco con 6 dígitos
+            px, py = x + 110, y + 140
+            cv2.rectangle(frame, (px, py), (px + 180, py + 60), (255, 255, 255), -1)
+            cv2.rectangle(frame, (px, py), (px + 180, py + 60), (0, 0, 0), 2)
+            cv2.putText(frame, self.placa, (px + 12, py + 45),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3)
+        return frame
+
+    def _reiniciar(self):
+        self._indice = 0
+
+
+def abrir_fuente(origen, **kwargs):
+    """
+    Crea la fuente adecuada para `origen`:
+    - int: índice de cámara (cv2.VideoCapture)
+    - "sintetico": SyntheticSource
+    - carpeta: ImageFolderSource
+    - archivo: VideoFileSource
+    """
+    if isinstance(origen, int):
+        return cv2.VideoCapture(origen)
+    if isinstance(origen, FrameSource):
+        return origen
+    if str(origen) == "sintetico":
+        return SyntheticSource(**kwargs)
+    if Path(origen).is_dir():
+        return ImageFolderSource(origen, **kwargs)
+    return VideoFileSource(origen, **kwargs)
@@ -0,0 +1,130 @@
+"""
+Pool acotado de trabajadores para análisis OCR
+Un número fijo de threads consume una cola de capacidad limitada. Si la cola
+está llena se descarta el trabajo más antiguo (el frame más viejo ya no
+interesa), de modo que una puerta con tráfico constante no puede lanzar
+procesos de tesseract sin límite.
+"""
+
+import threading
+import time
+from collections import deque
+
+from utils.estadisticas import percentiles_ms
+
+
+class PoolOCR:
+    """
+    Ejecuta `procesar(trabajo)` en `trabajadores` threads fijos.
+
+    - enviar(): encola un trabajo; con la cola llena descarta el más antiguo
+    - estadisticas(): contadores y percentiles de latencia (espera + proceso)
+    - detener(): termina los threads, opcionalmente descartando lo pendiente
+    """
+
+    def __init__(self, procesar, trabajadores=2, capacidad=4, muestras_latencia=200):
+        if trabajadores < 1 or capacidad < 1:
+            raise ValueError("El pool necesita al menos 1 trabajador y 1 lugar en cola")
+        self.procesar = procesar
+        self.trabajadores = trabajadores
+        self.capacidad = capacidad
+
+        self._cola = deque()
+        self._condicion = threading.Condition()
+        self._activo = True
+
+        # Estadísticas
+        self.enviados = 0
+        self.procesados = 0
+        self.descartados = 0
+        self.errores = 0
+        self._en_proceso = 0
+        self._latencias = deque(maxlen=muestras_latencia)    # Desde que se encola (s)
+        self._duraciones = deque(maxlen=muestras_latencia)   # Solo el procesamiento (s)
+
+        self._threads = [
+            threading.Thread(target=self._trabajar, name=f"ocr-{i}", daemon=True)
+            for i in range(trabajadores)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def enviar(self, *args):
+        """
+        Encola un trabajo. Retorna False si el pool está detenido.
+        Con la cola llena se descarta el trabajo más antiguo pendiente.
+        """
+        with self._condicion:
+            if not self._activo:
+                return False
+            if len(self._cola) >= self.capacidad:
+                self._cola.popleft()
+                self.descartados += 1
+            self._cola.append((time.perf_counter(), args))
+            self.enviados += 1
+            self._condicion.notify()
+            return True
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while self._activo and not self._cola:
+                    self._condicion.wait()
+                if not self._cola:
+                    return
+                encolado, args = self._cola.popleft()
+                self._en_proceso += 1
+
+            inicio = time.perf_counter()
+            try:
+                self.procesar(*args)
+            except Exception as e:
+                print(f"❌ Error en trabajador OCR: {e}")
+                with self._condicion:
+                    self.errores += 1
+            fin = time.perf_counter()
+
+            with self._condicion:
+                self._en_proceso -= 1
+                self.procesados += 1
+                self._latencias.append(fin - encolado)
+                self._duraciones.append(fin - inicio)
+                self._condicion.notify_all()
+
+    def esperar(self, timeout=None):
+        """Espera a que la cola se vacíe y no haya trabajos en proceso"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicion:
+            while self._cola or self._en_proceso:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+            return True
+
+    def detener(self, descartar_pendientes=True, timeout=2.0):
+        """Detiene los trabajadores; por defecto descarta lo que quede en cola"""
+        with self._condicion:
+            self._activo = False
+            if descartar_pendientes:
+                self.descartados += len(self._cola)
+                self._cola.clear()
+            self._condicion.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def estadisticas(self):
+        """Contadores del pool y percentiles de latencia en ms"""
+        with self._condicion:
+            return {
+                'trabajadores': self.trabajadores,
+                'capacidad': self.capacidad,
+                'pendientes': len(self._cola),
+                'en_proceso': self._en_proceso,
+                'enviados': self.enviados,
+                'procesados': self.procesados,
+                'descartados': self.descartados,
+                'errores': self.errores,
+                'latencia_ms': percentiles_ms(self._latencias),
+                'ocr_ms': percentiles_ms(self._duraciones),
+            }
@@ -0,0 +1,101 @@
+"""
+Coincidencia aproximada de placas tolerante a confusiones del OCR
+Las placas tienen largo fijo (6 dígitos), así que en vez de un árbol aparte
+se generan las variantes de la lectura dentro de un presupuesto de costo
+(distancia de Hamming ponderada por una matriz de confusión) y cada variante
+se consulta en O(1) contra el almacén de placas. No hay índice que mantener
+cuando el almacén se recarga.
+"""
+
+from itertools import combinations
+
+DIGITOS = "0123456789"
+
+# Costo de leer un dígito por otro (simétrico). Lo no listado cuesta 1.0.
+CONFUSIONES_OCR = {
+    ('8', '3'): 0.4, ('8', '0'): 0.4, ('1', '7'): 0.4, ('5', '6'): 0.4,
+    ('6', '8'): 0.5, ('9', '8'): 0.5, ('0', '6'): 0.5, ('5', '8'): 0.5,
+    ('2', '7'): 0.6, ('0', '9'): 0.6, ('4', '1'): 0.6, ('3', '9'): 0.6,
+}
+
+
+class IndiceDifuso:
+    """
+    Busca placas autorizadas cercanas a una lectura OCR.
+
+    - contiene(placa) -> bool: consulta O(1) (p. ej. AlmacenPlacas.autorizada)
+    - registrada(placa) -> bool: la placa existe aunque no esté vigente
+      (p. ej. AlmacenPlacas.registrada). Si la lectura es una placa
+      registrada se decide por su propia vigencia y no se buscan vecinas:
+      una visita vencida leída bien no debe pasar por una placa parecida.
+    - costo_maximo: suma máxima de costos de sustitución aceptada
+    - max_sustituciones: distancia de Hamming máxima (k)
+    """
+
+    def __init__(self, contiene, costo_maximo=0.8, max_sustituciones=2, confusiones=None,
+                 registrada=None):
+        self.contiene = contiene
+        self.registrada = registrada
+        self.costo_maximo = costo_maximo
+        self.max_sustituciones = max_sustituciones
+
+        confusiones = CONFUSIONES_OCR if confusiones is None else confusiones
+        costos = {}
+        for (a, b), costo in confusiones.items():
+            costos[(a, b)] = costos[(b, a)] = costo
+
+        # Por cada dígito: sustituciones posibles ordenadas por costo, ya
+        # filtradas por el presupuesto
+        self._sustituciones = {
+            d: sorted(
+                ((otro, costos.get((d, otro), 1.0)) for otro in DIGITOS if otro != d),
+                key=lambda s: s[1]
+            )
+            for d in DIGITOS
+        }
+        for d, opciones in self._sustituciones.items():
+            self._sustituciones[d] = [s for s in opciones if s[1] <= self.costo_maximo]
+
+    def buscar(self, placa, limite=3):
+        """
+        Placas autorizadas a distancia ponderada <= costo_maximo.
+        Retorna lista de (placa, costo) ordenada por costo (la exacta con costo 0).
+        """
+        if self.contiene(placa):
+            return [(placa, 0.0)]
+        if self.registrada is not None and self.registrada(placa):
+            return []  # Placa conocida fuera de su vigencia
+
+        encontradas = {}
+        posiciones = range(len(placa))
+        for k in range(1, self.max_sustituciones + 1):
+            for elegidas in combinations(posiciones, k):
+                self._variantes(placa, elegidas, 0, list(placa), 0.0, encontradas)
+        return sorted(encontradas.items(), key=lambda e: (e[1], e[0]))[:limite]
+
+    def _variantes(self, placa, posiciones, i, actual, costo, encontradas):
+        """Recorre las sustituciones en `posiciones` sin pasar el presupuesto"""
+        if i == len(posiciones):
+            candidata = ''.join(actual)
+            if self.contiene(candidata) and costo < encontradas.get(candidata, float('inf')):
+                encontradas[candidata] = round(costo, 3)
+            return
+        pos = posiciones[i]
+        for digito, costo_sustitucion in self._sustituciones.get(placa[pos], ()):
+            if costo + costo_sustitucion > self.costo_maximo:
+                break  # Ordenadas por costo: las siguientes tampoco caben
+            actual[pos] = digito
+            self._variantes(placa, posiciones, i + 1, actual, costo + costo_sustitucion, encontradas)
+        actual[pos] = placa[pos]
+
+    def mejor(self, placa):
+        """
+        Placa autorizada más cercana, o None si no hay ninguna o si hay un
+        empate entre dos distintas (lectura ambigua).
+        """
+        resultados = self.buscar(placa, limite=2)
+        if not resultados:
+            return None
+        if len(resultados) > 1 and resultados[0][1] == resultados[1][1]:
+            return None
+        return resultados[0]
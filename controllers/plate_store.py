@@ -0,0 +1,325 @@
+"""
+Almacén de placas autorizadas con recarga en caliente
+- Búsqueda O(1) (diccionario placa -> vigencia)
+- Cada alta/baja se agrega a un journal (una línea JSON); el archivo
+  principal solo se reescribe al compactar, de forma atómica
+- Un thread vigila el mtime del archivo y del journal y recarga si otro
+  proceso los modificó
+- Cada placa puede tener una ventana de vigencia (p. ej. visitas de hoy)
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _a_timestamp(valor):
+    """datetime, ISO string, epoch o None -> epoch (float) o None"""
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, datetime):
+        return valor.timestamp()
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    return datetime.fromisoformat(valor).timestamp()
+
+
+def _a_iso(timestamp):
+    return None if timestamp is None else datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+@contextlib.contextmanager
+def _bloqueo_exclusivo(ruta):
+    """Bloqueo entre procesos sobre el archivo `ruta` (se crea si no existe)"""
+    with open(ruta, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def fin_del_dia(momento=None):
+    """Último segundo del día de `momento` (hoy por defecto)"""
+    momento = momento or datetime.now()
+    return momento.replace(hour=23, minute=59, second=59, microsecond=0)
+
+
+class AlmacenPlacas:
+    """
+    Placas autorizadas persistidas en `archivo` (JSON) + `archivo`.journal.
+
+    Formato del archivo principal (compatible con el anterior):
+        {"placas_autorizadas": [...], "vigencias": {"123456": {"desde": ISO, "hasta": ISO}}}
+    Cada línea del journal:
+        {"op": "agregar", "placa": "...", "desde": ISO|null, "hasta": ISO|null}
+        {"op": "eliminar", "placa": "..."}
+
+    Las escrituras al journal y la compactación toman un bloqueo sobre
+    `archivo`.lock, así varios procesos pueden compartir el almacén sin
+    que una compactación borre líneas que otro acaba de agregar.
+    """
+
+    def __init__(self, archivo, placas_iniciales=(), max_journal=1000, intervalo_vigilancia=2.0):
+        self.archivo = Path(archivo)
+        self.archivo_journal = self.archivo.with_name(self.archivo.name + ".journal")
+        self.archivo_bloqueo = self.archivo.with_name(self.archivo.name + ".lock")
+        self.max_journal = max_journal
+        self.intervalo_vigilancia = intervalo_vigilancia
+
+        # placa -> (desde, hasta) en epoch, o None si es permanente
+        self._placas = {}
+        self._lineas_journal = 0
+        self._firma = None  # mtimes/tamaños vistos la última vez
+        self._lock = threading.Lock()
+
+        self._thread_vigilancia = None
+        self._detener_vigilancia = threading.Event()
+
+        if not self.archivo.exists():
+            self._crear_inicial(placas_iniciales)
+        self.recargar()
+
+    # Persistencia
+
+    def _crear_inicial(self, placas):
+        try:
+            self._escribir_snapshot({placa: None for placa in placas})
+            print(f"✅ Archivo de placas creado: {self.archivo}")
+        except Exception as e:
+            print(f"Error creando archivo de placas: {e}")
+
+    def _firma_actual(self):
+        firma = []
+        for ruta in (self.archivo, self.archivo_journal):
+            try:
+                stat = ruta.stat()
+                firma.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                firma.append(None)
+        return tuple(firma)
+
+    def _leer(self):
+        """Lee archivo + journal y retorna (placas, líneas de journal)"""
+        placas = {}
+        if self.archivo.exists():
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            vigencias = data.get('vigencias', {})
+            for placa in data.get('placas_autorizadas', []):
+                vigencia = vigencias.get(placa)
+                placas[placa] = (
+                    (_a_timestamp(vigencia.get('desde')), _a_timestamp(vigencia.get('hasta')))
+                    if vigencia else None
+                )
+
+        lineas = 0
+        if self.archivo_journal.exists():
+            with open(self.archivo_journal, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    try:
+                        entrada = json.loads(linea)
+                    except json.JSONDecodeError:
+                        # Línea incompleta (p. ej. el proceso murió escribiendo)
+                        continue
+                    self._aplicar(placas, entrada)
+                    lineas += 1
+        return placas, lineas
+
+    @staticmethod
+    def _aplicar(placas, entrada):
+        placa = entrada.get('placa')
+        if entrada.get('op') == 'agregar':
+            desde, hasta = _a_timestamp(entrada.get('desde')), _a_timestamp(entrada.get('hasta'))
+            placas[placa] = (desde, hasta) if desde is not None or hasta is not None else None
+        elif entrada.get('op') == 'eliminar':
+            placas.pop(placa, None)
+
+    def _escribir_snapshot(self, placas):
+        """Escribe el archivo principal de forma atómica (temporal + os.replace)"""
+        data = {
+            'placas_autorizadas': sorted(placas),
+            'vigencias': {
+                placa: {'desde': _a_iso(vigencia[0]), 'hasta': _a_iso(vigencia[1])}
+                for placa, vigencia in sorted(placas.items()) if vigencia
+            }
+        }
+        # Nombre temporal único: dos procesos compactando no se pisan el archivo
+        fd, temporal = tempfile.mkstemp(dir=self.archivo.parent, prefix=self.archivo.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.archivo)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temporal)
+            raise
+
+    def _agregar_al_journal(self, entrada):
+        with _bloqueo_exclusivo(self.archivo_bloqueo):
+            # Si otro proceso escribió desde la última carga, tomar la firma
+            # después de agregar ocultaría su cambio a la recarga en caliente
+            ajeno = self._firma_actual() != self._firma
+            with open(self.archivo_journal, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            if ajeno:
+                # Releer incluye la línea propia recién escrita
+                self._placas, self._lineas_journal = self._leer()
+            else:
+                self._lineas_journal += 1
+            if self._lineas_journal >= self.max_journal:
+                self._compactar_bloqueado()
+            self._firma = self._firma_actual()
+
+    def _compactar_locked(self):
+        with _bloqueo_exclusivo(self.archivo_bloqueo):
+            self._compactar_bloqueado()
+
+    def _compactar_bloqueado(self):
+        """
+        Compacta con el bloqueo entre procesos tomado: relee archivo y
+        journal (incluidas las líneas de otros procesos), escribe el
+        snapshot y recién entonces vacía el journal.
+        """
+        placas, _ = self._leer()
+        self._escribir_snapshot(placas)
+        with contextlib.suppress(FileNotFoundError):
+            self.archivo_journal.unlink()
+        self._placas = placas
+        self._lineas_journal = 0
+        self._firma = self._firma_actual()
+
+    def compactar(self):
+        """Vuelca el estado al archivo principal y vacía el journal"""
+        with self._lock:
+            try:
+                self._compactar_locked()
+            except Exception as e:
+                print(f"Error compactando placas: {e}")
+
+    def recargar(self, forzar=True):
+        """
+        Relee archivo + journal y reemplaza el diccionario de una sola vez.
+        Con forzar=False solo recarga si cambió algún mtime/tamaño.
+        Retorna True si recargó.
+        """
+        # Bajo el lock para no perder un cambio propio escrito durante la lectura;
+        # las búsquedas no toman el lock y siguen usando el diccionario anterior
+        with self._lock:
+            firma = self._firma_actual()
+            if not forzar and firma == self._firma:
+                return False
+            try:
+                placas, lineas = self._leer()
+            except Exception as e:
+                print(f"Error cargando placas: {e}")
+                return False
+            self._placas = placas
+            self._lineas_journal = lineas
+            self._firma = firma
+        return True
+
+    # Vigilancia en segundo plano
+
+    def iniciar_vigilancia(self):
+        """Inicia el thread que recarga el almacén si el archivo cambia"""
+        if self._thread_vigilancia is not None and self._thread_vigilancia.is_alive():
+            return
+        self._detener_vigilancia.clear()
+        self._thread_vigilancia = threading.Thread(target=self._loop_vigilancia, daemon=True)
+        self._thread_vigilancia.start()
+
+    def detener_vigilancia(self):
+        self._detener_vigilancia.set()
+        if self._thread_vigilancia is not None:
+            self._thread_vigilancia.join(timeout=2.0)
+            self._thread_vigilancia = None
+
+    def _loop_vigilancia(self):
+        while not self._detener_vigilancia.wait(self.intervalo_vigilancia):
+            if self.recargar(forzar=False):
+                print(f"🔄 Placas autorizadas recargadas ({len(self)})")
+
+    # Consultas y cambios
+
+    def agregar(self, placa, desde=None, hasta=None):
+        """Autoriza una placa, opcionalmente solo entre `desde` y `hasta`"""
+        desde, hasta = _a_timestamp(desde), _a_timestamp(hasta)
+        with self._lock:
+            self._placas[placa] = (desde, hasta) if desde is not None or hasta is not None else None
+            try:
+                self._agregar_al_journal({
+                    'op': 'agregar', 'placa': placa,
+                    'desde': _a_iso(desde), 'hasta': _a_iso(hasta)
+                })
+            except Exception as e:
+                print(f"Error guardando placas: {e}")
+
+    def agregar_visita(self, placa, dias=1):
+        """Autoriza una placa desde ahora hasta el final del día (o de `dias` días)"""
+        self.agregar(placa, datetime.now(), fin_del_dia(datetime.now() + timedelta(days=dias - 1)))
+
+    def eliminar(self, placa):
+        """Quita una placa. Retorna False si no estaba registrada"""
+        with self._lock:
+            if placa not in self._placas:
+                return False
+            del self._placas[placa]
+            try:
+                self._agregar_al_journal({'op': 'eliminar', 'placa': placa})
+            except Exception as e:
+                print(f"Error guardando placas: {e}")
+            return True
+
+    def registrada(self, placa):
+        """True si la placa está en el almacén, vigente o no"""
+        return placa in self._placas
+
+    def autorizada(self, placa, momento=None):
+        """True si la placa está registrada y vigente en `momento` (ahora por defecto)"""
+        vigencia = self._placas.get(placa, False)
+        if vigencia is None:
+            return True
+        if vigencia is False:
+            return False
+        momento = time.time() if momento is None else _a_timestamp(momento)
+        desde, hasta = vigencia
+        return (desde is None or desde <= momento) and (hasta is None or momento <= hasta)
+
+    def vigencia(self, placa):
+        """(desde, hasta) como datetime o None si es permanente / no existe"""
+        vigencia = self._placas.get(placa)
+        if not vigencia:
+            return None
+        return tuple(None if t is None else datetime.fromtimestamp(t) for t in vigencia)
+
+    def listar(self):
+        """Todas las placas registradas (vigentes o no), ordenadas"""
+        return sorted(self._placas)
+
+    def __contains__(self, placa):
+        return self.autorizada(placa)
+
+    def __len__(self):
+        return len(self._placas)
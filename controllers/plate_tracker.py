@@ -0,0 +1,158 @@
+"""
+Seguimiento de placas por pasada de vehículo
+Junta las lecturas OCR de un mismo vehículo, vota carácter por carácter y
+confirma una sola placa por pasada. Las placas confirmadas se recuerdan
+durante un TTL para no repetir notificaciones del mismo vehículo.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import NamedTuple, Any
+
+
+class PlacaConfirmada(NamedTuple):
+    """Resultado de una pasada: placa votada, mejor frame y número de lecturas"""
+    placa: str
+    frame: Any
+    lecturas: int
+
+
+class SeguidorPlacas:
+    """
+    Agrupa lecturas en pasadas y confirma una placa por pasada.
+
+    - Una lectura se suma a la pasada activa si llega antes de
+      `ventana_segundos` desde la anterior y difiere del consenso en a lo
+      sumo `max_diferencias` posiciones; si no, abre una pasada nueva.
+    - La pasada se confirma en cuanto junta `lecturas_minimas` lecturas con
+      mayoría estricta en cada posición, o al vencer su ventana con lo que
+      haya reunido.
+    - Una placa confirmada hace menos de `ttl_segundos` se suprime.
+    """
+
+    def __init__(self, lecturas_minimas=2, ventana_segundos=3.0, ttl_segundos=60,
+                 max_diferencias=2, reloj=time.monotonic):
+        self.lecturas_minimas = lecturas_minimas
+        self.ventana_segundos = ventana_segundos
+        self.ttl_segundos = ttl_segundos
+        self.max_diferencias = max_diferencias
+        self.reloj = reloj
+
+        self._lock = threading.Lock()
+        self._votos = None          # Counter por posición de la pasada activa
+        self._lecturas = []         # (placa, frame) de la pasada activa
+        self._ultima_lectura = 0
+        self._confirmada = False
+        self._recientes = {}        # placa -> último momento confirmada
+
+        # Estadísticas
+        self.lecturas_totales = 0
+        self.pasadas_confirmadas = 0
+        self.suprimidas = 0
+
+    def _consenso(self):
+        return ''.join(votos.most_common(1)[0][0] for votos in self._votos)
+
+    def _mayoria(self):
+        """True si cada posición tiene un carácter con más de la mitad de los votos"""
+        total = len(self._lecturas)
+        return all(votos.most_common(1)[0][1] * 2 > total for votos in self._votos)
+
+    def _cerrar(self, ahora):
+        """
+        Cierra la pasada activa. Retorna la PlacaConfirmada, o None si no hay
+        lecturas, ya fue confirmada o está dentro del TTL.
+        """
+        resultado = None
+        if self._lecturas and not self._confirmada:
+            placa = self._consenso()
+            # Frame de la lectura que coincide con el consenso (o la última)
+            frame = next(
+                (f for p, f in reversed(self._lecturas) if p == placa),
+                self._lecturas[-1][1]
+            )
+            anterior = self._recientes.get(placa)
+            self._recientes[placa] = ahora
+            if anterior is not None and ahora - anterior < self.ttl_segundos:
+                self.suprimidas += 1
+            else:
+                self.pasadas_confirmadas += 1
+                resultado = PlacaConfirmada(placa, frame, len(self._lecturas))
+        self._confirmada = bool(self._lecturas)
+        return resultado
+
+    def _reiniciar_pasada(self):
+        self._votos = None
+        self._lecturas = []
+        self._confirmada = False
+
+    def _purgar_recientes(self, ahora):
+        vencidas = [p for p, t in self._recientes.items() if ahora - t >= self.ttl_segundos]
+        for placa in vencidas:
+            del self._recientes[placa]
+
+    def agregar_lectura(self, placa, frame=None):
+        """
+        Registra una lectura OCR de 6 caracteres.
+        Retorna la lista de placas confirmadas como resultado (0, 1 o 2 si
+        la lectura cerró una pasada anterior y confirmó la nueva).
+        """
+        confirmadas = []
+        with self._lock:
+            ahora = self.reloj()
+            self.lecturas_totales += 1
+
+            if self._lecturas:
+                vencida = ahora - self._ultima_lectura > self.ventana_segundos
+                diferencias = sum(a != b for a, b in zip(placa, self._consenso()))
+                if vencida or diferencias > self.max_diferencias:
+                    if (confirmada := self._cerrar(ahora)):
+                        confirmadas.append(confirmada)
+                    self._reiniciar_pasada()
+
+            if self._votos is None:
+                self._votos = [Counter() for _ in placa]
+            for votos, caracter in zip(self._votos, placa):
+                votos[caracter] += 1
+            self._lecturas.append((placa, frame))
+            self._ultima_lectura = ahora
+
+            # Confirmación temprana por mayoría
+            if (not self._confirmada and len(self._lecturas) >= self.lecturas_minimas
+                    and self._mayoria()):
+                if (confirmada := self._cerrar(ahora)):
+                    confirmadas.append(confirmada)
+
+            self._purgar_recientes(ahora)
+        return confirmadas
+
+    def pasadas_vencidas(self, forzar=False):
+        """
+        Cierra la pasada activa si su ventana venció (o si `forzar`).
+        Retorna la lista de placas confirmadas al cerrarla.
+        """
+        with self._lock:
+            ahora = self.reloj()
+            if not self._lecturas:
+                return []
+            if not forzar and ahora - self._ultima_lectura <= self.ventana_segundos:
+                return []
+            confirmada = self._cerrar(ahora)
+            self._reiniciar_pasada()
+            return [confirmada] if confirmada else []
+
+    def en_pasada_confirmada(self):
+        """True si la pasada activa ya fue confirmada (no hace falta más OCR)"""
+        with self._lock:
+            return (self._confirmada and
+                    self.reloj() - self._ultima_lectura <= self.ventana_segundos)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'lecturas': self.lecturas_totales,
+                'pasadas_confirmadas': self.pasadas_confirmadas,
+                'suprimidas': self.suprimidas,
+                'lecturas_en_pasada': len(self._lecturas),
+            }
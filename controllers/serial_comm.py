@@ -16,9 +16,13 @@ class SerialCommunicator:
     - Envía comandos de activación/desactivación
     """
 
-    def __init__(self, puerto="COM5", baud=115200):
+    def __init__(self, puerto="COM5", baud=115200, timeout_lectura=0.5, tam_bloque=4096):
         self.puerto = puerto
         self.baud = baud
+        # Tiempo máximo que el hilo lector queda bloqueado esperando datos
+        # antes de revisar si debe terminar (no agrega latencia a los eventos)
+        self.timeout_lectura = timeout_lectura
+        self.tam_bloque = tam_bloque
         self.queue = queue.Queue()
         self.ser = None
         self.running = False
@@ -28,7 +32,7 @@ class SerialCommunicator:
     def start(self):
         """Inicia la conexión y el hilo de lectura."""
         try:
-            self.ser = serial.Serial(self.puerto, self.baud, timeout=1)
+            self.ser = serial.Serial(self.puerto, self.baud, timeout=self.timeout_lectura)
             self.connected = True
             self.running = True
             self.thread = threading.Thread(target=self._read_loop, daemon=True)
@@ -51,20 +55,35 @@ class SerialCommunicator:
         print("✓ Conexión serial cerrada")
 
     def _read_loop(self):
-        """Ciclo de lectura en hilo separado."""
+        """
+        Ciclo de lectura en hilo separado.
+        Se bloquea en el puerto hasta que llega al menos un byte (o vence
+        timeout_lectura) y luego lee en bloque todo lo disponible, de modo que
+        una ráfaga de líneas de sensores se procesa en una sola iteración.
+        """
+        pendiente = bytearray()
         while self.running:
             try:
-                if self.ser.in_waiting > 0:
-                    raw = self.ser.readline()
-                    try:
-                        texto = raw.decode(errors="ignore").strip()
-                        if texto:
-                            self.queue.put(texto)
-                    except Exception as e:
-                        print(f"Error decodificando: {e}")
-                else:
-                    time.sleep(0.05)
+                # Bloquea hasta el primer byte; después toma lo que ya esté en el buffer
+                bloque = self.ser.read(1)
+                if not bloque:
+                    continue
+                disponibles = self.ser.in_waiting
+                if disponibles:
+                    bloque += self.ser.read(min(disponibles, self.tam_bloque))
+
+                pendiente.extend(bloque)
+                if b"\n" not in bloque:
+                    continue
+
+                *lineas, resto = pendiente.split(b"\n")
+                pendiente = bytearray(resto)
+                for raw in lineas:
+                    texto = raw.decode(errors="ignore").strip()
+                    if texto:
+                        self.queue.put(texto)
             except Exception as e:
+                pendiente.clear()
                 self.queue.put(f"ERROR_SERIAL: {repr(e)}")
                 print(f"Error en lectura serial: {e}")
                 time.sleep(1)
@@ -125,13 +144,16 @@ class SerialCommunicator:
         """Desactiva el simulador de presencia."""
         return self.send_command("CMD:DESACTIVAR:PRESENCIA")
 
-    def get_event(self):
+    def get_event(self, timeout=None):
         """
-        Obtiene un evento de la cola (no bloqueante).
+        Obtiene un evento de la cola.
+        Por defecto no bloquea; con timeout espera hasta esa cantidad de segundos.
         Retorna None si no hay eventos.
         """
         try:
-            return self.queue.get_nowait()
+            if timeout is None:
+                return self.queue.get_nowait()
+            return self.queue.get(timeout=timeout)
         except queue.Empty:
             return None
 
@@ -10,6 +10,7 @@ from controllers.BotMesajes import TelegramBot
 from controllers.event_handler import DeviceEventHandler
 from models.user_manager import UserManager
 from controllers.hardware_messages import get_message_generator
+from utils.protocol import parse_device_line
 
 
 class TelegramDeviceIntegration:
@@ -98,16 +99,13 @@ class TelegramDeviceIntegration:
             print(f"Mensaje dispositivo recibido: {raw_message}")
 
             # Parsear mensaje
-            parts = raw_message.split(":", 3)
+            mensaje = parse_device_line(raw_message)
 
-            if len(parts) < 3:
+            if mensaje is None:
                 print(f"Formato invalido: {raw_message}")
                 return
 
-            hardware_id = parts[0].strip()
-            event_type = parts[1].strip()
-            zone = parts[2].strip()
-            data = parts[3].strip() if len(parts) > 3 else ""
+            hardware_id, event_type, zone, data = mensaje
 
             # Verificar si es un dispositivo conocido
             if hardware_id not in self.message_parsers:
@@ -0,0 +1,87 @@
+"""
+Cola de salida para la API de Telegram
+Envía las peticiones desde hilos de fondo reutilizando conexiones HTTP
+(keep-alive), para que quien genera la alerta no espere la respuesta.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TelegramOutbox:
+    """
+    Pool de trabajadores con una sesión HTTP compartida.
+    Cada envío retorna un Future que se resuelve con (success, result).
+    """
+
+    def __init__(self, base_url, max_workers=4, timeout=10):
+        self.base_url = base_url
+        self.timeout = timeout
+
+        # Sesión con pool de conexiones persistentes (evita un handshake TLS por mensaje)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="telegram-outbox"
+        )
+        self._lock = threading.Lock()
+        self._cerrado = False
+
+    def call(self, method, payload=None, http_method="POST"):
+        """
+        Ejecuta un método de la API en el hilo actual.
+
+        Returns:
+            tuple (success: bool, result) - result es el campo 'result' de la
+            respuesta o un texto de error
+        """
+        url = f"{self.base_url}/{method}"
+        try:
+            if http_method == "GET":
+                response = self.session.get(url, params=payload, timeout=self.timeout)
+            else:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+
+            result = response.json()
+            return result['ok'], result.get('result', {})
+
+        except requests.exceptions.RequestException as e:
+            return False, f"Error de conexión: {e}"
+        except Exception as e:
+            return False, f"Error: {e}"
+
+    def submit(self, method, payload=None):
+        """
+        Encola un método de la API para enviarlo en segundo plano.
+
+        Returns:
+            Future que se resuelve con (success, result)
+        """
+        with self._lock:
+            if self._cerrado:
+                return completed_future((False, "Cola de Telegram cerrada"))
+            return self._executor.submit(self.call, method, payload)
+
+    def shutdown(self, wait=True):
+        """Detiene los trabajadores y cierra las conexiones"""
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+        self._executor.shutdown(wait=wait)
+        self.session.close()
+
+
+def completed_future(value):
+    """Retorna un Future ya resuelto con el valor indicado"""
+    future = Future()
+    future.set_result(value)
+    return future
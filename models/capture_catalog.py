@@ -0,0 +1,346 @@
+"""
+Catálogo indexado de capturas (SQLite)
+Cada carpeta de capturas lleva su propio catalogo.db con una fila por
+imagen. Galerías, contadores y "capturas recientes" consultan el índice en
+vez de recorrer la carpeta y hacer stat() de cada archivo.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class Captura(NamedTuple):
+    """Fila del catálogo"""
+    ruta: Path
+    timestamp: float
+    tipo: str
+    dispositivo: Optional[str]
+    placa: Optional[str]
+    bytes: int = 0
+    estado: str = "original"  # original | recomprimida
+
+
+class Archivo(NamedTuple):
+    """Paquete diario de capturas archivadas"""
+    ruta: Path
+    fecha: str      # YYYY-MM-DD
+    capturas: int
+    bytes: int
+
+
+class CatalogoCapturas:
+    """
+    Índice de las capturas de una carpeta.
+
+    Los detectores llaman registrar() al guardar cada imagen. Al abrirlo (y
+    en sincronizar_si_cambio()) se reindexa la carpeta solo si su mtime
+    cambió, p. ej. porque se copiaron o borraron imágenes por fuera; los
+    cambios que pasan por registrar()/eliminar() actualizan el mtime visto.
+    """
+
+    NOMBRE_DB = "catalogo.db"
+    CARPETA_ARCHIVO = "archivo"
+    CARPETA_MINIATURAS = ".miniaturas"  # Caché en disco de la galería
+
+    def __init__(self, carpeta):
+        self.carpeta = Path(carpeta)
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(
+            str(self.carpeta / self.NOMBRE_DB),
+            check_same_thread=False,
+            isolation_level=None  # autocommit; las transacciones se abren a mano
+        )
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS capturas (
+                archivo     TEXT PRIMARY KEY,
+                timestamp   REAL NOT NULL,
+                tipo        TEXT NOT NULL,
+                dispositivo TEXT,
+                placa       TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_capturas_ts ON capturas(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_capturas_tipo_ts ON capturas(tipo, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_capturas_disp_ts ON capturas(dispositivo, timestamp);
+            CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+            CREATE TABLE IF NOT EXISTS archivos (
+                nombre   TEXT PRIMARY KEY,
+                fecha    TEXT NOT NULL,
+                capturas INTEGER NOT NULL DEFAULT 0,
+                bytes    INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._migrar()
+        self.sincronizar_si_cambio()
+
+    def _migrar(self):
+        """Agrega columnas de versiones posteriores a catálogos existentes"""
+        columnas = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(capturas)")}
+        if "bytes" not in columnas:
+            self._conexion.execute("ALTER TABLE capturas ADD COLUMN bytes INTEGER NOT NULL DEFAULT 0")
+        if "estado" not in columnas:
+            self._conexion.execute("ALTER TABLE capturas ADD COLUMN estado TEXT NOT NULL DEFAULT 'original'")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_capturas_estado_ts ON capturas(estado, timestamp)")
+
+    def _meta(self, clave):
+        fila = self._conexion.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    @staticmethod
+    def _tipo_desde_nombre(nombre):
+        """captura_manual_* -> manual, el resto -> automatica"""
+        return "manual" if nombre.startswith("captura_manual_") else "automatica"
+
+    def _mtime_carpeta(self):
+        try:
+            return str(self.carpeta.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _recordar_mtime_carpeta(self, no_despues_de=None):
+        """
+        Guarda el mtime actual de la carpeta tras un cambio propio (el
+        archivo ya se escribió, reemplazó o borró) para que sincronizar_si_cambio() no
+        lo tome por un cambio externo. Con `no_despues_de` (ns) no se guarda
+        si la carpeta cambió después: ese cambio no fue nuestro.
+        """
+        mtime = self._mtime_carpeta()
+        if mtime is None or (no_despues_de is not None and int(mtime) > no_despues_de):
+            return
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('mtime_carpeta', ?)", (mtime,)
+        )
+
+    def sincronizar_si_cambio(self):
+        """
+        Sincroniza solo si el mtime de la carpeta (que cambia al crear o
+        borrar archivos) difiere del de la última sincronización: un stat()
+        en vez de recorrer la carpeta. Retorna (agregadas, quitadas).
+        """
+        with self._lock:
+            vista = self._meta("mtime_carpeta")
+        if vista is not None and vista == self._mtime_carpeta():
+            return 0, 0
+        return self.sincronizar()
+
+    def sincronizar(self):
+        """
+        Reconstruye el índice desde la carpeta: agrega JPEG sin registrar y
+        quita filas cuyos archivos ya no existen. Retorna (agregadas, quitadas).
+        """
+        # Antes de recorrer: un archivo creado durante el recorrido fuerza
+        # otra sincronización la próxima vez
+        mtime_carpeta = self._mtime_carpeta()
+        en_disco = {}
+        for ruta in self.carpeta.glob("*.jpg"):
+            try:
+                stat = ruta.stat()
+                en_disco[ruta.name] = (stat.st_mtime, stat.st_size)
+            except FileNotFoundError:
+                continue
+
+        with self._lock:
+            conexion = self._conexion
+            conexion.execute("BEGIN")
+            try:
+                registradas = {fila[0] for fila in conexion.execute("SELECT archivo FROM capturas")}
+                nuevas = [
+                    (nombre, mtime, self._tipo_desde_nombre(nombre), tamano)
+                    for nombre, (mtime, tamano) in en_disco.items() if nombre not in registradas
+                ]
+                faltantes = [(nombre,) for nombre in registradas - en_disco.keys()]
+                conexion.executemany(
+                    "INSERT INTO capturas (archivo, timestamp, tipo, bytes) VALUES (?, ?, ?, ?)", nuevas
+                )
+                conexion.executemany("DELETE FROM capturas WHERE archivo = ?", faltantes)
+                conexion.execute(
+                    "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('sincronizado', ?)",
+                    (str(time.time()),)
+                )
+                conexion.execute(
+                    "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('mtime_carpeta', ?)",
+                    (mtime_carpeta,)
+                )
+                conexion.execute("COMMIT")
+            except Exception:
+                conexion.execute("ROLLBACK")
+                raise
+        if nuevas or faltantes:
+            print(f"🗂️ Catálogo {self.carpeta}: {len(nuevas)} agregadas, {len(faltantes)} quitadas")
+        return len(nuevas), len(faltantes)
+
+    def registrar(self, ruta, tipo="automatica", dispositivo=None, placa=None, timestamp=None):
+        """Registra (o actualiza) una captura recién guardada"""
+        nombre = Path(ruta).name
+        timestamp = time.time() if timestamp is None else timestamp
+        try:
+            stat = (self.carpeta / nombre).stat()
+            tamano, escrito = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            tamano, escrito = 0, None
+        try:
+            with self._lock:
+                self._conexion.execute(
+                    "INSERT OR REPLACE INTO capturas (archivo, timestamp, tipo, dispositivo, placa, bytes) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (nombre, timestamp, tipo, dispositivo, placa, tamano)
+                )
+                # Crear el archivo cambió el mtime de la carpeta; si nada la
+                # tocó después de escribirlo, ese cambio ya está en el índice
+                if escrito is not None:
+                    self._recordar_mtime_carpeta(no_despues_de=escrito)
+        except Exception as e:
+            print(f"Error registrando captura en catálogo: {e}")
+
+    def actualizar(self, ruta, bytes=None, estado=None):
+        """Actualiza tamaño y/o estado de una captura (p. ej. tras recomprimirla)"""
+        cambios, parametros = [], []
+        if bytes is not None:
+            cambios.append("bytes = ?")
+            parametros.append(bytes)
+        if estado is not None:
+            cambios.append("estado = ?")
+            parametros.append(estado)
+        if not cambios:
+            return
+        with self._lock:
+            self._conexion.execute(
+                f"UPDATE capturas SET {', '.join(cambios)} WHERE archivo = ?",
+                parametros + [Path(ruta).name]
+            )
+            # Reemplazar el archivo (temporal + rename) también cambia la carpeta
+            self._recordar_mtime_carpeta()
+
+    def eliminar(self, ruta):
+        """Quita del índice una captura ya borrada (no borra el archivo)"""
+        self.eliminar_varias([ruta])
+
+    def eliminar_varias(self, rutas):
+        with self._lock:
+            self._conexion.executemany(
+                "DELETE FROM capturas WHERE archivo = ?", [(Path(r).name,) for r in rutas]
+            )
+            self._recordar_mtime_carpeta()
+
+    @staticmethod
+    def _filtros(tipo, dispositivo, desde, hasta, estado=None):
+        condiciones, parametros = [], []
+        if estado is not None:
+            condiciones.append("estado = ?")
+            parametros.append(estado)
+        if tipo is not None:
+            condiciones.append("tipo = ?")
+            parametros.append(tipo)
+        if dispositivo is not None:
+            condiciones.append("dispositivo = ?")
+            parametros.append(dispositivo)
+        if desde is not None:
+            condiciones.append("timestamp >= ?")
+            parametros.append(desde.timestamp() if hasattr(desde, "timestamp") else desde)
+        if hasta is not None:
+            condiciones.append("timestamp < ?")
+            parametros.append(hasta.timestamp() if hasattr(hasta, "timestamp") else hasta)
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return where, parametros
+
+    def contar(self, tipo=None, dispositivo=None, desde=None, hasta=None):
+        """Número de capturas que cumplen los filtros"""
+        where, parametros = self._filtros(tipo, dispositivo, desde, hasta)
+        with self._lock:
+            return self._conexion.execute(f"SELECT COUNT(*) FROM capturas{where}", parametros).fetchone()[0]
+
+    def pagina(self, offset=0, limite=50, tipo=None, dispositivo=None, desde=None, hasta=None,
+               recientes_primero=True, estado=None, verificar=False):
+        """
+        Página de capturas ordenadas por fecha.
+
+        Args:
+            offset, limite: Posición y tamaño de la página
+            tipo, dispositivo, estado: Filtros exactos (None = todos)
+            desde, hasta: datetime o epoch; rango [desde, hasta)
+            verificar: Quitar del índice las filas de la página cuyo archivo
+                ya no existe y volver a consultarla (un stat() por fila)
+
+        Returns:
+            list[Captura]
+        """
+        where, parametros = self._filtros(tipo, dispositivo, desde, hasta, estado)
+        orden = "DESC" if recientes_primero else "ASC"
+        while True:
+            with self._lock:
+                filas = self._conexion.execute(
+                    f"SELECT archivo, timestamp, tipo, dispositivo, placa, bytes, estado FROM capturas{where} "
+                    f"ORDER BY timestamp {orden}, archivo {orden} LIMIT ? OFFSET ?",
+                    parametros + [limite, offset]
+                ).fetchall()
+            capturas = [Captura(self.carpeta / fila[0], *fila[1:]) for fila in filas]
+            if not verificar:
+                return capturas
+            faltantes = [captura.ruta for captura in capturas if not captura.ruta.exists()]
+            if not faltantes:
+                return capturas
+            # Cada vuelta quita al menos una fila, así que termina
+            self.eliminar_varias(faltantes)
+
+    def recientes(self, n=10, **filtros):
+        """Las `n` capturas más recientes"""
+        return self.pagina(0, n, **filtros)
+
+    def bytes_totales(self):
+        """Espacio ocupado por capturas + paquetes archivados, según el índice"""
+        with self._lock:
+            capturas = self._conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM capturas").fetchone()[0]
+            archivos = self._conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM archivos").fetchone()[0]
+        return capturas + archivos
+
+    # Paquetes diarios archivados
+
+    def registrar_archivo(self, ruta, fecha, capturas, bytes):
+        """Registra (o actualiza) un paquete diario con su tamaño total actual"""
+        with self._lock:
+            self._conexion.execute(
+                "INSERT INTO archivos (nombre, fecha, capturas, bytes) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(nombre) DO UPDATE SET capturas = capturas + excluded.capturas, "
+                "bytes = excluded.bytes",
+                (Path(ruta).name, fecha, capturas, bytes)
+            )
+
+    def archivos(self, hasta_fecha=None, limite=100):
+        """Paquetes archivados del más antiguo al más nuevo (fecha < hasta_fecha)"""
+        consulta = "SELECT nombre, fecha, capturas, bytes FROM archivos"
+        parametros = []
+        if hasta_fecha is not None:
+            consulta += " WHERE fecha < ?"
+            parametros.append(hasta_fecha)
+        consulta += " ORDER BY fecha ASC LIMIT ?"
+        with self._lock:
+            filas = self._conexion.execute(consulta, parametros + [limite]).fetchall()
+        carpeta = self.carpeta / self.CARPETA_ARCHIVO
+        return [Archivo(carpeta / nombre, fecha, n, b) for nombre, fecha, n, b in filas]
+
+    def eliminar_archivo(self, ruta):
+        with self._lock:
+            self._conexion.execute("DELETE FROM archivos WHERE nombre = ?", (Path(ruta).name,))
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+# Un catálogo por carpeta, compartido entre detectores y ventanas
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def obtener_catalogo(carpeta):
+    """Obtiene el catálogo compartido de una carpeta de capturas"""
+    clave = Path(carpeta).resolve()
+    with _catalogos_lock:
+        if clave not in _catalogos:
+            _catalogos[clave] = CatalogoCapturas(clave)
+        return _catalogos[clave]
@@ -4,18 +4,55 @@ Maneja la lógica de negocio relacionada con dispositivos
 """
 
 import json
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 
 
 class DeviceManager:
     """
-    Mantiene los dispositivos organizados por zona.
-    devices_by_zone: { zona: [device_dict, ...] }
+    Registro de dispositivos indexado por ID.
+    devices: { id: device_dict } en orden de alta
     cada device_dict: {"id": str, "tipo": str, "zona": str, "active": bool, ...}
+
+    Índices secundarios por zona y por tipo ({ zona: { id: device_dict } }),
+    así obtener, mover, eliminar y filtrar por tipo no recorren la lista.
+    devices_by_zone arma la vista { zona: [device_dict, ...] } del archivo.
+
+    Los cambios de id, zona o tipo deben pasar por el manager para mantener
+    los índices. Cada cambio avisa a los suscriptores con
+    callback(evento, device, anterior), donde evento es "agregado",
+    "eliminado", "movido" (anterior = zona), "renombrado" (anterior = id),
+    "tipo" (anterior = tipo), "actualizado" o "recargado" (device = None).
+
+    Persistencia diferida: save_devices() solo marca cambios pendientes y un
+    thread los escribe tras `debounce_segundos` sin cambios nuevos. flush()
+    escribe ya lo pendiente (al cerrar sesión o la aplicación). El destino es
+    el almacén SQLite del usuario (set_user_store), donde solo se actualizan
+    las filas de los dispositivos modificados, o un archivo JSON
+    (set_devices_file), que se escribe en un temporal y reemplaza al original
+    con os.replace() para que un corte nunca lo deje a medias.
     """
-    def __init__(self, devices_file=None):
+    def __init__(self, devices_file=None, debounce_segundos=1.0):
         self.devices_file = devices_file
-        self.devices_by_zone = {}
+        self.store = None
+        self.store_email = None
+        self.devices = {}
+        self._por_zona = {}
+        self._por_tipo = {}
+        self._suscriptores = []
+        self.debounce_segundos = debounce_segundos
+
+        # Escritura diferida
+        self._lock = threading.RLock()
+        self._escritura = threading.Lock()
+        self._pendientes = set()  # IDs modificados o eliminados
+        self._pendiente_todo = False
+        self._ultimo_cambio = 0.0
+        self._hay_cambios = threading.Event()
+        self._thread = None
         
         # Si se proporciona un archivo, cargar datos
         if self.devices_file:
@@ -23,11 +60,26 @@ class DeviceManager:
     
     def set_devices_file(self, file_path):
         """Establece el archivo de dispositivos y carga los datos"""
+        # Lo pendiente pertenece al destino anterior
+        self.flush()
+        self.store = self.store_email = None
         self.devices_file = file_path
         self.load_devices()
     
+    def set_user_store(self, store, email):
+        """Usa los dispositivos de `email` en el almacén de usuarios y los carga"""
+        self.flush()
+        self.devices_file = None
+        self.store = store
+        self.store_email = email
+        self.load_devices()
+    
     def load_devices(self):
-        """Carga dispositivos desde el archivo JSON"""
+        """Carga dispositivos desde el almacén o el archivo JSON"""
+        if self.store is not None:
+            self._indexar(self.store.dispositivos(self.store_email))
+            self._notificar("recargado", None)
+            return
         if not self.devices_file:
             return
         
@@ -36,66 +88,272 @@ class DeviceManager:
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.devices_by_zone = data.get("devices_by_zone", {})
-            except:
-                self.devices_by_zone = {}
+                devices = []
+                for zone, lista in data.get("devices_by_zone", {}).items():
+                    for device in lista:
+                        device["zona"] = zone
+                        devices.append(device)
+                self._indexar(devices)
+            except (OSError, ValueError) as e:
+                # No sobrescribir el archivo dañado en el próximo guardado
+                respaldo = file_path.with_name(f"{file_path.name}.corrupto")
+                print(f"⚠️ No se pudo leer {file_path} ({e}); se conserva como {respaldo.name}")
+                try:
+                    os.replace(file_path, respaldo)
+                except OSError:
+                    pass
+                self._indexar([])
         else:
-            self.devices_by_zone = {}
+            self._indexar([])
+        self._notificar("recargado", None)
+
+    def _indexar(self, devices):
+        """Reconstruye registro e índices desde una lista de device_dicts"""
+        renombrados = []
+        with self._lock:
+            self.devices = {}
+            self._por_zona = {}
+            self._por_tipo = {}
+            self._pendientes = set()
+            self._pendiente_todo = False
+            for device in devices:
+                if device["id"] in self.devices:
+                    # Archivos anteriores al registro admitían IDs repetidos
+                    nuevo = self._id_libre(device["id"])
+                    print(f"⚠️ ID de dispositivo repetido '{device['id']}', se renombra a '{nuevo}'")
+                    device["id"] = nuevo
+                    renombrados.append(nuevo)
+                self._indexar_device(device)
+        if renombrados:
+            self.save_devices(*renombrados)
+
+    def _id_libre(self, device_id):
+        n = 2
+        while f"{device_id} ({n})" in self.devices:
+            n += 1
+        return f"{device_id} ({n})"
+
+    def _indexar_device(self, device):
+        self.devices[device["id"]] = device
+        self._por_zona.setdefault(device["zona"], {})[device["id"]] = device
+        self._por_tipo.setdefault(device.get("tipo"), {})[device["id"]] = device
+
+    def _desindexar_device(self, device):
+        self.devices.pop(device["id"], None)
+        for indice, clave in ((self._por_zona, device["zona"]), (self._por_tipo, device.get("tipo"))):
+            grupo = indice.get(clave)
+            if grupo is not None:
+                grupo.pop(device["id"], None)
+                if not grupo:
+                    del indice[clave]
+
+    @property
+    def devices_by_zone(self):
+        """Vista { zona: [device_dict, ...] } (copia; no modificar)"""
+        with self._lock:
+            return {zone: list(grupo.values()) for zone, grupo in self._por_zona.items()}
     
-    def save_devices(self):
-        """Guarda dispositivos en el archivo JSON"""
-        if not self.devices_file:
+    def save_devices(self, *device_ids):
+        """
+        Marca dispositivos como modificados (sin IDs: todos); se escriben en
+        segundo plano.
+        """
+        if not self.devices_file and self.store is None:
             return
         
-        file_path = Path(self.devices_file)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(
-                {"devices_by_zone": self.devices_by_zone},
-                f,
-                indent=4,
-                ensure_ascii=False
-            )
+        with self._lock:
+            if device_ids:
+                self._pendientes.update(device_ids)
+            else:
+                self._pendiente_todo = True
+            self._ultimo_cambio = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop_guardado, name="guardado-dispositivos", daemon=True)
+                self._thread.start()
+        self._hay_cambios.set()
 
-    def add_device(self, device):
-        """Agrega un dispositivo a una zona específica"""
-        zone = device["zona"]
-        if zone not in self.devices_by_zone:
-            self.devices_by_zone[zone] = []
-        self.devices_by_zone[zone].append(device)
-        self.save_devices()  # Guardar después de agregar
+    def _loop_guardado(self):
+        while True:
+            self._hay_cambios.wait()
+            # Esperar a que pase `debounce_segundos` desde el último cambio
+            while True:
+                with self._lock:
+                    restante = self._ultimo_cambio + self.debounce_segundos - time.monotonic()
+                if restante <= 0:
+                    break
+                time.sleep(restante)
+            self._hay_cambios.clear()
+            self.flush()
 
-    def delete_device(self, device):
-        """Elimina un dispositivo de su zona"""
-        z = device["zona"]
-        if z in self.devices_by_zone:
+    def flush(self):
+        """
+        Escribe ya los cambios pendientes. Retorna True si no queda nada pendiente.
+
+        Bajo el lock solo se toman los IDs pendientes y una copia de los
+        dispositivos; serializar, fsync y SQLite corren fuera de él para no
+        frenar a quien modifica el registro (p. ej. el thread de Tk).
+        """
+        # Un escritor a la vez: una copia vieja nunca pisa a una más nueva
+        with self._escritura:
+            with self._lock:
+                if not self._pendientes and not self._pendiente_todo:
+                    return True
+                pendientes, todo = self._pendientes, self._pendiente_todo
+                self._pendientes = set()
+                self._pendiente_todo = False
+                store, email, devices_file = self.store, self.store_email, self.devices_file
+                if store is not None:
+                    if todo:
+                        guardar = [dict(device) for device in self.devices.values()]
+                        eliminar = ()
+                    else:
+                        guardar = [dict(self.devices[i]) for i in pendientes if i in self.devices]
+                        eliminar = [i for i in pendientes if i not in self.devices]
+                else:
+                    por_zona = {
+                        zone: [dict(device) for device in grupo.values()]
+                        for zone, grupo in self._por_zona.items()
+                    }
             try:
-                self.devices_by_zone[z].remove(device)
-            except ValueError:
+                if store is not None:
+                    # Solo las filas de los dispositivos modificados
+                    store.guardar_dispositivos(email, guardar, eliminar, reemplazar=todo)
+                elif devices_file:
+                    contenido = json.dumps({"devices_by_zone": por_zona}, indent=4, ensure_ascii=False)
+                    self._escribir_atomico(Path(devices_file), contenido)
+                return True
+            except Exception as e:
+                # Vuelve a quedar pendiente; el próximo cambio o flush() lo reintenta
+                print(f"❌ Error guardando dispositivos: {e}")
+                with self._lock:
+                    if store is self.store and devices_file == self.devices_file:
+                        self._pendientes.update(pendientes)
+                        self._pendiente_todo = self._pendiente_todo or todo
+                return False
+
+    @staticmethod
+    def _escribir_atomico(file_path, contenido):
+        """Escribe en un temporal de la misma carpeta y lo renombra sobre el original"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp",
+                                                dir=file_path.parent)
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, file_path)
+        except BaseException:
+            try:
+                os.unlink(temporal)
+            except OSError:
                 pass
-            if not self.devices_by_zone[z]:
-                del self.devices_by_zone[z]
-        self.save_devices()  # Guardar después de eliminar
+            raise
+
+    def subscribe(self, callback):
+        """Registra callback(evento, device, anterior) para los cambios del registro"""
+        if callback not in self._suscriptores:
+            self._suscriptores.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._suscriptores:
+            self._suscriptores.remove(callback)
+
+    def _notificar(self, evento, device, anterior=None):
+        for callback in list(self._suscriptores):
+            try:
+                callback(evento, device, anterior)
+            except Exception as e:
+                print(f"Error en suscriptor de dispositivos: {e}")
+
+    def _resolver(self, device):
+        """Acepta un device_dict o su ID y retorna el registrado (o None)"""
+        device_id = device["id"] if isinstance(device, dict) else device
+        return self.devices.get(device_id)
+
+    def add_device(self, device):
+        """Agrega un dispositivo a una zona específica. ValueError si el ID ya existe"""
+        with self._lock:
+            if device["id"] in self.devices:
+                raise ValueError(f"Ya existe un dispositivo con ID '{device['id']}'")
+            self._indexar_device(device)
+        self.save_devices(device["id"])  # Guardar después de agregar
+        self._notificar("agregado", device)
+
+    def delete_device(self, device):
+        """Elimina un dispositivo (device_dict o ID)"""
+        with self._lock:
+            device = self._resolver(device)
+            if device is None:
+                return
+            self._desindexar_device(device)
+        self.save_devices(device["id"])  # Guardar después de eliminar
+        self._notificar("eliminado", device)
 
     def move_device_zone(self, device, new_zone):
         """Mueve un dispositivo de una zona a otra"""
-        old = device["zona"]
-        if old in self.devices_by_zone and device in self.devices_by_zone[old]:
-            self.devices_by_zone[old].remove(device)
-            if not self.devices_by_zone[old]:
-                del self.devices_by_zone[old]
-        device["zona"] = new_zone
-        if new_zone not in self.devices_by_zone:
-            self.devices_by_zone[new_zone] = []
-        self.devices_by_zone[new_zone].append(device)
-        self.save_devices()  # Guardar después de mover
+        with self._lock:
+            device = self._resolver(device)
+            if device is None or device["zona"] == new_zone:
+                return
+            old = device["zona"]
+            self._desindexar_device(device)
+            device["zona"] = new_zone
+            self._indexar_device(device)
+        self.save_devices(device["id"])  # Guardar después de mover
+        self._notificar("movido", device, old)
+
+    def rename_device(self, device, new_id):
+        """Cambia el ID de un dispositivo. ValueError si el nuevo ID ya existe"""
+        with self._lock:
+            device = self._resolver(device)
+            if device is None or device["id"] == new_id:
+                return
+            if new_id in self.devices:
+                raise ValueError(f"Ya existe un dispositivo con ID '{new_id}'")
+            old = device["id"]
+            self._desindexar_device(device)
+            device["id"] = new_id
+            self._indexar_device(device)
+        self.save_devices(old, new_id)
+        self._notificar("renombrado", device, old)
+
+    def set_device_type(self, device, new_type):
+        """Cambia el tipo de un dispositivo"""
+        with self._lock:
+            device = self._resolver(device)
+            if device is None or device.get("tipo") == new_type:
+                return
+            old = device.get("tipo")
+            self._desindexar_device(device)
+            device["tipo"] = new_type
+            self._indexar_device(device)
+        self.save_devices(device["id"])
+        self._notificar("tipo", device, old)
+
+    def update_device(self, device):
+        """Guarda y notifica cambios en otros campos (p. ej. "active")"""
+        self.save_devices(device["id"])
+        self._notificar("actualizado", device)
+
+    def get_device(self, device_id):
+        """Dispositivo con ese ID, o None"""
+        return self.devices.get(device_id)
+
+    def devices_in_zone(self, zone):
+        """Dispositivos de una zona, en orden de alta"""
+        with self._lock:
+            return list(self._por_zona.get(zone, {}).values())
+
+    def devices_of_type(self, tipo):
+        """Dispositivos de un tipo, en orden de alta"""
+        with self._lock:
+            return list(self._por_tipo.get(tipo, {}).values())
 
     def get_zones(self):
         """Retorna lista ordenada de zonas"""
-        return sorted(list(self.devices_by_zone.keys()))
+        return sorted(self._por_zona.keys())
 
     def all_devices(self):
         """Retorna lista plana de todos los dispositivos"""
-        out = []
-        for z, lst in self.devices_by_zone.items():
-            out.extend(lst)
-        return out
\ No newline at end of file
+        return list(self.devices.values())
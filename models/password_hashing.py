@@ -0,0 +1,145 @@
+"""
+Hash de contraseñas con sal y función de derivación lenta
+Formato guardado: "scrypt$n$r$p$sal$hash" (o "pbkdf2_sha256$iteraciones$sal$hash"
+si OpenSSL no trae scrypt), con sal y hash en base64. Los hashes SHA-256
+sin sal de versiones anteriores se siguen aceptando y se rehashean en el
+siguiente login. Como cada verificación cuesta decenas de milisegundos,
+VerificationPool la ejecuta fuera del thread de Tk.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# scrypt: ~16 MB y ~50-80 ms por hash; hashlib libera el GIL mientras calcula
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 310_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+HAS_SCRYPT = hasattr(hashlib, "scrypt")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(text):
+    return base64.b64decode(text.encode("ascii"))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * n * 2, dklen=HASH_BYTES)
+
+
+def hash_password(password):
+    """Hash nuevo con sal aleatoria y los parámetros actuales"""
+    salt = os.urandom(SALT_BYTES)
+    if HAS_SCRYPT:
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS, HASH_BYTES)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+
+
+def needs_rehash(stored):
+    """True si el hash es del formato antiguo o usa parámetros distintos a los actuales"""
+    if HAS_SCRYPT:
+        return stored != "" and not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+    return not stored.startswith(f"pbkdf2_sha256${PBKDF2_ITERATIONS}$")
+
+
+def verify_password(password, stored):
+    """
+    Comprueba una contraseña contra el hash guardado (comparación en tiempo constante).
+
+    Returns:
+        tuple (ok: bool, rehash: bool) - rehash indica que conviene guardar
+        un hash nuevo (formato antiguo o parámetros desactualizados)
+    """
+    if not stored:
+        return False, False
+    try:
+        partes = stored.split("$")
+        if partes[0] == "scrypt" and len(partes) == 6:
+            n, r, p = (int(x) for x in partes[1:4])
+            expected = _unb64(partes[5])
+            digest = _scrypt(password, _unb64(partes[4]), n, r, p)
+        elif partes[0] == "pbkdf2_sha256" and len(partes) == 4:
+            expected = _unb64(partes[3])
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _unb64(partes[2]),
+                                         int(partes[1]), len(expected))
+        elif len(stored) == 64:
+            # SHA-256 hexadecimal sin sal (versiones anteriores)
+            expected = stored.encode("ascii")
+            digest = hashlib.sha256(password.encode()).hexdigest().encode("ascii")
+        else:
+            print("⚠️ Formato de hash de contraseña desconocido")
+            return False, False
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ Hash de contraseña inválido: {e}")
+        return False, False
+
+    ok = hmac.compare_digest(digest, expected)
+    return ok, ok and needs_rehash(stored)
+
+
+class VerificationPool:
+    """
+    Pocos threads fijos para verificar contraseñas fuera del thread de Tk.
+
+    A lo sumo `max_pending` verificaciones en curso o en espera; las que
+    excedan el límite se resuelven al instante como rechazadas, así una
+    ráfaga de intentos no acumula trabajo ni memoria (cada scrypt usa ~16 MB).
+    """
+
+    def __init__(self, workers=2, max_pending=8):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verificacion-login")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+        # Estadísticas
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, rejected_result=None):
+        """
+        Ejecuta fn(*args) en el pool. Retorna un Future con su resultado, o
+        con `rejected_result` si ya hay `max_pending` verificaciones pendientes.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            future = Future()
+            future.set_result(rejected_result)
+            return future
+        self.submitted += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_verification_pool():
+    """Obtiene el pool de verificación compartido"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = VerificationPool()
+        return _pool
@@ -0,0 +1,129 @@
+"""
+Índice en memoria de perfiles de usuario por nombre de Telegram
+Evita recorrer los perfiles (profile.json o el almacén SQLite) por cada
+mensaje que llega al bot.
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+
+
+def normalize_telegram_name(name):
+    """Normaliza un nombre/usuario de Telegram: minúsculas, sin espacios extremos ni '@'"""
+    return (name or "").strip().lower().lstrip("@")
+
+
+class ProfileIndex:
+    """
+    Mapea nombres de Telegram normalizados -> email del usuario.
+
+    Por cada perfil se indexan el campo 'telegram' completo y cada una de sus
+    partes, de modo que "Brandon_0908" responde a "brandon_0908", "brandon"
+    y "0908". Las búsquedas son O(1).
+    """
+
+    def __init__(self, user_data_dir, profiles_source=None):
+        self.user_data_dir = Path(user_data_dir)
+        # Callable que itera (email, telegram); sin él se leen los profile.json
+        self.profiles_source = profiles_source
+        self._email_by_name = {}
+        self._names_by_email = {}
+        self._lock = threading.Lock()
+        self._built = False
+
+    def _keys_for(self, telegram):
+        """Claves de búsqueda para un campo 'telegram' de perfil"""
+        full = normalize_telegram_name(telegram)
+        if not full:
+            return set()
+        keys = {full}
+        keys.update(
+            normalize_telegram_name(token)
+            for token in re.split(r"[\s,;/()_.\-]+", full)
+        )
+        keys.discard("")
+        return keys
+
+    def _build(self):
+        """Construye el índice recorriendo los perfiles una sola vez"""
+        if self.profiles_source is not None:
+            for email, telegram in self.profiles_source():
+                self._update_locked(email, telegram)
+        elif self.user_data_dir.exists():
+            for profile_file in self.user_data_dir.glob("*/profile.json"):
+                try:
+                    with open(profile_file, 'r', encoding='utf-8') as f:
+                        profile = json.load(f)
+                    if email := profile.get('email'):
+                        self._update_locked(email, profile.get('telegram', ''))
+                except Exception as e:
+                    print(f"Error indexando perfil {profile_file}: {e}")
+        self._built = True
+
+    def _ensure_built(self):
+        if not self._built:
+            self._build()
+
+    def _remove_locked(self, email):
+        for key in self._names_by_email.pop(email, ()):
+            if self._email_by_name.get(key) == email:
+                del self._email_by_name[key]
+
+    def _update_locked(self, email, telegram):
+        self._remove_locked(email)
+        keys = self._keys_for(telegram)
+        for key in keys:
+            # Ante nombres repetidos se conserva el primer usuario registrado
+            self._email_by_name.setdefault(key, email)
+        self._names_by_email[email] = keys
+
+    def update(self, email, telegram):
+        """Indexa (o reindexa) el perfil de un usuario"""
+        with self._lock:
+            self._ensure_built()
+            self._update_locked(email, telegram)
+
+    def remove(self, email):
+        """Quita un usuario del índice"""
+        with self._lock:
+            self._ensure_built()
+            self._remove_locked(email)
+
+    def lookup(self, *names):
+        """
+        Busca el email asociado al primer nombre que coincida.
+
+        Args:
+            names: Nombres o usuarios de Telegram (con o sin '@')
+
+        Returns:
+            str o None - Email del usuario
+        """
+        with self._lock:
+            self._ensure_built()
+            for name in names:
+                key = normalize_telegram_name(name)
+                if key and key in self._email_by_name:
+                    return self._email_by_name[key]
+        return None
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_built()
+            return len(self._names_by_email)
+
+
+# Un índice por carpeta de datos, compartido entre instancias de UserManager
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_profile_index(user_data_dir, profiles_source=None):
+    """Obtiene el índice compartido para una carpeta de perfiles"""
+    key = Path(user_data_dir).resolve()
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = ProfileIndex(key, profiles_source)
+        return _indexes[key]
@@ -1,12 +1,12 @@
 """
 Modelo de gestión de usuarios
-Maneja registro, login y persistencia en JSON
+Maneja registro, login y persistencia en el almacén SQLite (models.user_store)
 """
 
-import json
-import os
-import hashlib
 from pathlib import Path
+from models.password_hashing import get_verification_pool, hash_password, verify_password
+from models.profile_index import get_profile_index
+from models.user_store import obtener_almacen_usuarios
 
 
 class UserManager:
@@ -14,34 +14,27 @@ class UserManager:
     
     def __init__(self, data_dir="data"):
         self.data_dir = Path(data_dir)
-        self.users_file = self.data_dir / "users.json"
         self.user_data_dir = self.data_dir / "user_data"
         
         # Crear directorios si no existen
         self.data_dir.mkdir(exist_ok=True)
         self.user_data_dir.mkdir(exist_ok=True)
         
-        self.users = self._load_users()
+        # Usuarios, perfiles, dispositivos y chat_ids (migra los JSON la primera vez)
+        self.store = obtener_almacen_usuarios(self.data_dir)
         self.current_user = None
+        
+        # Índice de nombres de Telegram -> email (compartido, se construye una vez)
+        self.profile_index = get_profile_index(self.user_data_dir, self._telegram_names)
     
-    def _load_users(self):
-        """Carga el índice de usuarios desde el archivo JSON"""
-        if self.users_file.exists():
-            try:
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    def _save_users(self):
-        """Guarda el índice de usuarios en el archivo JSON"""
-        with open(self.users_file, 'w', encoding='utf-8') as f:
-            json.dump(self.users, f, indent=4, ensure_ascii=False)
+    def _telegram_names(self):
+        """(email, telegram) de todos los perfiles, para construir el índice"""
+        for email, profile in self.store.perfiles():
+            yield profile.get('email') or email, profile.get('telegram', '')
     
     def _hash_password(self, password):
-        """Hashea la contraseña para seguridad"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hashea la contraseña con sal y scrypt (o PBKDF2)"""
+        return hash_password(password)
     
     def _get_user_dir(self, email):
         """Retorna el directorio del usuario"""
@@ -49,32 +42,12 @@ class UserManager:
         safe_email = email.replace('@', '_at_').replace('.', '_')
         return self.user_data_dir / safe_email
     
-    def _create_user_directory(self, email, telegram):
-        """Crea el directorio y archivos iniciales del usuario"""
-        user_dir = self._get_user_dir(email)
-        user_dir.mkdir(exist_ok=True)
-        
-        # Crear profile.json
-        profile_data = {
-            "email": email,
-            "telegram": telegram,
-            "created_at": None  # Puedes agregar timestamp si quieres
-        }
-        profile_file = user_dir / "profile.json"
-        with open(profile_file, 'w', encoding='utf-8') as f:
-            json.dump(profile_data, f, indent=4, ensure_ascii=False)
-        
-        # Crear devices.json vacío
-        devices_file = user_dir / "devices.json"
-        with open(devices_file, 'w', encoding='utf-8') as f:
-            json.dump({"devices_by_zone": {}}, f, indent=4, ensure_ascii=False)
-    
     def register(self, email, password, telegram):
         """
         Registra un nuevo usuario
         Returns: (success: bool, message: str)
         """
-        if email in self.users:
+        if self.store.existe(email):
             return False, "El correo ya está registrado"
         
         # Validar contraseña
@@ -85,53 +58,135 @@ class UserManager:
         if not any(c.isdigit() for c in password):
             return False, "La contraseña debe tener al menos 1 número"
         
-        # Guardar credenciales en users.json
-        self.users[email] = {
-            "password": self._hash_password(password)
+        # Credenciales y perfil en una sola fila
+        profile_data = {
+            "email": email,
+            "telegram": telegram,
+            "created_at": None  # Puedes agregar timestamp si quieres
         }
-        self._save_users()
-        
-        # Crear carpeta y archivos del usuario
-        self._create_user_directory(email, telegram)
+        if not self.store.crear_usuario(email, self._hash_password(password), profile_data):
+            return False, "El correo ya está registrado"
+        self.profile_index.update(email, telegram)
         
         return True, "Usuario registrado exitosamente"
     
-    def login(self, email, password):
+    def register_async(self, email, password, telegram):
+        """
+        Registra en el pool compartido de verificación (el hash no corre en Tk).
+        Retorna un Future que se resuelve con (success: bool, message: str).
+        """
+        return get_verification_pool().submit(
+            self.register, email, password, telegram,
+            rejected_result=(False, "Demasiados intentos en curso, espere un momento")
+        )
+    
+    def verify_login(self, email, password):
         """
-        Intenta hacer login
+        Verifica las credenciales sin iniciar sesión (seguro desde cualquier thread)
         Returns: (success: bool, message: str)
         """
-        if email not in self.users:
+        stored = self.store.password(email)
+        if stored is None:
             return False, "Usuario no encontrado"
         
-        hashed = self._hash_password(password)
-        if self.users[email]["password"] == hashed:
-            self.current_user = email
+        ok, rehash = verify_password(password, stored)
+        if ok:
+            if rehash:
+                # Hash antiguo (SHA-256 sin sal) o parámetros viejos: actualizarlo
+                self.store.actualizar_password(email, self._hash_password(password))
+            # Dejar el perfil en caché: la ruta de alarma no debe leer la base
+            self.store.perfil(email)
             return True, "Login exitoso"
         else:
             return False, "Contraseña incorrecta"
     
+    def login(self, email, password):
+        """
+        Intenta hacer login (bloquea mientras se verifica el hash; desde Tk usar login_async)
+        Returns: (success: bool, message: str)
+        """
+        success, message = self.verify_login(email, password)
+        if success:
+            self.current_user = email
+        return success, message
+    
+    def login_async(self, email, password):
+        """
+        Verifica el login en el pool compartido de verificación.
+        Retorna un Future que se resuelve con (success: bool, message: str);
+        no cambia current_user: el llamador lo asigna desde el thread de Tk
+        cuando el Future se resuelve con éxito.
+        """
+        return get_verification_pool().submit(
+            self.verify_login, email, password,
+            rejected_result=(False, "Demasiados intentos en curso, espere un momento")
+        )
+    
     def logout(self):
         """Cierra sesión del usuario actual"""
         self.current_user = None
     
     def get_current_user_profile(self):
-        """Retorna el perfil completo del usuario actual"""
+        """Retorna el perfil completo del usuario actual (desde la caché en memoria)"""
         if not self.current_user:
             return None
-        
-        user_dir = self._get_user_dir(self.current_user)
-        profile_file = user_dir / "profile.json"
-        
-        if profile_file.exists():
-            with open(profile_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        return self.store.perfil(self.current_user)
+    
+    def get_user_profile(self, email):
+        """Retorna el perfil de un usuario, o None"""
+        return self.store.perfil(email)
     
     def get_user_devices_file(self):
-        """Retorna la ruta del archivo de dispositivos del usuario actual"""
+        """Retorna la ruta del antiguo archivo de dispositivos del usuario actual (solo JSON)"""
         if not self.current_user:
             return None
         
         user_dir = self._get_user_dir(self.current_user)
-        return user_dir / "devices.json"    
\ No newline at end of file
+        return user_dir / "devices.json"
+    
+    def update_user_profile(self, email, changes):
+        """
+        Actualiza campos del perfil de un usuario y mantiene el índice de Telegram.
+        
+        Args:
+            email: str - Email del usuario
+            changes: dict - Campos a modificar
+        
+        Returns:
+            bool - True si se guardó el perfil
+        """
+        profile = self.store.actualizar_perfil(email, changes)
+        if profile is None:
+            return False
+        
+        if 'telegram' in changes:
+            self.profile_index.update(email, profile.get('telegram', ''))
+        return True
+    
+    def find_user_by_telegram(self, *names):
+        """
+        Busca el email de un usuario por su nombre o usuario de Telegram.
+        
+        Returns:
+            str o None - Email del usuario encontrado
+        """
+        return self.profile_index.lookup(*names)
+    
+    def subscribe_profile(self, callback):
+        """
+        Registra callback(email, profile) para cada cambio de perfil.
+        Se llama en el thread que hizo el cambio (p. ej. el del bot).
+        """
+        self.store.suscribir_perfiles(callback)
+    
+    def unsubscribe_profile(self, callback):
+        """Quita un callback registrado con subscribe_profile"""
+        self.store.desuscribir_perfiles(callback)
+    
+    def get_chat_ids(self):
+        """Retorna {email: chat_id} de los usuarios vinculados con Telegram"""
+        return self.store.chat_ids()
+    
+    def save_chat_id(self, email, chat_id):
+        """Guarda el chat_id de Telegram de un usuario"""
+        self.store.guardar_chat_id(email, chat_id)
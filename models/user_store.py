@@ -0,0 +1,359 @@
+"""
+Almacén SQLite de usuarios, perfiles, dispositivos y chat_ids
+Reemplaza a data/users.json, los profile.json/devices.json de cada usuario
+y chat_ids.json: registrar, iniciar sesión o editar un dispositivo son
+actualizaciones de filas indexadas en vez de reescribir archivos enteros.
+La primera vez que se abre migra el esquema JSON anterior (que se conserva
+en disco como respaldo). Las carpetas de user_data sin entrada en users.json
+se importan sin contraseña: el usuario no existe hasta que se registra, y
+al registrarse conserva su perfil y dispositivos.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class AlmacenUsuarios:
+    """
+    Base de datos embebida (WAL) de una carpeta de datos.
+
+    Tablas:
+        usuarios(email, password, perfil)       perfil = JSON del antiguo profile.json
+        dispositivos(email, id, tipo, zona, datos)  datos = JSON del device_dict
+        chat_ids(email, chat_id)
+
+    Los perfiles leídos quedan en memoria. Las escrituras de este proceso
+    actualizan esa caché y avisan a los suscriptores (callback(email, perfil));
+    las de otros procesos se detectan con PRAGMA data_version, que en modo
+    WAL se consulta en memoria compartida sin leer el archivo.
+    """
+
+    NOMBRE_DB = "usuarios.db"
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        # Caché de perfiles: email -> dict (o None si no existe)
+        self._perfiles = {}
+        self._version_perfiles = None
+        self._suscriptores_perfil = []
+
+        self._conexion = sqlite3.connect(
+            str(self.data_dir / self.NOMBRE_DB),
+            check_same_thread=False,
+            isolation_level=None  # autocommit; las transacciones se abren a mano
+        )
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS usuarios (
+                email    TEXT PRIMARY KEY,
+                password TEXT,
+                perfil   TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE TABLE IF NOT EXISTS dispositivos (
+                email TEXT NOT NULL,
+                id    TEXT NOT NULL,
+                tipo  TEXT,
+                zona  TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                PRIMARY KEY (email, id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_dispositivos_zona ON dispositivos(email, zona);
+            CREATE TABLE IF NOT EXISTS chat_ids (
+                email   TEXT PRIMARY KEY,
+                chat_id TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+        """)
+        if self._meta("migrado_json") is None:
+            self.migrar_json()
+
+    def _meta(self, clave):
+        fila = self._conexion.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def _transaccion(self, sentencias):
+        """Ejecuta [(sql, parametros), ...] en una sola transacción"""
+        with self._lock:
+            conexion = self._conexion
+            conexion.execute("BEGIN")
+            try:
+                for sql, parametros in sentencias:
+                    conexion.execute(sql, parametros)
+                conexion.execute("COMMIT")
+            except Exception:
+                conexion.execute("ROLLBACK")
+                raise
+
+    # Migración desde JSON
+
+    @staticmethod
+    def _leer_json(ruta, por_defecto):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return por_defecto
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {ruta} para migrar: {e}")
+            return por_defecto
+
+    def migrar_json(self):
+        """
+        Importa users.json, user_data/*/profile.json, user_data/*/devices.json
+        y chat_ids.json. Retorna (usuarios, dispositivos, chat_ids) importados.
+        """
+        usuarios = self._leer_json(self.data_dir / "users.json", {})
+        perfiles = {}
+        dispositivos = []
+        ids_por_email = {}
+        for profile_file in sorted((self.data_dir / "user_data").glob("*/profile.json")):
+            perfil = self._leer_json(profile_file, {})
+            # Carpetas antiguas no siempre siguen el nombre derivado del email
+            email = perfil.get("email") or profile_file.parent.name
+            perfiles[email] = perfil
+            datos = self._leer_json(profile_file.parent / "devices.json", {})
+            ids = ids_por_email.setdefault(email, set())
+            for zona, lista in datos.get("devices_by_zone", {}).items():
+                for device in lista:
+                    device["zona"] = zona
+                    if device["id"] in ids:
+                        # Los archivos JSON admitían IDs repetidos; mismo
+                        # criterio que DeviceManager al cargarlos
+                        nuevo = self._id_libre(device["id"], ids)
+                        print(f"⚠️ ID de dispositivo repetido '{device['id']}' de {email}, "
+                              f"se migra como '{nuevo}'")
+                        device["id"] = nuevo
+                    ids.add(device["id"])
+                    dispositivos.append((email, device))
+        chat_ids = self._leer_json(self.data_dir / "chat_ids.json", {})
+
+        # Orden de users.json y luego de las carpetas: ante nombres de Telegram
+        # repetidos el índice de perfiles conserva el primero
+        emails = list(dict.fromkeys([*usuarios, *perfiles]))
+        sentencias = []
+        for email in emails:
+            sentencias.append((
+                "INSERT OR IGNORE INTO usuarios (email, password, perfil) VALUES (?, ?, ?)",
+                (email, usuarios.get(email, {}).get("password"),
+                 json.dumps(perfiles.get(email, {"email": email}), ensure_ascii=False))
+            ))
+        for email, device in dispositivos:
+            sentencias.append((
+                "INSERT OR IGNORE INTO dispositivos (email, id, tipo, zona, datos) VALUES (?, ?, ?, ?, ?)",
+                (email, device["id"], device.get("tipo"), device["zona"], json.dumps(device, ensure_ascii=False))
+            ))
+        for email, chat_id in chat_ids.items():
+            sentencias.append((
+                "INSERT OR IGNORE INTO chat_ids (email, chat_id) VALUES (?, ?)", (email, str(chat_id))
+            ))
+        sentencias.append((
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('migrado_json', ?)", (str(time.time()),)
+        ))
+        self._transaccion(sentencias)
+
+        total = (len(emails), len(dispositivos), len(chat_ids))
+        if any(total):
+            print(f"🗄️ Migrados a {self.NOMBRE_DB}: {total[0]} usuarios, {total[1]} dispositivos, "
+                  f"{total[2]} chat_ids")
+        return total
+
+    @staticmethod
+    def _id_libre(device_id, usados):
+        n = 2
+        while f"{device_id} ({n})" in usados:
+            n += 1
+        return f"{device_id} ({n})"
+
+    # Usuarios y perfiles
+
+    def existe(self, email):
+        """True si el usuario está registrado (las filas migradas sin contraseña no cuentan)"""
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT 1 FROM usuarios WHERE email = ? AND password IS NOT NULL", (email,)
+            ).fetchone() is not None
+
+    def password(self, email):
+        """Hash guardado del usuario, o None si no existe o no tiene contraseña"""
+        with self._lock:
+            fila = self._conexion.execute("SELECT password FROM usuarios WHERE email = ?", (email,)).fetchone()
+        return fila[0] if fila else None
+
+    def crear_usuario(self, email, password, perfil):
+        """
+        Crea un usuario. Retorna False si el email ya está registrado.
+        Si hay una fila migrada sin contraseña la completa, mezclando
+        `perfil` sobre el perfil importado.
+        """
+        with self._lock:
+            conexion = self._conexion
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                fila = conexion.execute(
+                    "SELECT password, perfil FROM usuarios WHERE email = ?", (email,)
+                ).fetchone()
+                if fila is not None and fila[0] is not None:
+                    conexion.execute("ROLLBACK")
+                    return False
+                if fila is None:
+                    conexion.execute(
+                        "INSERT INTO usuarios (email, password, perfil) VALUES (?, ?, ?)",
+                        (email, password, json.dumps(perfil, ensure_ascii=False))
+                    )
+                else:
+                    perfil = {**json.loads(fila[1]), **perfil}
+                    conexion.execute(
+                        "UPDATE usuarios SET password = ?, perfil = ? WHERE email = ?",
+                        (password, json.dumps(perfil, ensure_ascii=False), email)
+                    )
+                conexion.execute("COMMIT")
+            except Exception:
+                conexion.execute("ROLLBACK")
+                raise
+            self._perfiles[email] = dict(perfil)
+        self._notificar_perfil(email, perfil)
+        return True
+
+    def actualizar_password(self, email, password):
+        with self._lock:
+            self._conexion.execute("UPDATE usuarios SET password = ? WHERE email = ?", (password, email))
+
+    def _validar_cache_perfiles(self):
+        """Vacía la caché si otra conexión modificó la base (llamar con el lock)"""
+        version = self._conexion.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version_perfiles:
+            self._perfiles.clear()
+            self._version_perfiles = version
+
+    def perfil(self, email):
+        """Perfil del usuario (copia del dict en caché) o None"""
+        with self._lock:
+            self._validar_cache_perfiles()
+            if email not in self._perfiles:
+                fila = self._conexion.execute("SELECT perfil FROM usuarios WHERE email = ?", (email,)).fetchone()
+                self._perfiles[email] = json.loads(fila[0]) if fila else None
+            perfil = self._perfiles[email]
+        return dict(perfil) if perfil is not None else None
+
+    def suscribir_perfiles(self, callback):
+        """Registra callback(email, perfil) para los cambios de perfil de este proceso"""
+        if callback not in self._suscriptores_perfil:
+            self._suscriptores_perfil.append(callback)
+
+    def desuscribir_perfiles(self, callback):
+        if callback in self._suscriptores_perfil:
+            self._suscriptores_perfil.remove(callback)
+
+    def _notificar_perfil(self, email, perfil):
+        for callback in list(self._suscriptores_perfil):
+            try:
+                callback(email, dict(perfil))
+            except Exception as e:
+                print(f"Error en suscriptor de perfiles: {e}")
+
+    def actualizar_perfil(self, email, cambios):
+        """Mezcla `cambios` en el perfil. Retorna el perfil resultante o None si no existe"""
+        with self._lock:
+            conexion = self._conexion
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                fila = conexion.execute("SELECT perfil FROM usuarios WHERE email = ?", (email,)).fetchone()
+                if fila is None:
+                    conexion.execute("ROLLBACK")
+                    return None
+                perfil = json.loads(fila[0])
+                perfil.update(cambios)
+                conexion.execute(
+                    "UPDATE usuarios SET perfil = ? WHERE email = ?",
+                    (json.dumps(perfil, ensure_ascii=False), email)
+                )
+                conexion.execute("COMMIT")
+            except Exception:
+                conexion.execute("ROLLBACK")
+                raise
+            self._perfiles[email] = dict(perfil)
+        self._notificar_perfil(email, perfil)
+        return perfil
+
+    def perfiles(self):
+        """Itera (email, perfil) de todos los usuarios"""
+        with self._lock:
+            filas = self._conexion.execute("SELECT email, perfil FROM usuarios").fetchall()
+        for email, perfil in filas:
+            yield email, json.loads(perfil)
+
+    # Dispositivos
+
+    def dispositivos(self, email):
+        """Dispositivos del usuario en orden de alta"""
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT datos FROM dispositivos WHERE email = ? ORDER BY rowid", (email,)
+            ).fetchall()
+        return [json.loads(fila[0]) for fila in filas]
+
+    def guardar_dispositivos(self, email, guardar, eliminar=(), reemplazar=False):
+        """
+        Aplica en una transacción los cambios de dispositivos de un usuario.
+
+        Args:
+            guardar: device_dicts a insertar o actualizar
+            eliminar: IDs a borrar
+            reemplazar: borrar además los que no estén en `guardar`
+        """
+        sentencias = [
+            ("DELETE FROM dispositivos WHERE email = ? AND id = ?", (email, device_id))
+            for device_id in eliminar
+        ]
+        if reemplazar:
+            ids = [device["id"] for device in guardar]
+            marcadores = ", ".join("?" * len(ids))
+            sentencias.append((
+                f"DELETE FROM dispositivos WHERE email = ? AND id NOT IN ({marcadores})", (email, *ids)
+            ))
+        sentencias.extend(
+            ("INSERT INTO dispositivos (email, id, tipo, zona, datos) VALUES (?, ?, ?, ?, ?) "
+             "ON CONFLICT(email, id) DO UPDATE SET tipo = excluded.tipo, zona = excluded.zona, "
+             "datos = excluded.datos",
+             (email, device["id"], device.get("tipo"), device["zona"], json.dumps(device, ensure_ascii=False)))
+            for device in guardar
+        )
+        self._transaccion(sentencias)
+
+    # Chat IDs de Telegram
+
+    def chat_ids(self):
+        """{email: chat_id}"""
+        with self._lock:
+            return dict(self._conexion.execute("SELECT email, chat_id FROM chat_ids").fetchall())
+
+    def guardar_chat_id(self, email, chat_id):
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO chat_ids (email, chat_id) VALUES (?, ?)", (email, str(chat_id))
+            )
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+# Un almacén por carpeta de datos, compartido entre UserManager, bots y dispositivos
+_almacenes = {}
+_almacenes_lock = threading.Lock()
+
+
+def obtener_almacen_usuarios(data_dir="data"):
+    """Obtiene el almacén compartido de una carpeta de datos"""
+    clave = Path(data_dir).resolve()
+    with _almacenes_lock:
+        if clave not in _almacenes:
+            _almacenes[clave] = AlmacenUsuarios(clave)
+        return _almacenes[clave]
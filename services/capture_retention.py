@@ -0,0 +1,289 @@
+"""
+Retención y almacenamiento escalonado de capturas
+Un thread en segundo plano recorre, en lotes y usando el catálogo (sin
+listar carpetas), cada carpeta de capturas:
+
+1. Borra lo que supera `dias_maximos`
+2. Archiva en un zip diario las que tienen más de `dias_archivar` días
+3. Recomprime las capturas con más de `dias_recomprimir` días
+4. Borra las miniaturas de la galería que llevan `dias_miniaturas` sin
+   usarse (las de capturas borradas, archivadas o recomprimidas dejan de usarse)
+5. Si se supera la cuota (que incluye las miniaturas), borra primero las
+   miniaturas menos usadas y luego lo más antiguo hasta quedar dentro de ella
+"""
+
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+from models.capture_catalog import obtener_catalogo
+
+
+class PoliticaRetencion(NamedTuple):
+    """Límites de una carpeta de capturas"""
+    dias_maximos: float = 30
+    cuota_mb: float = 2048
+    dias_recomprimir: float = 2
+    escala_recomprimida: float = 0.5
+    calidad_recomprimida: int = 60
+    dias_archivar: float = 7
+    dias_miniaturas: float = 7
+
+
+class GestorRetencion:
+    """
+    Aplica una PoliticaRetencion a cada carpeta registrada.
+
+    Cada ciclo procesa como mucho `lote` capturas por etapa y carpeta, así
+    un ciclo nunca se vuelve largo; lo que queda se termina en los siguientes.
+    """
+
+    def __init__(self, intervalo_segundos=600, lote=200):
+        self.intervalo_segundos = intervalo_segundos
+        self.lote = lote
+        self.carpetas = {}  # Path -> PoliticaRetencion
+
+        self._thread = None
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+
+    def agregar_carpeta(self, carpeta, politica=None):
+        """Registra una carpeta con su política (o la de por defecto)"""
+        self.carpetas[Path(carpeta)] = politica or PoliticaRetencion()
+
+    # Thread en segundo plano
+
+    def iniciar(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._loop, name="retencion-capturas", daemon=True)
+        self._thread.start()
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def solicitar_ciclo(self):
+        """Adelanta el próximo ciclo (p. ej. tras cambiar una política)"""
+        self._despertar.set()
+
+    def _loop(self):
+        while not self._detener.is_set():
+            self.ejecutar_ciclo()
+            self._despertar.wait(self.intervalo_segundos)
+            self._despertar.clear()
+
+    def ejecutar_ciclo(self, ahora=None):
+        """Aplica la política de cada carpeta. Retorna {carpeta: resumen}"""
+        resumenes = {}
+        with self._lock:
+            for carpeta, politica in list(self.carpetas.items()):
+                if self._detener.is_set():
+                    break
+                if not carpeta.exists():
+                    continue
+                try:
+                    resumenes[str(carpeta)] = self._procesar(carpeta, politica, ahora or time.time())
+                except Exception as e:
+                    print(f"❌ Error en retención de {carpeta}: {e}")
+        return resumenes
+
+    # Etapas
+
+    def _procesar(self, carpeta, politica, ahora):
+        catalogo = obtener_catalogo(carpeta)
+        dia = 86400
+        limite_maximo = ahora - politica.dias_maximos * dia
+        # Cada etapa deja fuera lo que una etapa anterior ya eliminó o archivó
+        resumen = {'eliminadas': self._eliminar_antiguas(catalogo, limite_maximo)}
+        resumen['archivadas'] = self._archivar(
+            catalogo, limite_maximo, ahora - politica.dias_archivar * dia
+        )
+        resumen['recomprimidas'] = self._recomprimir(
+            catalogo, politica, limite_maximo, ahora - politica.dias_recomprimir * dia
+        )
+        cuota_bytes = politica.cuota_mb * 1024 * 1024
+        resumen['miniaturas_eliminadas'], bytes_miniaturas = self._podar_miniaturas(
+            catalogo, ahora - politica.dias_miniaturas * dia, cuota_bytes
+        )
+        resumen['eliminadas_cuota'] = self._aplicar_cuota(catalogo, cuota_bytes - bytes_miniaturas)
+        resumen['bytes'] = catalogo.bytes_totales() + bytes_miniaturas
+
+        if any(resumen[k] for k in ('recomprimidas', 'archivadas', 'eliminadas',
+                                    'miniaturas_eliminadas', 'eliminadas_cuota')):
+            print(f"🧹 Retención {carpeta}: {resumen}")
+        return resumen
+
+    def _recomprimir(self, catalogo, politica, desde, hasta):
+        capturas = catalogo.pagina(0, self.lote, desde=desde, hasta=hasta, estado="original",
+                                   recientes_primero=False)
+        for captura in capturas:
+            try:
+                tamano = self._recomprimir_archivo(captura.ruta, politica)
+                catalogo.actualizar(captura.ruta, bytes=tamano, estado="recomprimida")
+            except FileNotFoundError:
+                catalogo.eliminar(captura.ruta)
+            except Exception as e:
+                print(f"⚠️ No se pudo recomprimir {captura.ruta.name}: {e}")
+                # Marcarla para no reintentar en cada ciclo
+                catalogo.actualizar(captura.ruta, estado="recomprimida")
+        return len(capturas)
+
+    @staticmethod
+    def _recomprimir_archivo(ruta, politica):
+        """Reduce y recomprime un JPEG en su lugar; conserva la fecha. Retorna bytes"""
+        stat = ruta.stat()
+        with Image.open(ruta) as img:
+            tamano = (max(1, int(img.width * politica.escala_recomprimida)),
+                      max(1, int(img.height * politica.escala_recomprimida)))
+            img.draft("RGB", tamano)  # El decodificador JPEG ya reduce la imagen
+            img = img.convert("RGB").resize(tamano, Image.Resampling.BILINEAR)
+        temporal = ruta.with_suffix(".tmp")
+        img.save(temporal, "JPEG", quality=politica.calidad_recomprimida, optimize=True)
+        os.replace(temporal, ruta)
+        os.utime(ruta, (stat.st_atime, stat.st_mtime))
+        return ruta.stat().st_size
+
+    def _archivar(self, catalogo, desde, hasta):
+        """Mueve las capturas de [desde, hasta) a zips diarios archivo/capturas_YYYY-MM-DD.zip"""
+        capturas = catalogo.pagina(0, self.lote, desde=desde, hasta=hasta, recientes_primero=False)
+        if not capturas:
+            return 0
+
+        por_dia = {}
+        for captura in capturas:
+            fecha = datetime.fromtimestamp(captura.timestamp).strftime("%Y-%m-%d")
+            por_dia.setdefault(fecha, []).append(captura)
+
+        carpeta_archivo = catalogo.carpeta / catalogo.CARPETA_ARCHIVO
+        carpeta_archivo.mkdir(exist_ok=True)
+        archivadas = 0
+        for fecha, del_dia in por_dia.items():
+            ruta_zip = carpeta_archivo / f"capturas_{fecha}.zip"
+            movidas = []
+            # JPEG ya está comprimido: se guarda sin volver a comprimir
+            with zipfile.ZipFile(ruta_zip, "a", compression=zipfile.ZIP_STORED) as paquete:
+                existentes = set(paquete.namelist())
+                for captura in del_dia:
+                    if captura.ruta.exists() and captura.ruta.name not in existentes:
+                        paquete.write(captura.ruta, captura.ruta.name)
+                    movidas.append(captura.ruta)
+            for ruta in movidas:
+                ruta.unlink(missing_ok=True)
+            catalogo.eliminar_varias(movidas)
+            catalogo.registrar_archivo(ruta_zip, fecha, len(movidas), ruta_zip.stat().st_size)
+            archivadas += len(movidas)
+        return archivadas
+
+    def _eliminar_antiguas(self, catalogo, limite):
+        """Borra capturas y paquetes diarios anteriores a `limite`"""
+        eliminadas = self.eliminar_capturas(catalogo, hasta=limite)
+        fecha_limite = datetime.fromtimestamp(limite).strftime("%Y-%m-%d")
+        for archivo in catalogo.archivos(hasta_fecha=fecha_limite, limite=self.lote):
+            archivo.ruta.unlink(missing_ok=True)
+            catalogo.eliminar_archivo(archivo.ruta)
+            eliminadas += archivo.capturas
+        return eliminadas
+
+    @staticmethod
+    def _podar_miniaturas(catalogo, limite, cuota_bytes):
+        """
+        Borra las miniaturas en disco sin usar desde `limite` y, si capturas +
+        miniaturas superan la cuota, también las menos usadas (se regeneran).
+        Retorna (borradas, bytes que quedan en miniaturas)
+        """
+        miniaturas = []
+        try:
+            with os.scandir(catalogo.carpeta / catalogo.CARPETA_MINIATURAS) as entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_file():
+                            stat = entrada.stat()
+                            miniaturas.append((stat.st_mtime, stat.st_size, entrada.path))
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            return 0, 0
+
+        miniaturas.sort()  # Menos usadas primero
+        restantes = sum(tamano for _, tamano, _ in miniaturas)
+        exceso = catalogo.bytes_totales() + restantes - cuota_bytes
+        borradas = 0
+        for mtime, tamano, ruta in miniaturas:
+            if mtime >= limite and exceso <= 0:
+                break
+            Path(ruta).unlink(missing_ok=True)
+            borradas += 1
+            restantes -= tamano
+            exceso -= tamano
+        return borradas, restantes
+
+    def _aplicar_cuota(self, catalogo, cuota_bytes):
+        """Borra lo más antiguo (paquetes primero) hasta quedar bajo la cuota"""
+        eliminadas = 0
+        exceso = catalogo.bytes_totales() - cuota_bytes
+        while exceso > 0:
+            archivos = catalogo.archivos(limite=1)
+            if archivos:
+                archivos[0].ruta.unlink(missing_ok=True)
+                catalogo.eliminar_archivo(archivos[0].ruta)
+                eliminadas += archivos[0].capturas
+                exceso -= archivos[0].bytes
+                continue
+            capturas = catalogo.pagina(0, 20, recientes_primero=False)
+            if not capturas:
+                break
+            # Solo las necesarias de la página para quedar bajo la cuota
+            borrar = []
+            for captura in capturas:
+                if exceso <= 0:
+                    break
+                borrar.append(captura)
+                exceso -= captura.bytes
+            eliminadas += self._borrar_capturas(catalogo, borrar)
+        return eliminadas
+
+    def eliminar_capturas(self, catalogo, hasta=None, limite=None):
+        """Borra archivos y filas de las capturas más antiguas (anteriores a `hasta`)"""
+        capturas = catalogo.pagina(0, limite or self.lote, hasta=hasta, recientes_primero=False)
+        return self._borrar_capturas(catalogo, capturas)
+
+    @staticmethod
+    def _borrar_capturas(catalogo, capturas):
+        for captura in capturas:
+            captura.ruta.unlink(missing_ok=True)
+            print(f"🗑️ Eliminado: {captura.ruta.name}")
+        catalogo.eliminar_varias([c.ruta for c in capturas])
+        return len(capturas)
+
+    def eliminar_antiguas(self, carpeta, dias=30):
+        """Borra ya todas las capturas con más de `dias` días de una carpeta"""
+        catalogo = obtener_catalogo(carpeta)
+        limite = time.time() - dias * 86400
+        eliminadas = 0
+        with self._lock:
+            while (borradas := self.eliminar_capturas(catalogo, hasta=limite)):
+                eliminadas += borradas
+        return eliminadas
+
+
+_gestor = None
+
+
+def obtener_gestor_retencion():
+    """Obtiene el gestor de retención global"""
+    global _gestor
+    if _gestor is None:
+        _gestor = GestorRetencion()
+    return _gestor
@@ -3,6 +3,8 @@ Servicio de manejo de eventos del hardware
 Procesa y clasifica eventos recibidos del Raspberry Pi
 """
 
+from utils.protocol import parse_event_line, parse_event_lines
+
 
 class EventService:
     """
@@ -29,76 +31,23 @@ class EventService:
             'raw': str        # Mensaje original
         }
         """
-        if not raw_message:
-            return None
-        
-        # Ignorar mensajes de sistema
-        if any(raw_message.startswith(prefix) for prefix in ["SYSTEM:", "SENSORES:", "HEARTBEAT:", "OK:", "ERROR_SERIAL"]):
-            return None
-        
-        # Parsear formato "EVENT:TIPO:ESTADO"
-        parts = raw_message.split(":")
-        
-        if len(parts) < 2 or parts[0] != "EVENT":
+        evento = parse_event_line(raw_message)
+        if evento is None or evento.info is None:
             return None
         
-        event_type = parts[1]
-        event_state = parts[2] if len(parts) > 2 else ""
-        
-        # Mapeo de tipos de hardware a tipos de evento
-        event_map = {
-            'PIR': {
-                'type': 'motion',
-                'device': 'Sensor PIR',
-                'message': '🚶 Movimiento detectado',
-                'priority': 'medium'
-            },
-            'HUMO': {
-                'type': 'smoke',
-                'device': 'Detector de Humo',
-                'message': '💨 Humo detectado',
-                'priority': 'high'
-            },
-            'PANICO': {
-                'type': 'panic',
-                'device': 'Botón de Pánico',
-                'message': '🚨 ALARMA activada',
-                'priority': 'critical'
-            },
-            'SILENCIO': {
-                'type': 'panic',
-                'device': 'Alarma Silenciosa',
-                'message': '🚨 ALARMA SILENCIOSA activada',
-                'priority': 'critical'
-            },
-            'PUERTA': {
-                'type': 'door',
-                'device': 'Sensor de Puerta',
-                'message': f'🚪 Puerta/Ventana {event_state}',
-                'priority': 'medium' if event_state == "ABIERTA" else 'low'
-            },
-            'LASER': {
-                'type': 'laser',
-                'device': 'Detector Láser',
-                'message': f'🔴 Perímetro láser {event_state}',
-                'priority': 'high' if event_state == "INTERRUMPIDO" else 'low'
-            },
-            'CERRADURA': {
-                'type': 'lock',
-                'device': 'Cerradura Inteligente',
-                'message': f'🔒 Cerradura {event_state}',
-                'priority': 'medium'
-            }
-        }
-        
-        if event_type not in event_map:
-            return None
+        return evento.as_dict()
+    
+    def parse_events(self, raw_messages):
+        """
+        Parsea un lote de mensajes del hardware en una sola llamada.
         
-        event_info = event_map[event_type].copy()
-        event_info['state'] = event_state
-        event_info['raw'] = raw_message
+        Args:
+            raw_messages: iterable de str - Mensajes crudos del serial
         
-        return event_info
+        Returns:
+            list[dict] - Eventos estructurados válidos, en orden de llegada
+        """
+        return [e.as_dict() for e in parse_event_lines(raw_messages) if e.info is not None]
     
     def should_notify(self, event):
         """
@@ -3,6 +3,8 @@ Servicio de notificaciones Telegram
 Encapsula toda la lógica de envío de mensajes
 """
 
+from controllers.telegram_outbox import completed_future
+
 try:
     from controllers.BotMesajes import TelegramBot
     TELEGRAM_AVAILABLE = True
@@ -15,7 +17,7 @@ class TelegramService:
     Servicio que maneja notificaciones por Telegram.
     """
     
-    def __init__(self, bot_token):
+    def __init__(self, bot_token, coalesce_window=30, rate_per_chat=1.0, burst_per_chat=3):
         self.bot = None
         self.available = TELEGRAM_AVAILABLE
         
@@ -24,7 +26,13 @@ class TelegramService:
             return
         
         try:
-            self.bot = TelegramBot(bot_token)
+            # El bot aplica el límite por chat y agrupa alertas repetidas
+            self.bot = TelegramBot(
+                bot_token,
+                alert_window=coalesce_window,
+                alert_rate=rate_per_chat,
+                alert_burst=burst_per_chat
+            )
             
             # Verificar conexión
             bot_info = self.bot.get_me()
@@ -40,13 +48,18 @@ class TelegramService:
             self.bot = None
             self.available = False
     
+    def close(self):
+        """Envía los resúmenes pendientes, espera las alertas y libera las conexiones"""
+        if self.bot is not None:
+            self.bot.close()
+    
     def is_connected(self):
         """Verifica si el bot está disponible"""
         return self.available and self.bot is not None
     
     def send_alert(self, user_email, title, message):
         """
-        Envía una alerta al usuario.
+        Encola una alerta para el usuario (no bloquea al llamador).
         
         Args:
             user_email: str - Email del usuario
@@ -54,52 +67,81 @@ class TelegramService:
             message: str - Mensaje de la alerta
         
         Returns:
-            tuple (success: bool, result: str)
+            Future que se resuelve con tuple (success: bool, result: str)
+        """
+        if not self.is_connected():
+            return completed_future((False, "Bot de Telegram no disponible"))
+        
+        formatted_message = f"🔔 <b>{title}</b>\n\n{message}"
+        return self.bot.send_message_to_user_async(user_email, formatted_message, parse_mode='HTML')
+    
+    def _send_throttled_alert(self, user_email, device, event_type, title, message, priority):
+        """
+        Envía una alerta pasando por el límite por chat y la agrupación.
+        Las alertas de prioridad 1 nunca se retrasan ni se agrupan.
+        
+        Returns:
+            Future que se resuelve con tuple (success: bool, result: str)
         """
         if not self.is_connected():
-            return False, "Bot de Telegram no disponible"
+            return completed_future((False, "Bot de Telegram no disponible"))
         
         formatted_message = f"🔔 <b>{title}</b>\n\n{message}"
-        return self.bot.send_message_to_user(user_email, formatted_message, parse_mode='HTML')
+        return self.bot.send_alert_to_user_async(user_email, device, event_type, title, formatted_message, priority)
     
     def send_motion_alert(self, user_email, device_name):
-        """Envía alerta de movimiento detectado"""
-        return self.send_alert(
+        """Envía alerta de movimiento detectado (agrupada si se repite)"""
+        return self._send_throttled_alert(
             user_email,
+            device_name,
+            "motion",
             "Sensor de Movimiento",
-            f"🚶 Movimiento detectado en {device_name}"
+            f"🚶 Movimiento detectado en {device_name}",
+            priority=2
         )
     
     def send_smoke_alert(self, user_email, device_name):
-        """Envía alerta de humo detectado"""
-        return self.send_alert(
+        """Envía alerta de humo detectado (inmediata)"""
+        return self._send_throttled_alert(
             user_email,
+            device_name,
+            "smoke",
             "Detector de Humo",
-            f"💨 Humo detectado en {device_name}"
+            f"💨 Humo detectado en {device_name}",
+            priority=1
         )
     
     def send_panic_alert(self, user_email, device_name):
-        """Envía alerta de pánico"""
-        return self.send_alert(
+        """Envía alerta de pánico (inmediata)"""
+        return self._send_throttled_alert(
             user_email,
+            device_name,
+            "panic",
             "¡ALERTA DE SEGURIDAD!",
-            f"🚨 Alarma activada en {device_name}"
+            f"🚨 Alarma activada en {device_name}",
+            priority=1
         )
     
     def send_door_alert(self, user_email, state):
-        """Envía alerta de puerta/ventana"""
-        return self.send_alert(
+        """Envía alerta de puerta/ventana (agrupada si se repite)"""
+        return self._send_throttled_alert(
             user_email,
+            "Puerta/Ventana",
+            f"door:{state}",
             "Alerta de Acceso",
-            f"🚪 Puerta/Ventana {state}"
+            f"🚪 Puerta/Ventana {state}",
+            priority=3
         )
     
     def send_laser_alert(self, user_email):
-        """Envía alerta de perímetro láser interrumpido"""
-        return self.send_alert(
+        """Envía alerta de perímetro láser interrumpido (agrupada si se repite)"""
+        return self._send_throttled_alert(
             user_email,
+            "Perímetro láser",
+            "laser",
             "Alerta de Seguridad",
-            "🔴 Perímetro láser INTERRUMPIDO"
+            "🔴 Perímetro láser INTERRUMPIDO",
+            priority=2
         )
     
     def link_user(self, user_email):
@@ -0,0 +1,112 @@
+"""
+Pruebas del limitador y agrupador de alertas con un reloj simulado
+(no envía nada a Telegram: send_fn registra los mensajes).
+"""
+
+import sys
+import os
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.alert_throttle import AlertThrottle, TokenBucket
+from controllers.telegram_outbox import completed_future
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+
+def _throttle(reloj, **kwargs):
+    enviados = []
+
+    def enviar(chat, texto):
+        enviados.append((chat, texto))
+        return completed_future((True, "ok"))
+
+    # Ventana larga: los timers no llegan a dispararse durante la prueba
+    kwargs.setdefault("window_seconds", 3600)
+    return AlertThrottle(enviar, clock=reloj, **kwargs), enviados
+
+
+def test_token_bucket_recarga_con_el_reloj():
+    reloj = RelojFalso()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=reloj)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.wait_time() == 1.0
+
+    reloj.avanzar(0.5)
+    assert not bucket.try_acquire()
+    reloj.avanzar(0.5)
+    assert bucket.try_acquire()
+
+
+def test_repeticiones_se_agrupan_en_un_resumen():
+    reloj = RelojFalso()
+    throttle, enviados = _throttle(reloj)
+
+    assert throttle.submit("42", "PIR", "motion", "Sensor", "mov 1", priority=2).result() == (True, "ok")
+    for _ in range(13):
+        reloj.avanzar(2)
+        assert throttle.submit("42", "PIR", "motion", "Sensor", "mov", priority=2).result() == \
+            (True, "Alerta agrupada")
+    assert enviados == [("42", "mov 1")]
+
+    throttle.flush()
+    assert len(enviados) == 2
+    assert "PIR: 14 detecciones en 26 s" in enviados[1][1]
+
+
+def test_sin_repeticiones_no_hay_resumen():
+    reloj = RelojFalso()
+    throttle, enviados = _throttle(reloj)
+    throttle.submit("42", "PIR", "motion", "Sensor", "mov", priority=2)
+    throttle.flush()
+    assert enviados == [("42", "mov")]
+
+
+def test_prioridad_1_nunca_se_agrupa_ni_retrasa():
+    reloj = RelojFalso()
+    throttle, enviados = _throttle(reloj, burst=1)
+    for _ in range(5):
+        throttle.submit("42", "Humo", "smoke", "Humo", "humo", priority=1)
+    assert len(enviados) == 5
+
+
+def test_limite_por_chat_y_no_entre_chats():
+    reloj = RelojFalso()
+    throttle, enviados = _throttle(reloj, burst=2, rate=0.1)
+    throttle.submit("42", "A", "motion", "A", "a", priority=2)
+    throttle.submit("42", "B", "motion", "B", "b", priority=2)
+    # Sin fichas en el chat 42: la tercera queda pendiente para el resumen
+    assert throttle.submit("42", "C", "motion", "C", "c", priority=2).result() == (True, "Alerta agrupada")
+    throttle.submit("7", "C", "motion", "C", "c", priority=2)
+    assert enviados == [("42", "a"), ("42", "b"), ("7", "c")]
+
+
+def test_flush_envia_resumen_aunque_no_haya_fichas():
+    reloj = RelojFalso()
+    throttle, enviados = _throttle(reloj, burst=1, rate=0.001)
+    throttle.submit("42", "PIR", "motion", "Sensor", "mov", priority=2)
+    throttle.submit("42", "PIR", "motion", "Sensor", "mov", priority=2)
+
+    # El cierre no debe reprogramar el timer ni perder el resumen
+    throttle.flush()
+    assert len(enviados) == 2
+    assert "PIR: 2 detecciones" in enviados[1][1]
+    assert not throttle._ventanas
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
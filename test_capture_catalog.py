@@ -0,0 +1,90 @@
+"""
+Pruebas del catálogo de capturas: los cambios propios (registrar/eliminar)
+no fuerzan un reindexado completo y los externos sí.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.capture_catalog import CatalogoCapturas
+
+
+def _con_catalogo(prueba):
+    with tempfile.TemporaryDirectory() as carpeta:
+        catalogo = CatalogoCapturas(carpeta)
+        # Contar los reindexados completos
+        catalogo.reindexados = 0
+        sincronizar = catalogo.sincronizar
+
+        def contar():
+            catalogo.reindexados += 1
+            return sincronizar()
+        catalogo.sincronizar = contar
+        try:
+            prueba(catalogo, Path(carpeta))
+        finally:
+            catalogo.cerrar()
+
+
+def _jpeg(ruta):
+    ruta.write_bytes(b"\xff\xd8\xff\xd9")
+    return ruta
+
+
+def test_registrar_no_fuerza_reindexado():
+    def prueba(catalogo, carpeta):
+        for i in range(3):
+            catalogo.registrar(_jpeg(carpeta / f"captura_auto_{i}.jpg"))
+        assert catalogo.sincronizar_si_cambio() == (0, 0)
+        assert catalogo.reindexados == 0
+        assert catalogo.contar() == 3
+    _con_catalogo(prueba)
+
+
+def test_eliminar_no_fuerza_reindexado():
+    def prueba(catalogo, carpeta):
+        rutas = [_jpeg(carpeta / f"captura_auto_{i}.jpg") for i in range(3)]
+        for ruta in rutas:
+            catalogo.registrar(ruta)
+        rutas[0].unlink()
+        catalogo.eliminar(rutas[0])
+        for ruta in rutas[1:]:
+            ruta.unlink()
+        catalogo.eliminar_varias(rutas[1:])
+        assert catalogo.sincronizar_si_cambio() == (0, 0)
+        assert catalogo.reindexados == 0
+        assert catalogo.contar() == 0
+    _con_catalogo(prueba)
+
+
+def test_archivo_externo_fuerza_reindexado():
+    def prueba(catalogo, carpeta):
+        _jpeg(carpeta / "captura_manual_copiada.jpg")
+        assert catalogo.sincronizar_si_cambio() == (1, 0)
+        assert catalogo.reindexados == 1
+        assert catalogo.recientes(1)[0].tipo == "manual"
+    _con_catalogo(prueba)
+
+
+def test_registrar_no_oculta_un_cambio_externo_posterior():
+    def prueba(catalogo, carpeta):
+        propia = _jpeg(carpeta / "captura_auto_propia.jpg")
+        _jpeg(carpeta / "captura_auto_copiada.jpg")
+        # La propia se escribió antes del último cambio de la carpeta
+        os.utime(propia, ns=(0, 0))
+        catalogo.registrar(propia)
+        assert catalogo.sincronizar_si_cambio() == (1, 0)
+        assert catalogo.contar() == 2
+    _con_catalogo(prueba)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
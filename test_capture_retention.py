@@ -0,0 +1,146 @@
+"""
+Pruebas de la retención de capturas: cada etapa de ejecutar_ciclo()
+(antigüedad, archivo, recompresión, miniaturas y cuota) sobre una carpeta
+temporal, con capturas fechadas respecto de un `ahora` fijo.
+"""
+
+import sys
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.capture_catalog import obtener_catalogo
+from services.capture_retention import GestorRetencion, PoliticaRetencion
+
+AHORA = datetime(2026, 6, 15, 12, 0).timestamp()
+DIA = 86400
+
+
+def _con_carpeta(prueba, **politica):
+    with tempfile.TemporaryDirectory() as carpeta:
+        carpeta = Path(carpeta)
+        catalogo = obtener_catalogo(carpeta)
+        gestor = GestorRetencion()
+        gestor.agregar_carpeta(carpeta, PoliticaRetencion(**politica))
+        try:
+            prueba(gestor, catalogo, carpeta)
+        finally:
+            catalogo.cerrar()
+
+
+def _captura(catalogo, carpeta, nombre, dias, tamano=(640, 480)):
+    """JPEG registrado con `dias` de antigüedad"""
+    ruta = carpeta / nombre
+    Image.new("RGB", tamano, "gray").save(ruta, "JPEG", quality=95)
+    catalogo.registrar(ruta, timestamp=AHORA - dias * DIA)
+    return ruta
+
+
+def _miniatura(carpeta, nombre, dias, bytes=1000):
+    """Miniatura en disco usada por última vez hace `dias`"""
+    ruta = carpeta / ".miniaturas" / nombre
+    ruta.parent.mkdir(exist_ok=True)
+    ruta.write_bytes(b"\0" * bytes)
+    os.utime(ruta, (AHORA - dias * DIA, AHORA - dias * DIA))
+    return ruta
+
+
+def _resumen(gestor, carpeta):
+    return gestor.ejecutar_ciclo(ahora=AHORA)[str(carpeta)]
+
+
+def test_borra_las_que_superan_dias_maximos():
+    def prueba(gestor, catalogo, carpeta):
+        vieja = _captura(catalogo, carpeta, "captura_auto_vieja.jpg", 40)
+        nueva = _captura(catalogo, carpeta, "captura_auto_nueva.jpg", 0)
+        assert _resumen(gestor, carpeta)['eliminadas'] == 1
+        assert not vieja.exists() and nueva.exists()
+        assert [c.ruta for c in catalogo.recientes(10)] == [nueva]
+    _con_carpeta(prueba)
+
+
+def test_archiva_en_zip_diario():
+    def prueba(gestor, catalogo, carpeta):
+        rutas = [_captura(catalogo, carpeta, f"captura_auto_{i}.jpg", 10) for i in range(2)]
+        assert _resumen(gestor, carpeta)['archivadas'] == 2
+        assert not any(ruta.exists() for ruta in rutas)
+        assert catalogo.contar() == 0
+
+        fecha = datetime.fromtimestamp(AHORA - 10 * DIA).strftime("%Y-%m-%d")
+        archivo, = catalogo.archivos()
+        assert archivo.fecha == fecha and archivo.capturas == 2
+        with zipfile.ZipFile(archivo.ruta) as paquete:
+            assert sorted(paquete.namelist()) == ["captura_auto_0.jpg", "captura_auto_1.jpg"]
+    _con_carpeta(prueba)
+
+
+def test_recomprime_y_conserva_la_fecha():
+    def prueba(gestor, catalogo, carpeta):
+        ruta = _captura(catalogo, carpeta, "captura_auto_1.jpg", 3)
+        mtime, tamano = ruta.stat().st_mtime, ruta.stat().st_size
+        assert _resumen(gestor, carpeta)['recomprimidas'] == 1
+
+        captura, = catalogo.recientes(1)
+        assert captura.estado == "recomprimida"
+        assert captura.bytes == ruta.stat().st_size < tamano
+        assert ruta.stat().st_mtime == mtime
+        with Image.open(ruta) as img:
+            assert img.size == (320, 240)
+        # Ya recomprimida: el ciclo siguiente no la vuelve a tocar
+        assert _resumen(gestor, carpeta)['recomprimidas'] == 0
+    _con_carpeta(prueba)
+
+
+def test_borra_miniaturas_sin_usar():
+    def prueba(gestor, catalogo, carpeta):
+        vieja = _miniatura(carpeta, "vieja.jpg", 10)
+        usada = _miniatura(carpeta, "usada.jpg", 1)
+        resumen = _resumen(gestor, carpeta)
+        assert resumen['miniaturas_eliminadas'] == 1
+        assert resumen['bytes'] == 1000
+        assert not vieja.exists() and usada.exists()
+    _con_carpeta(prueba)
+
+
+def test_cuota_incluye_miniaturas_y_las_borra_primero():
+    def prueba(gestor, catalogo, carpeta):
+        captura = _captura(catalogo, carpeta, "captura_auto_1.jpg", 0)
+        bytes_captura = captura.stat().st_size
+        miniatura = _miniatura(carpeta, "usada.jpg", 0, bytes=4096)
+        # Cabe la captura o la miniatura, no ambas
+        cuota_mb = (bytes_captura + 2048) / (1024 * 1024)
+        gestor.agregar_carpeta(carpeta, PoliticaRetencion(cuota_mb=cuota_mb))
+
+        resumen = _resumen(gestor, carpeta)
+        assert resumen['miniaturas_eliminadas'] == 1
+        assert resumen['eliminadas_cuota'] == 0
+        assert not miniatura.exists() and captura.exists()
+    _con_carpeta(prueba)
+
+
+def test_cuota_borra_lo_mas_antiguo():
+    def prueba(gestor, catalogo, carpeta):
+        rutas = [_captura(catalogo, carpeta, f"captura_auto_{i}.jpg", 1 - i * 0.1) for i in range(3)]
+        bytes_captura = max(ruta.stat().st_size for ruta in rutas)
+        cuota_mb = (bytes_captura * 2 + 100) / (1024 * 1024)
+        gestor.agregar_carpeta(carpeta, PoliticaRetencion(cuota_mb=cuota_mb))
+
+        resumen = _resumen(gestor, carpeta)
+        assert resumen['eliminadas_cuota'] == 1
+        assert resumen['bytes'] <= cuota_mb * 1024 * 1024
+        assert [ruta.exists() for ruta in rutas] == [False, True, True]
+    _con_carpeta(prueba)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
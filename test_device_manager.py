@@ -0,0 +1,123 @@
+"""
+Pruebas del registro de dispositivos y su escritura diferida
+(archivo JSON y almacén SQLite en carpetas temporales).
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.device_manager import DeviceManager
+from models.user_store import AlmacenUsuarios
+
+
+def _device(device_id, zona="Sala", tipo="pir"):
+    return {"id": device_id, "tipo": tipo, "zona": zona, "active": True}
+
+
+class AlmacenLento:
+    """Almacén que bloquea la escritura hasta que se lo liberen (o falla)"""
+
+    def __init__(self, fallar=False):
+        self.fallar = fallar
+        self.escribiendo = threading.Event()
+        self.liberar = threading.Event()
+        self.escrituras = []
+
+    def dispositivos(self, email):
+        return []
+
+    def guardar_dispositivos(self, email, guardar, eliminar=(), reemplazar=False):
+        self.escribiendo.set()
+        self.liberar.wait(5)
+        if self.fallar:
+            raise OSError("disco lleno")
+        self.escrituras.append(([d["id"] for d in guardar], list(eliminar), reemplazar))
+
+
+def test_escritura_diferida_en_json():
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = os.path.join(carpeta, "devices.json")
+        manager = DeviceManager(archivo, debounce_segundos=0.05)
+        manager.add_device(_device("PIR 1"))
+        manager.add_device(_device("Humo", zona="Cocina", tipo="humo"))
+        assert not os.path.exists(archivo)
+
+        limite = time.monotonic() + 5
+        while not os.path.exists(archivo) and time.monotonic() < limite:
+            time.sleep(0.02)
+        with open(archivo, encoding="utf-8") as f:
+            data = json.load(f)
+        assert [d["id"] for d in data["devices_by_zone"]["Sala"]] == ["PIR 1"]
+        assert [d["id"] for d in data["devices_by_zone"]["Cocina"]] == ["Humo"]
+
+        # Recargar respeta zonas e índices
+        otro = DeviceManager(archivo)
+        assert [d["id"] for d in otro.devices_of_type("humo")] == ["Humo"]
+
+
+def test_flush_incremental_en_almacen():
+    with tempfile.TemporaryDirectory() as carpeta:
+        store = AlmacenUsuarios(carpeta)
+        try:
+            manager = DeviceManager(debounce_segundos=60)
+            manager.set_user_store(store, "a@b.c")
+            manager.add_device(_device("PIR 1"))
+            manager.add_device(_device("PIR 2"))
+            manager.flush()
+            manager.move_device_zone("PIR 2", "Patio")
+            manager.delete_device("PIR 1")
+            assert manager.flush()
+            assert [(d["id"], d["zona"]) for d in store.dispositivos("a@b.c")] == [("PIR 2", "Patio")]
+        finally:
+            store.cerrar()
+
+
+def test_flush_no_bloquea_el_registro_mientras_escribe():
+    store = AlmacenLento()
+    manager = DeviceManager(debounce_segundos=60)
+    manager.set_user_store(store, "a@b.c")
+    manager.add_device(_device("PIR 1"))
+
+    thread = threading.Thread(target=manager.flush)
+    thread.start()
+    assert store.escribiendo.wait(5)
+
+    # La escritura está en curso: el registro sigue disponible
+    inicio = time.monotonic()
+    manager.add_device(_device("PIR 2"))
+    assert time.monotonic() - inicio < 1
+    assert manager._pendientes == {"PIR 2"}
+
+    store.liberar.set()
+    thread.join(5)
+    assert manager.flush()
+    assert store.escrituras == [(["PIR 1"], [], False), (["PIR 2"], [], False)]
+
+
+def test_flush_fallido_deja_los_cambios_pendientes():
+    store = AlmacenLento(fallar=True)
+    store.liberar.set()
+    manager = DeviceManager(debounce_segundos=60)
+    manager.set_user_store(store, "a@b.c")
+    manager.add_device(_device("PIR 1"))
+
+    assert not manager.flush()
+    assert manager._pendientes == {"PIR 1"}
+
+    store.fallar = False
+    assert manager.flush()
+    assert store.escrituras == [(["PIR 1"], [], False)]
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -0,0 +1,77 @@
+"""
+Pruebas de la coincidencia aproximada de placas (confusiones del OCR)
+"""
+
+import sys
+import os
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.plate_matcher import IndiceDifuso
+
+
+def _indice(placas, **kwargs):
+    placas = set(placas)
+    return IndiceDifuso(placas.__contains__, **kwargs)
+
+
+def test_lectura_exacta_cuesta_cero():
+    indice = _indice({"123456"})
+    assert indice.buscar("123456") == [("123456", 0.0)]
+    assert indice.mejor("123456") == ("123456", 0.0)
+
+
+def test_confusion_tipica_del_ocr():
+    indice = _indice({"183456"})
+    # 8 leído como 3: costo 0.4
+    assert indice.mejor("133456") == ("183456", 0.4)
+
+
+def test_dos_confusiones_dentro_del_presupuesto():
+    indice = _indice({"183756"})
+    # 8->3 (0.4) y 7->1 (0.4) = 0.8
+    assert indice.buscar("133156") == [("183756", 0.8)]
+
+
+def test_sustitucion_arbitraria_supera_el_presupuesto():
+    indice = _indice({"123456"})
+    # 2 por 5 no es una confusión conocida: cuesta 1.0 > 0.8
+    assert indice.buscar("153456") == []
+    assert indice.mejor("153456") is None
+
+
+def test_no_pasa_de_max_sustituciones():
+    indice = _indice({"888888"}, costo_maximo=10, max_sustituciones=2)
+    assert indice.buscar("333888") == []
+    assert indice.buscar("338888") == [("888888", 0.8)]
+
+
+def test_resultados_ordenados_por_costo():
+    indice = _indice({"183456", "163456"}, costo_maximo=1.0)
+    # 3->8 cuesta 0.4, 3->6 no está en la matriz (1.0)
+    assert indice.buscar("133456") == [("183456", 0.4), ("163456", 1.0)]
+
+
+def test_empate_es_ambiguo():
+    # El 3 leído puede ser un 1 o un 7 con el mismo costo
+    indice = _indice({"113456", "173456"}, confusiones={("1", "3"): 0.4, ("7", "3"): 0.4})
+    assert len(indice.buscar("133456")) == 2
+    assert indice.mejor("133456") is None
+
+
+def test_placa_registrada_fuera_de_vigencia_no_busca_vecinas():
+    autorizadas = {"183456"}
+    registradas = autorizadas | {"133456"}  # visita vencida
+    indice = IndiceDifuso(autorizadas.__contains__, registrada=registradas.__contains__)
+    assert indice.buscar("133456") == []
+    assert indice.mejor("133456") is None
+    # Una lectura desconocida sí se corrige a la autorizada vecina
+    assert indice.mejor("103456") == ("183456", 0.4)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -0,0 +1,106 @@
+"""
+Pruebas del almacén de placas: journal, compactación y varias instancias
+sobre el mismo archivo (como dos procesos de la aplicación).
+"""
+
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.plate_store import AlmacenPlacas
+
+
+def _con_carpeta(prueba):
+    with tempfile.TemporaryDirectory() as carpeta:
+        prueba(os.path.join(carpeta, "placas.json"))
+
+
+def test_journal_se_reproduce_al_abrir():
+    def prueba(archivo):
+        almacen = AlmacenPlacas(archivo, placas_iniciales=["111111"])
+        almacen.agregar("222222")
+        almacen.agregar("333333", hasta=datetime.now() - timedelta(days=1))
+        almacen.eliminar("111111")
+
+        # El archivo principal no se reescribió: los cambios están en el journal
+        with open(archivo, encoding="utf-8") as f:
+            assert json.load(f)["placas_autorizadas"] == ["111111"]
+
+        otra = AlmacenPlacas(archivo)
+        assert otra.listar() == ["222222", "333333"]
+        assert otra.autorizada("222222")
+        assert not otra.autorizada("333333")  # vigencia vencida
+        assert not otra.autorizada("111111")
+    _con_carpeta(prueba)
+
+
+def test_compactacion_vacia_el_journal():
+    def prueba(archivo):
+        almacen = AlmacenPlacas(archivo, max_journal=3)
+        for placa in ("111111", "222222", "333333"):
+            almacen.agregar(placa)
+
+        assert not os.path.exists(archivo + ".journal")
+        with open(archivo, encoding="utf-8") as f:
+            assert json.load(f)["placas_autorizadas"] == ["111111", "222222", "333333"]
+        # Sin temporales sueltos
+        assert sorted(os.listdir(os.path.dirname(archivo))) == ["placas.json", "placas.json.lock"]
+    _con_carpeta(prueba)
+
+
+def test_compactar_no_pierde_lineas_de_otra_instancia():
+    def prueba(archivo):
+        a = AlmacenPlacas(archivo, max_journal=1000)
+        b = AlmacenPlacas(archivo, max_journal=1000)
+        a.agregar("111111")
+        b.agregar("222222")  # `a` todavía no recargó
+
+        a.compactar()
+        assert a.listar() == ["111111", "222222"]
+
+        c = AlmacenPlacas(archivo)
+        assert c.listar() == ["111111", "222222"]
+
+        # Lo que `b` agregue después de la compactación también se conserva
+        b.agregar("333333")
+        assert AlmacenPlacas(archivo).listar() == ["111111", "222222", "333333"]
+    _con_carpeta(prueba)
+
+
+def test_recargar_detecta_cambios_de_otra_instancia():
+    def prueba(archivo):
+        a = AlmacenPlacas(archivo)
+        b = AlmacenPlacas(archivo)
+        assert not a.recargar(forzar=False)
+        b.agregar("444444")
+        assert a.recargar(forzar=False)
+        assert "444444" in a
+    _con_carpeta(prueba)
+
+
+def test_cambio_propio_no_oculta_uno_ajeno():
+    def prueba(archivo):
+        a = AlmacenPlacas(archivo)
+        b = AlmacenPlacas(archivo)
+        b.agregar("111111")
+        a.agregar("222222")  # `a` no había recargado lo de `b`
+
+        assert "111111" in a and "222222" in a
+        assert not a.recargar(forzar=False)
+
+        # Y en sentido contrario: `b` sigue viendo lo de `a`
+        assert b.recargar(forzar=False)
+        assert b.listar() == ["111111", "222222"]
+    _con_carpeta(prueba)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -0,0 +1,159 @@
+"""
+Pruebas de la cola de salida de Telegram contra un servidor HTTP local
+que imita la API de Telegram (no requiere red ni token real).
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.telegram_outbox import TelegramOutbox
+from controllers.BotMesajes import TelegramBot
+from models.user_manager import UserManager
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """Responde como la API de Telegram y registra cada petición"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        largo = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(largo) or b"{}")
+        self.server.registrar(self.client_address, self.path, payload)
+        time.sleep(self.server.demora)
+
+        if payload.get("chat_id") == "falla":
+            self._responder(400, {"ok": False, "description": "Bad Request"})
+        else:
+            self._responder(200, {"ok": True, "result": {"message_id": 1, "text": payload.get("text")}})
+
+    def do_GET(self):
+        self._responder(200, {"ok": True, "result": {"first_name": "FakeBot"}})
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, demora=0.0):
+        super().__init__(("127.0.0.1", 0), FakeTelegramHandler)
+        self.demora = demora
+        self.peticiones = []
+        self.conexiones = set()
+        self._lock = threading.Lock()
+
+    def registrar(self, cliente, ruta, payload):
+        with self._lock:
+            self.peticiones.append((ruta, payload))
+            self.conexiones.add(cliente)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def _con_servidor(prueba, demora=0.0):
+    servidor = FakeTelegramServer(demora)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        prueba(servidor)
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_envio_asincrono_retorna_future():
+    def prueba(servidor):
+        outbox = TelegramOutbox(f"{servidor.url}/botTOKEN")
+        try:
+            future = outbox.submit("sendMessage", {"chat_id": "1", "text": "hola"})
+            success, result = future.result(timeout=5)
+            assert success
+            assert result["text"] == "hola"
+            assert servidor.peticiones == [("/botTOKEN/sendMessage", {"chat_id": "1", "text": "hola"})]
+        finally:
+            outbox.shutdown()
+    _con_servidor(prueba)
+
+
+def test_envios_concurrentes_y_conexiones_reutilizadas():
+    def prueba(servidor):
+        outbox = TelegramOutbox(f"{servidor.url}/botTOKEN", max_workers=4)
+        try:
+            inicio = time.perf_counter()
+            futures = [outbox.submit("sendMessage", {"chat_id": "1", "text": str(i)}) for i in range(16)]
+            assert all(f.result(timeout=10)[0] for f in futures)
+            duracion = time.perf_counter() - inicio
+
+            # 16 envíos de 0.1 s con 4 trabajadores: ~0.4 s en lugar de 1.6 s
+            assert duracion < 1.2
+            # Las conexiones del pool se reutilizan (keep-alive)
+            assert len(servidor.conexiones) <= 4
+        finally:
+            outbox.shutdown()
+    _con_servidor(prueba, demora=0.1)
+
+
+def test_error_http_se_reporta_en_el_future():
+    def prueba(servidor):
+        outbox = TelegramOutbox(f"{servidor.url}/botTOKEN")
+        try:
+            success, result = outbox.submit("sendMessage", {"chat_id": "falla", "text": "x"}).result(timeout=5)
+            assert not success
+            assert "Error" in result
+        finally:
+            outbox.shutdown()
+    _con_servidor(prueba)
+
+
+def test_envio_despues_de_cerrar():
+    outbox = TelegramOutbox("http://127.0.0.1:9/botTOKEN")
+    outbox.shutdown()
+    assert outbox.submit("sendMessage", {}).result(timeout=1) == (False, "Cola de Telegram cerrada")
+
+
+def test_bot_envia_mensajes_a_usuario_por_la_cola():
+    def prueba(servidor):
+        # Datos en una carpeta temporal: no migrar ni tocar data/ del repositorio
+        carpeta = tempfile.TemporaryDirectory()
+        bot = TelegramBot("TOKEN", api_url=servidor.url, user_manager=UserManager(carpeta.name))
+        try:
+            bot.chat_ids = {"usuario@ejemplo.com": "42"}
+            success, _ = bot.send_message_to_user_async("usuario@ejemplo.com", "alerta").result(timeout=5)
+            assert success
+            assert servidor.peticiones[-1][1]["chat_id"] == "42"
+
+            success, result = bot.send_message_to_user_async("otro@ejemplo.com", "alerta").result(timeout=5)
+            assert not success
+            assert "chat_id" in result
+        finally:
+            bot.close()
+            bot.user_manager.store.cerrar()
+            carpeta.cleanup()
+    _con_servidor(prueba)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -0,0 +1,54 @@
+"""
+Pruebas de la caché de miniaturas: una imagen que ya se está cargando en
+otro thread no se decodifica dos veces y el disco no queda con temporales.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from PIL import Image
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.thumbnail_cache import CacheMiniaturas
+
+
+def test_obtener_espera_la_carga_en_curso():
+    with tempfile.TemporaryDirectory() as carpeta:
+        carpeta = Path(carpeta)
+        ruta = carpeta / "captura_auto_1.jpg"
+        Image.new("RGB", (320, 240), "red").save(ruta, "JPEG")
+        cache = CacheMiniaturas(tamano=(64, 48), carpeta_disco=carpeta / ".miniaturas")
+
+        # Decodificación lenta: el segundo thread llega mientras dura
+        decodificar = cache._decodificar
+        empezo = threading.Event()
+
+        def lento(r):
+            empezo.set()
+            time.sleep(0.2)
+            return decodificar(r)
+        cache._decodificar = lento
+
+        resultados = []
+        precarga = threading.Thread(target=lambda: resultados.append(cache.obtener(ruta)))
+        precarga.start()
+        empezo.wait(1)
+        resultados.append(cache.obtener(ruta))
+        precarga.join()
+
+        assert cache.decodificadas == 1
+        assert resultados[0] is resultados[1]
+        assert [p.suffix for p in (carpeta / ".miniaturas").iterdir()] == [".jpg"]
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -0,0 +1,107 @@
+"""
+Pruebas del almacén SQLite de usuarios: migración del esquema JSON
+anterior (en una carpeta temporal con la misma estructura que data/).
+"""
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.password_hashing import hash_password
+from models.user_manager import UserManager
+from models.user_store import AlmacenUsuarios
+
+
+def _escribir(ruta, datos):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_text(json.dumps(datos, ensure_ascii=False), encoding="utf-8")
+
+
+def _carpeta_json(carpeta):
+    """Estructura anterior: users.json, user_data/*/profile.json y devices.json, chat_ids.json"""
+    carpeta = Path(carpeta)
+    _escribir(carpeta / "users.json", {"ana@ejemplo.com": {"password": hash_password("Clave123")}})
+    _escribir(carpeta / "user_data" / "ana_at_ejemplo_com" / "profile.json",
+              {"email": "ana@ejemplo.com", "telegram": "ana"})
+    _escribir(carpeta / "user_data" / "ana_at_ejemplo_com" / "devices.json", {"devices_by_zone": {
+        "Sala": [{"id": "PIR", "tipo": "pir"}, {"id": "PIR", "tipo": "pir"}],
+        "Cocina": [{"id": "PIR", "tipo": "pir"}, {"id": "Humo", "tipo": "humo"}],
+    }})
+    # Carpeta sin entrada en users.json ni email en el perfil
+    _escribir(carpeta / "user_data" / "HOLA" / "profile.json", {"telegram": "hola_tg"})
+    _escribir(carpeta / "user_data" / "HOLA" / "devices.json",
+              {"devices_by_zone": {"Patio": [{"id": "Laser", "tipo": "laser"}]}})
+    _escribir(carpeta / "chat_ids.json", {"ana@ejemplo.com": 42})
+
+
+def test_migracion_importa_usuarios_dispositivos_y_chat_ids():
+    with tempfile.TemporaryDirectory() as carpeta:
+        _carpeta_json(carpeta)
+        store = AlmacenUsuarios(carpeta)
+        try:
+            assert store.existe("ana@ejemplo.com")
+            assert store.perfil("ana@ejemplo.com")["telegram"] == "ana"
+            assert store.chat_ids() == {"ana@ejemplo.com": "42"}
+
+            # IDs repetidos se renombran en vez de descartarse
+            dispositivos = store.dispositivos("ana@ejemplo.com")
+            assert [(d["id"], d["zona"]) for d in dispositivos] == [
+                ("PIR", "Sala"), ("PIR (2)", "Sala"), ("PIR (3)", "Cocina"), ("Humo", "Cocina")
+            ]
+        finally:
+            store.cerrar()
+
+        # La migración corre una sola vez
+        store = AlmacenUsuarios(carpeta)
+        try:
+            assert len(store.dispositivos("ana@ejemplo.com")) == 4
+        finally:
+            store.cerrar()
+
+
+def test_perfil_sin_contrasena_puede_registrarse():
+    with tempfile.TemporaryDirectory() as carpeta:
+        _carpeta_json(carpeta)
+        manager = UserManager(carpeta)
+        try:
+            # Importado sin contraseña: no cuenta como registrado
+            assert not manager.store.existe("HOLA")
+            assert manager.login("HOLA", "Clave123") == (False, "Usuario no encontrado")
+
+            assert manager.register("HOLA", "Clave123", "nuevo_tg") == (True, "Usuario registrado exitosamente")
+            assert manager.login("HOLA", "Clave123") == (True, "Login exitoso")
+
+            # Conserva lo migrado y toma los datos del registro
+            perfil = manager.get_user_profile("HOLA")
+            assert perfil["telegram"] == "nuevo_tg" and perfil["email"] == "HOLA"
+            assert [d["id"] for d in manager.store.dispositivos("HOLA")] == ["Laser"]
+
+            assert manager.register("HOLA", "Clave123", "x") == (False, "El correo ya está registrado")
+            assert manager.register("ana@ejemplo.com", "Clave123", "x") == (False, "El correo ya está registrado")
+        finally:
+            manager.store.cerrar()
+
+
+def test_registro_y_login_asincronos_no_abren_sesion_en_el_pool():
+    with tempfile.TemporaryDirectory() as carpeta:
+        manager = UserManager(carpeta)
+        try:
+            assert manager.register_async("b@ejemplo.com", "Clave123", "b").result(timeout=10)[0]
+            assert manager.login_async("b@ejemplo.com", "Clave123").result(timeout=10) == (True, "Login exitoso")
+            # current_user lo asigna la pantalla de login en el thread de Tk
+            assert manager.current_user is None
+            assert manager.login_async("b@ejemplo.com", "Otra123").result(timeout=10)[0] is False
+        finally:
+            manager.store.cerrar()
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✅ {nombre}")
@@ -3,4 +3,22 @@ Módulo de utilidades
 Aquí se pueden agregar funciones auxiliares en el futuro
 """
 
-__all__ = []
+from .protocol import (
+    HardwareEvent,
+    DeviceMessage,
+    parse_event_line,
+    parse_event_lines,
+    parse_device_line,
+    parse_device_lines,
+)
+from .estadisticas import percentiles_ms
+
+__all__ = [
+    'HardwareEvent',
+    'DeviceMessage',
+    'parse_event_line',
+    'parse_event_lines',
+    'parse_device_line',
+    'parse_device_lines',
+    'percentiles_ms',
+]
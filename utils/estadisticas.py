@@ -0,0 +1,17 @@
+"""
+Estadísticas de latencia
+Resúmenes por percentiles que comparten el pool OCR, el detector de placas
+y los benchmarks.
+"""
+
+
+def percentiles_ms(muestras):
+    """p50/p90/p99 en milisegundos de muestras en segundos (None si no hay)"""
+    if not muestras:
+        return {'p50': None, 'p90': None, 'p99': None}
+    ordenadas = sorted(muestras)
+    ultimo = len(ordenadas) - 1
+    return {
+        f'p{p}': round(ordenadas[round(ultimo * p / 100)] * 1000, 1)
+        for p in (50, 90, 99)
+    }
@@ -0,0 +1,179 @@
+"""
+Protocolo de mensajes del hardware
+Parser único para los formatos que envía el Raspberry Pi Pico:
+- "EVENT:TIPO:ESTADO"                      (SerialCommunicator / EventService / MainMenu)
+- "DISPOSITIVO:EVENTO:ZONA:DATOS"          (TelegramDeviceIntegration)
+
+Las tablas de búsqueda se construyen una sola vez al importar el módulo y los
+registros que se retornan son tuplas inmutables. Los tipos y estados conocidos
+se reemplazan por la cadena de la tabla, de modo que los mismos eventos
+comparten memoria; lo desconocido (ruido del serial) no se guarda en ninguna
+tabla, así la memoria no crece con datos corruptos.
+"""
+
+import sys
+from typing import NamedTuple, Optional
+
+
+class EventInfo(NamedTuple):
+    """Descripción de un tipo de evento (compartida entre eventos iguales)"""
+    type: str       # 'motion', 'smoke', 'panic', 'door', 'laser', 'lock'
+    device: str     # Nombre del dispositivo
+    message: str    # Mensaje legible para el usuario
+    priority: str   # 'low', 'medium', 'high', 'critical'
+
+
+class HardwareEvent(NamedTuple):
+    """Evento con formato EVENT:TIPO:ESTADO"""
+    tipo: str                   # PIR, HUMO, PUERTA, LASER, PANICO, SILENCIO, CERRADURA
+    estado: str                 # Estado específico ("" si no viene)
+    info: Optional[EventInfo]   # None si el tipo no está en la tabla
+    raw: str                    # Mensaje original
+
+    def as_dict(self):
+        """Retorna el evento con la estructura de diccionario de EventService"""
+        return {
+            'type': self.info.type,
+            'device': self.info.device,
+            'state': self.estado,
+            'message': self.info.message,
+            'priority': self.info.priority,
+            'raw': self.raw
+        }
+
+
+class DeviceMessage(NamedTuple):
+    """Mensaje con formato DISPOSITIVO:EVENTO:ZONA:DATOS"""
+    hardware_id: str
+    event_type: str
+    zone: str
+    data: str
+
+
+# Prefijos de mensajes de sistema que no son eventos
+SYSTEM_PREFIXES = ("SYSTEM:", "SENSORES:", "HEARTBEAT:", "OK:", "ERROR_SERIAL")
+
+# Tipos cuyo mensaje y prioridad no dependen del estado
+_STATIC_EVENTS = {
+    'PIR': EventInfo('motion', 'Sensor PIR', '🚶 Movimiento detectado', 'medium'),
+    'HUMO': EventInfo('smoke', 'Detector de Humo', '💨 Humo detectado', 'high'),
+    'PANICO': EventInfo('panic', 'Botón de Pánico', '🚨 ALARMA activada', 'critical'),
+    'SILENCIO': EventInfo('panic', 'Alarma Silenciosa', '🚨 ALARMA SILENCIOSA activada', 'critical'),
+}
+
+# Tipos cuyo mensaje y prioridad dependen del estado:
+# tipo -> (type, device, plantilla de mensaje, {estado: prioridad}, prioridad por defecto)
+_STATEFUL_EVENTS = {
+    'PUERTA': ('door', 'Sensor de Puerta', '🚪 Puerta/Ventana {}', {'ABIERTA': 'medium'}, 'low'),
+    'LASER': ('laser', 'Detector Láser', '🔴 Perímetro láser {}', {'INTERRUMPIDO': 'high'}, 'low'),
+    'CERRADURA': ('lock', 'Cerradura Inteligente', '🔒 Cerradura {}', {}, 'medium'),
+}
+
+# Estados que envía el firmware para los tipos con estado
+_KNOWN_STATES = {
+    'PUERTA': ('ABIERTA', 'CERRADA'),
+    'LASER': ('INTERRUMPIDO', 'OK'),
+    'CERRADURA': ('ABRIENDO', 'ABIERTA', 'CERRANDO', 'CERRADA', 'YA_ABIERTA', 'YA_CERRADA'),
+}
+
+
+def _build_info(spec, estado):
+    event_type, device, plantilla, prioridades, prioridad_defecto = spec
+    return EventInfo(event_type, device, plantilla.format(estado), prioridades.get(estado, prioridad_defecto))
+
+
+# (tipo, estado) -> EventInfo para los estados conocidos (tabla fija)
+_STATE_INFO = {
+    (tipo, estado): _build_info(_STATEFUL_EVENTS[tipo], estado)
+    for tipo, estados in _KNOWN_STATES.items()
+    for estado in estados
+}
+
+# Cadena canónica de cada tipo/estado conocido (comparten memoria e identidad)
+_CANONICAL = {
+    texto: sys.intern(texto)
+    for texto in (*_STATIC_EVENTS, *_STATEFUL_EVENTS, *(e for _, e in _STATE_INFO))
+}
+
+
+def _event_info(tipo, estado):
+    """Obtiene la descripción de un evento; los estados desconocidos no se guardan"""
+    info = _STATIC_EVENTS.get(tipo) or _STATE_INFO.get((tipo, estado))
+    if info is not None:
+        return info
+    spec = _STATEFUL_EVENTS.get(tipo)
+    return _build_info(spec, estado) if spec is not None else None
+
+
+def is_system_message(raw_message):
+    """True si el mensaje es de sistema (heartbeat, confirmaciones, errores)"""
+    return raw_message.startswith(SYSTEM_PREFIXES)
+
+
+def parse_event_line(raw_message):
+    """
+    Parsea un mensaje "EVENT:TIPO:ESTADO".
+
+    Args:
+        raw_message: str - Mensaje crudo del serial
+
+    Returns:
+        HardwareEvent o None si no es un evento (vacío, de sistema u otro formato).
+        Si el tipo no es conocido, el evento se retorna con info=None.
+    """
+    if not raw_message or not raw_message.startswith("EVENT:"):
+        return None
+
+    parts = raw_message.split(":", 3)
+    tipo = _CANONICAL.get(parts[1], parts[1])
+    estado = _CANONICAL.get(parts[2], parts[2]) if len(parts) > 2 else ""
+    return HardwareEvent(tipo, estado, _event_info(tipo, estado), raw_message)
+
+
+def parse_event_lines(raw_messages):
+    """
+    Parsea un lote de mensajes "EVENT:TIPO:ESTADO" en una sola llamada.
+
+    Returns:
+        list[HardwareEvent] - Solo los eventos válidos, en orden de llegada
+    """
+    canonical = _CANONICAL.get
+    state_info = _STATE_INFO.get
+    eventos = []
+    for raw in raw_messages:
+        if not raw or not raw.startswith("EVENT:"):
+            continue
+        parts = raw.split(":", 3)
+        tipo = canonical(parts[1], parts[1])
+        estado = canonical(parts[2], parts[2]) if len(parts) > 2 else ""
+        info = state_info((tipo, estado)) or _event_info(tipo, estado)
+        eventos.append(HardwareEvent(tipo, estado, info, raw))
+    return eventos
+
+
+def parse_device_line(raw_message):
+    """
+    Parsea un mensaje "DISPOSITIVO:EVENTO:ZONA:DATOS".
+    Ejemplo: PIR:MOTION:SALA_PRINCIPAL:INTENSIDAD=85
+
+    Returns:
+        DeviceMessage o None si el formato es inválido
+    """
+    if not raw_message:
+        return None
+
+    parts = raw_message.split(":", 3)
+    if len(parts) < 3:
+        return None
+
+    return DeviceMessage(
+        sys.intern(parts[0].strip()),
+        sys.intern(parts[1].strip()),
+        parts[2].strip(),
+        parts[3].strip() if len(parts) > 3 else ""
+    )
+
+
+def parse_device_lines(raw_messages):
+    """Parsea un lote de mensajes "DISPOSITIVO:EVENTO:ZONA:DATOS" (omite los inválidos)"""
+    return [msg for msg in map(parse_device_line, raw_messages) if msg is not None]
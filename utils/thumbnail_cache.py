@@ -0,0 +1,192 @@
+"""
+Caché de miniaturas para la galería
+Las miniaturas se guardan en memoria (LRU) y en disco, con clave
+(ruta, mtime, tamaño), de modo que una imagen modificada se regenera sola.
+La decodificación usa Image.draft() para que el decodificador JPEG reduzca
+la imagen al leerla, y un thread precarga las imágenes vecinas.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image
+
+
+class CacheMiniaturas:
+    """
+    Miniaturas PIL listas para mostrar.
+
+    - obtener(ruta): memoria -> disco -> decodificar (y guardar en ambos);
+      si la misma imagen ya se está cargando en otro thread, espera ese resultado
+    - precargar(rutas): genera en segundo plano las que falten; cada llamada
+      reemplaza la lista pendiente (solo importan los vecinos actuales)
+
+    Retorna imágenes PIL: el ImageTk.PhotoImage se debe crear en el thread de Tk.
+    El mtime de cada miniatura en disco marca su último uso, así la retención
+    de capturas puede borrar las que nadie usa (p. ej. de capturas borradas).
+    """
+
+    def __init__(self, tamano=(750, 500), capacidad=64, carpeta_disco=None, calidad_disco=85):
+        self.tamano = tuple(tamano)
+        self.capacidad = capacidad
+        self.carpeta_disco = Path(carpeta_disco) if carpeta_disco else None
+        self.calidad_disco = calidad_disco
+
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._en_curso = {}  # clave -> Event de la carga en otro thread
+
+        self._pendientes = []
+        self._hay_pendientes = threading.Condition()
+        self._activo = True
+        self._thread = None
+
+        # Estadísticas
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.decodificadas = 0
+
+    def _clave(self, ruta):
+        ruta = Path(ruta)
+        return (str(ruta.resolve()), ruta.stat().st_mtime_ns, self.tamano)
+
+    def _ruta_disco(self, clave):
+        if self.carpeta_disco is None:
+            return None
+        nombre = hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()
+        return self.carpeta_disco / f"{nombre}.jpg"
+
+    def _recordar(self, clave, imagen):
+        with self._lock:
+            self._memoria[clave] = imagen
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.capacidad:
+                self._memoria.popitem(last=False)
+
+    def _decodificar(self, ruta):
+        """Abre el JPEG pidiendo al decodificador una escala cercana al tamaño final"""
+        with Image.open(ruta) as img:
+            img.draft("RGB", self.tamano)
+            img = img.convert("RGB")
+        img.thumbnail(self.tamano, Image.Resampling.LANCZOS)
+        return img
+
+    def obtener(self, ruta):
+        """Miniatura de `ruta` (imagen PIL)"""
+        clave = self._clave(ruta)
+
+        while True:
+            with self._lock:
+                imagen = self._memoria.get(clave)
+                if imagen is not None:
+                    self._memoria.move_to_end(clave)
+                    self.aciertos_memoria += 1
+                    return imagen
+                en_curso = self._en_curso.get(clave)
+                if en_curso is None:
+                    en_curso = self._en_curso[clave] = threading.Event()
+                    break
+            # La precarga ya la está generando: esperar en vez de decodificar
+            # otra vez (si falló, la siguiente vuelta la carga aquí)
+            en_curso.wait()
+
+        try:
+            return self._cargar(ruta, clave)
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            en_curso.set()
+
+    def _cargar(self, ruta, clave):
+        """Disco -> decodificar; deja la miniatura en memoria y en disco"""
+        ruta_disco = self._ruta_disco(clave)
+        if ruta_disco is not None and ruta_disco.exists():
+            try:
+                with Image.open(ruta_disco) as img:
+                    imagen = img.convert("RGB")
+                os.utime(ruta_disco)
+                self.aciertos_disco += 1
+                self._recordar(clave, imagen)
+                return imagen
+            except Exception as e:
+                print(f"⚠️ Miniatura en disco inválida, se regenera: {e}")
+
+        imagen = self._decodificar(ruta)
+        self.decodificadas += 1
+        self._recordar(clave, imagen)
+
+        if ruta_disco is not None:
+            self._guardar_en_disco(imagen, ruta_disco)
+        return imagen
+
+    def _guardar_en_disco(self, imagen, ruta_disco):
+        """Escribe en un temporal único y lo renombra (nunca queda a medias)"""
+        temporal = None
+        try:
+            ruta_disco.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=ruta_disco.parent)
+            with os.fdopen(descriptor, "wb") as archivo:
+                imagen.save(archivo, "JPEG", quality=self.calidad_disco)
+            os.replace(temporal, ruta_disco)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la miniatura: {e}")
+            if temporal is not None:
+                Path(temporal).unlink(missing_ok=True)
+
+    def en_memoria(self, ruta):
+        try:
+            clave = self._clave(ruta)
+        except OSError:
+            return False
+        with self._lock:
+            return clave in self._memoria
+
+    def descartar(self, ruta):
+        """Olvida la miniatura de `ruta` (p. ej. antes de borrar la imagen)"""
+        try:
+            clave = self._clave(ruta)
+        except OSError:
+            return
+        with self._lock:
+            self._memoria.pop(clave, None)
+        ruta_disco = self._ruta_disco(clave)
+        if ruta_disco is not None:
+            ruta_disco.unlink(missing_ok=True)
+
+    # Precarga en segundo plano
+
+    def precargar(self, rutas):
+        """Reemplaza la lista de imágenes a precargar"""
+        with self._hay_pendientes:
+            if not self._activo:
+                return
+            self._pendientes = list(rutas)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop_precarga, name="precarga-miniaturas", daemon=True)
+                self._thread.start()
+            self._hay_pendientes.notify()
+
+    def _loop_precarga(self):
+        while True:
+            with self._hay_pendientes:
+                while self._activo and not self._pendientes:
+                    self._hay_pendientes.wait()
+                if not self._activo:
+                    return
+                ruta = self._pendientes.pop(0)
+            try:
+                if not self.en_memoria(ruta):
+                    self.obtener(ruta)
+            except Exception as e:
+                print(f"⚠️ Error precargando {ruta}: {e}")
+
+    def detener(self):
+        """Detiene la precarga (la caché en memoria sigue disponible)"""
+        with self._hay_pendientes:
+            self._activo = False
+            self._pendientes = []
+            self._hay_pendientes.notify_all()
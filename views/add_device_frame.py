@@ -81,6 +81,10 @@ class AddDeviceFrame(tk.Frame):
             messagebox.showwarning("Campos incompletos", "Por favor complete todos los campos.")
             return
 
+        if self.device_manager.get_device(device_id) is not None:
+            messagebox.showwarning("ID repetido", f"Ya existe un dispositivo con ID '{device_id}'.")
+            return
+
         device = {"id": device_id, "tipo": tipo, "zona": zona, "active": False}
         self.device_manager.add_device(device)
         self.add_callback(device)
@@ -4,12 +4,15 @@ Ventana de detalle para ver y editar información de un dispositivo
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, scrolledtext
+import queue
 import time
 from config import COLORS
 import cv2
 from PIL import Image, ImageTk
 from controllers.serial_comm import get_serial_communicator
 from pathlib import Path
+from models.capture_catalog import obtener_catalogo
+from services.capture_retention import obtener_gestor_retencion
 import os
 import sys
 import subprocess
@@ -41,6 +44,11 @@ class DeviceDetailWindow(tk.Toplevel):
         
         # Comunicador serial
         self.serial_comm = get_serial_communicator()
+        
+        # Resultados de envíos a Telegram: llegan desde el thread de la cola
+        # de salida y se muestran desde el thread de Tk
+        self._envios_telegram = queue.Queue()
+        self._id_envios_telegram = self.after(250, self._revisar_envios_telegram)
 
         # --- Scroll principal ---
         main_canvas = tk.Canvas(self, bg=COLORS["background"], highlightthickness=0)
@@ -356,7 +364,7 @@ class DeviceDetailWindow(tk.Toplevel):
         """Actualiza el contador de capturas de placas"""
         carpeta = Path("capturas_placas")
         if carpeta.exists():
-            count = len(list(carpeta.glob("*.jpg")))
+            count = obtener_catalogo(carpeta).contar()
             self.label_capturas_placas_count.config(text=f"{count} capturas")
         else:
             self.label_capturas_placas_count.config(text="0 capturas")
@@ -597,6 +605,7 @@ class DeviceDetailWindow(tk.Toplevel):
 
         # Inicializar detector
         self.detector_camara = DetectorMovimientoCamara()
+        self.detector_camara.dispositivo = self.device["id"]
         self.detector_camara.set_callback_notificacion(self._notificar_captura_camara)
         self.actualizando_video_camara = False
         self.id_actualizacion_camara = None
@@ -774,17 +783,53 @@ class DeviceDetailWindow(tk.Toplevel):
                         f"🕐 Hora: {timestamp}"
                     )
                 
-                telegram_bot.send_message_to_user(
-                    user_manager.current_user,
-                    mensaje,
-                    parse_mode='HTML'
+                if tipo == 'automatica':
+                    # Detecciones seguidas de la cámara se agrupan en un resumen
+                    future = telegram_bot.send_alert_to_user_async(
+                        user_manager.current_user,
+                        "Cámara de seguridad",
+                        "camera_motion",
+                        "Movimiento detectado",
+                        mensaje,
+                        priority=2
+                    )
+                else:
+                    future = telegram_bot.send_message_to_user_async(
+                        user_manager.current_user,
+                        mensaje,
+                        parse_mode='HTML'
+                    )
+                self._registrar_envio_telegram(
+                    future, self._agregar_evento_camara, "✅ Notificación Telegram enviada"
                 )
                 
-                self._agregar_evento_camara("✅ Notificación Telegram enviada")
-                
             except Exception as e:
                 print(f"Error Telegram: {e}")
     
+    def _registrar_envio_telegram(self, future, agregar_evento, texto_ok):
+        """Anota el resultado del envío en el historial cuando Telegram responde"""
+        def al_terminar(f):
+            # Corre en el thread de la cola de salida: no tocar widgets aquí
+            try:
+                success, result = f.result()
+            except Exception as e:
+                success, result = False, e
+            texto = texto_ok if success else f"❌ Telegram no enviado: {result}"
+            self._envios_telegram.put((agregar_evento, texto))
+        future.add_done_callback(al_terminar)
+    
+    def _revisar_envios_telegram(self):
+        """Muestra (en el thread de Tk) los resultados de envíos ya resueltos"""
+        if not self.winfo_exists():
+            return
+        while True:
+            try:
+                agregar_evento, texto = self._envios_telegram.get_nowait()
+            except queue.Empty:
+                break
+            agregar_evento(texto)
+        self._id_envios_telegram = self.after(250, self._revisar_envios_telegram)
+    
     def _agregar_evento_camara(self, mensaje):
         """Agrega evento al historial"""
         from datetime import datetime
@@ -820,7 +865,7 @@ class DeviceDetailWindow(tk.Toplevel):
         """Actualiza el contador de capturas de cámara"""
         carpeta = Path("capturas_fotogramas")
         if carpeta.exists():
-            count = len(list(carpeta.glob("*.jpg")))
+            count = obtener_catalogo(carpeta).contar()
             self.label_capturas_camara_count.config(text=f"{count} capturas")
         else:
             self.label_capturas_camara_count.config(text="0 capturas")
@@ -852,27 +897,15 @@ class DeviceDetailWindow(tk.Toplevel):
             messagebox.showerror("Error", f"No se pudo abrir la carpeta:\n{e}")
     
     def _limpiar_capturas_antiguas(self, carpeta, dias=30):
-        """Elimina capturas con más de X días"""
-        from datetime import datetime, timedelta
-        
-        carpeta_path = Path(carpeta)
-        if not carpeta_path.exists():
+        """Elimina capturas con más de X días (usando el catálogo, sin listar la carpeta)"""
+        if not Path(carpeta).exists():
             return 0
         
-        limite = datetime.now() - timedelta(days=dias)
-        eliminadas = 0
-        
         try:
-            for archivo in carpeta_path.glob("*.jpg"):
-                fecha_mod = datetime.fromtimestamp(archivo.stat().st_mtime)
-                if fecha_mod < limite:
-                    archivo.unlink()
-                    eliminadas += 1
-                    print(f"🗑️ Eliminado: {archivo.name}")
+            return obtener_gestor_retencion().eliminar_antiguas(carpeta, dias)
         except Exception as e:
             print(f"❌ Error limpiando: {e}")
-        
-        return eliminadas
+            return 0
     # -----------------------
     # Utilidades (apariencia)
     # -----------------------
@@ -893,15 +926,17 @@ class DeviceDetailWindow(tk.Toplevel):
             parent=self
         )
         if new_id and new_id.strip():
-            self.device["id"] = new_id.strip()
+            try:
+                # El widget de la vista principal se actualiza por la notificación
+                self.device_manager.rename_device(self.device, new_id.strip())
+            except ValueError as e:
+                messagebox.showwarning("ID repetido", str(e), parent=self)
+                return
             self.id_var.set(self.device["id"])
-            # Refrescar vista principal en tiempo real
-            self.refresh_callback()
 
     def _on_tipo_changed(self, new_tipo):
         """Callback cuando se cambia el tipo de dispositivo"""
-        self.device["tipo"] = new_tipo
-        self.refresh_callback()
+        self.device_manager.set_device_type(self.device, new_tipo)
 
     def _on_zone_changed(self, new_zone):
         """Callback cuando se cambia la zona del dispositivo"""
@@ -972,7 +1007,7 @@ class DeviceDetailWindow(tk.Toplevel):
         self._append_history(mensaje)
         
         # Guardar cambios
-        self.device_manager.save_devices()
+        self.device_manager.update_device(self.device)
 
     def _update_state_button(self):
         """Actualiza la apariencia del botón de estado"""
@@ -1034,6 +1069,11 @@ class DeviceDetailWindow(tk.Toplevel):
         # Aseguramos actualizar la vista padre antes de cerrar
         self.refresh_callback()
         self.destroy()
+    
+    def destroy(self):
+        """Cancela la revisión de envíos a Telegram antes de cerrar"""
+        self.after_cancel(self._id_envios_telegram)
+        super().destroy()
 
     # === MÉTODOS DEL DETECTOR DE PLACAS ===
     
@@ -1150,6 +1190,7 @@ class DeviceDetailWindow(tk.Toplevel):
         self._actualizar_contador_capturas_placas()
 
         self.detector_placas = DetectorPlacas()
+        self.detector_placas.dispositivo = self.device["id"]
         self.detector_placas.set_callback_notificacion(self._notificar_placa_no_autorizada)
         self.actualizando_video_placas = False
         self.id_actualizacion_placas = None
@@ -1249,8 +1290,10 @@ class DeviceDetailWindow(tk.Toplevel):
         if telegram_bot and user_manager and hasattr(user_manager, 'current_user'):
             try:
                 mensaje = f"🚨 <b>ALERTA</b>\n🚗 Placa no autorizada\n📋 <code>{placa}</code>\n🕐 {timestamp}"
-                telegram_bot.send_message_to_user(user_manager.current_user, mensaje, parse_mode='HTML')
-                self._agregar_evento_placas("✅ Telegram enviado")
+                future = telegram_bot.send_alert_to_user_async(
+                    user_manager.current_user, f"Placa {placa}", "plate", "Placa no autorizada", mensaje, priority=2
+                )
+                self._registrar_envio_telegram(future, self._agregar_evento_placas, "✅ Telegram enviado")
             except Exception as e:
                 print(f"Error Telegram: {e}")
     
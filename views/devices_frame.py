@@ -16,6 +16,10 @@ class DevicesFrame(tk.Frame):
         self.device_manager = device_manager
         self.open_detail_callback = open_detail_callback
         self.zone_frames = {}  # zona -> frame contenedor y widgets
+        self.widgets = {}  # id -> DeviceWidget
+
+        # Cambios de ID/tipo se reflejan en el widget sin reconstruir la vista
+        self.device_manager.subscribe(self._on_device_changed)
 
         # Canvas + scrollbar vertical
         self.canvas = tk.Canvas(self, bg=COLORS["background"], highlightthickness=0)
@@ -43,10 +47,11 @@ class DevicesFrame(tk.Frame):
         for widget in self.inner.winfo_children():
             widget.destroy()
         self.zone_frames = {}
+        self.widgets = {}
 
         zones = self.device_manager.get_zones()
         for zone in zones:
-            devices = self.device_manager.devices_by_zone.get(zone, [])
+            devices = self.device_manager.devices_in_zone(zone)
             # Crear labelframe por zona
             lf = tk.LabelFrame(
                 self.inner, 
@@ -75,6 +80,7 @@ class DevicesFrame(tk.Frame):
                 if zone not in self.zone_frames:
                     self.zone_frames[zone] = []
                 self.zone_frames[zone].append((dev, w))
+                self.widgets[dev["id"]] = w
                 
                 c += 1
                 if c >= col_count:
@@ -83,13 +89,22 @@ class DevicesFrame(tk.Frame):
 
     def find_widget_for_device(self, device):
         """Busca el widget asociado a un dispositivo"""
-        zone = device["zona"]
-        if zone in self.zone_frames:
-            for dev, widget in self.zone_frames[zone]:
-                if dev is device or dev.get("id") == device.get("id"):
-                    return widget
-        return None
+        return self.widgets.get(device["id"])
+
+    def _on_device_changed(self, evento, device, anterior):
+        """Actualiza en su lugar el widget de un dispositivo renombrado o con otro tipo"""
+        if evento == "renombrado" and anterior in self.widgets:
+            self.widgets[device["id"]] = self.widgets.pop(anterior)
+        if evento in ("renombrado", "tipo", "actualizado"):
+            widget = self.widgets.get(device["id"])
+            if widget is not None and widget.winfo_exists():
+                widget.update_display()
 
     def remove_device_widget(self, device):
         """Remueve el widget de un dispositivo (simplificado: refresca todo)"""
         self.refresh()
+
+    def destroy(self):
+        self.device_manager.unsubscribe(self._on_device_changed)
+        super().destroy()
+
@@ -5,27 +5,45 @@ Ventana de galería para ver capturas guardadas
 import tkinter as tk
 from tkinter import messagebox
 from pathlib import Path
-from PIL import Image, ImageTk
+from datetime import datetime
+from PIL import ImageTk
 from config import COLORS
+from models.capture_catalog import CatalogoCapturas, obtener_catalogo
+from utils.thumbnail_cache import CacheMiniaturas
 
 
 class GaleriaWindow(tk.Toplevel):
     """Ventana para mostrar galería de imágenes capturadas"""
     
-    def __init__(self, master, carpeta, titulo="Galería"):
+    TAMANO_PAGINA = 50
+    VECINOS_PRECARGA = 2  # Imágenes a cada lado que se precargan
+    
+    def __init__(self, master, carpeta, titulo="Galería", tipo=None, dispositivo=None):
         super().__init__(master)
         self.title(titulo)
         self.geometry("850x650")
         self.config(bg=COLORS["background"])
         
         self.carpeta = Path(carpeta)
-        self.imagenes = []
+        self.catalogo = None
+        # Filtros opcionales del catálogo
+        self.filtros = {'tipo': tipo, 'dispositivo': dispositivo}
+        # Solo se mantiene en memoria la página que contiene la imagen actual
+        self.total = 0
+        self._pagina = []
+        self._inicio_pagina = 0
         self.indice_actual = 0
         
+        # Miniaturas en memoria (LRU) y en disco, con precarga de las vecinas
+        self.miniaturas = CacheMiniaturas(
+            tamano=(750, 500),
+            carpeta_disco=self.carpeta / CatalogoCapturas.CARPETA_MINIATURAS
+        )
+        
         self._crear_widgets()
         self._cargar_imagenes()
         
-        if self.imagenes:
+        if self.total:
             self._mostrar_imagen_actual()
         else:
             self.label_info.config(text="📭 No hay capturas guardadas en esta carpeta")
@@ -121,77 +139,125 @@ class GaleriaWindow(tk.Toplevel):
         ).pack(pady=(0, 10))
     
     def _cargar_imagenes(self):
-        """Carga la lista de imágenes de la carpeta"""
+        """Cuenta las imágenes de la carpeta en el catálogo (más recientes primero)"""
         if self.carpeta.exists():
-            # Cargar en orden inverso (más recientes primero)
-            self.imagenes = sorted(
-                self.carpeta.glob("*.jpg"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            print(f"📸 {len(self.imagenes)} imágenes encontradas en {self.carpeta}")
+            self.catalogo = obtener_catalogo(self.carpeta)
+            # El catálogo es compartido: reindexar si la carpeta cambió desde que se abrió
+            self.catalogo.sincronizar_si_cambio()
+            self.total = self.catalogo.contar(**self.filtros)
+            self._pagina = []
+            print(f"📸 {self.total} imágenes encontradas en {self.carpeta}")
         else:
             print(f"⚠️ Carpeta no existe: {self.carpeta}")
     
+    def _captura_en(self, indice):
+        """
+        Captura en la posición `indice`, cargando su página si hace falta.
+        Retorna None si la posición ya no existe (capturas borradas por fuera).
+        """
+        if not (self._inicio_pagina <= indice < self._inicio_pagina + len(self._pagina)):
+            self._inicio_pagina = indice - indice % self.TAMANO_PAGINA
+            # Las filas cuyo archivo desapareció se quitan del índice al cargar
+            self._pagina = self.catalogo.pagina(
+                self._inicio_pagina, self.TAMANO_PAGINA, verificar=True, **self.filtros
+            )
+            self.total = self.catalogo.contar(**self.filtros)
+        posicion = indice - self._inicio_pagina
+        if posicion >= len(self._pagina):
+            return None
+        return self._pagina[posicion]
+    
+    def _mostrar_sin_imagenes(self):
+        self.label_imagen.config(image="", text="No hay imágenes")
+        self.label_info.config(text="📭 No hay capturas guardadas")
+        self.btn_anterior.config(state=tk.DISABLED)
+        self.btn_siguiente.config(state=tk.DISABLED)
+        self.btn_eliminar.config(state=tk.DISABLED)
+    
     def _mostrar_imagen_actual(self):
         """Muestra la imagen en el índice actual"""
-        if not self.imagenes:
-            self.label_imagen.config(image="", text="No hay imágenes")
-            self.label_info.config(text="📭 No hay capturas guardadas")
-            self.btn_anterior.config(state=tk.DISABLED)
-            self.btn_siguiente.config(state=tk.DISABLED)
-            self.btn_eliminar.config(state=tk.DISABLED)
+        if not self.total:
+            self._mostrar_sin_imagenes()
             return
         
         try:
-            ruta = self.imagenes[self.indice_actual]
+            captura = self._captura_en(self.indice_actual)
+            if captura is None and self.total:
+                # La página se achicó: mostrar la última que queda
+                self.indice_actual = self.total - 1
+                captura = self._captura_en(self.indice_actual)
+            if captura is None:
+                self._mostrar_sin_imagenes()
+                return
+            ruta = captura.ruta
             
-            # Cargar y redimensionar imagen
-            img = Image.open(ruta)
-            
-            # Redimensionar manteniendo aspecto (max 750x500)
-            img.thumbnail((750, 500), Image.Resampling.LANCZOS)
+            # Miniatura (max 750x500) desde la caché
+            img = self.miniaturas.obtener(ruta)
             
             photo = ImageTk.PhotoImage(img)
             self.label_imagen.config(image=photo, text="")
             self.label_imagen.image = photo  # Mantener referencia
             
             # Actualizar info
-            fecha = ruta.stat().st_mtime
-            from datetime import datetime
-            fecha_str = datetime.fromtimestamp(fecha).strftime("%Y-%m-%d %H:%M:%S")
+            fecha_str = datetime.fromtimestamp(captura.timestamp).strftime("%Y-%m-%d %H:%M:%S")
             
-            info_text = f"📷 Imagen {self.indice_actual + 1} de {len(self.imagenes)} | {ruta.name} | 📅 {fecha_str}"
+            info_text = f"📷 Imagen {self.indice_actual + 1} de {self.total} | {ruta.name} | 📅 {fecha_str}"
+            if captura.placa:
+                info_text += f" | 🚗 {captura.placa}"
             self.label_info.config(text=info_text)
             
             # Habilitar/deshabilitar botones
-            self.btn_anterior.config(state=tk.NORMAL if len(self.imagenes) > 1 else tk.DISABLED)
-            self.btn_siguiente.config(state=tk.NORMAL if len(self.imagenes) > 1 else tk.DISABLED)
+            self.btn_anterior.config(state=tk.NORMAL if self.total > 1 else tk.DISABLED)
+            self.btn_siguiente.config(state=tk.NORMAL if self.total > 1 else tk.DISABLED)
             self.btn_eliminar.config(state=tk.NORMAL)
             
+            self._precargar_vecinas()
+            
         except Exception as e:
             print(f"❌ Error mostrando imagen: {e}")
             self.label_info.config(text=f"❌ Error: {e}")
             self.label_imagen.config(image="", text="Error cargando imagen")
     
+    def _precargar_vecinas(self):
+        """Pide al thread de precarga las imágenes siguientes y anteriores"""
+        if self.total <= 1:
+            return
+        indices = []
+        for distancia in range(1, self.VECINOS_PRECARGA + 1):
+            for indice in (self.indice_actual + distancia, self.indice_actual - distancia):
+                indice %= self.total
+                if indice != self.indice_actual and indice not in indices:
+                    indices.append(indice)
+        capturas = [self._captura_en(i) for i in indices]
+        self.miniaturas.precargar([captura.ruta for captura in capturas if captura is not None])
+    
+    def destroy(self):
+        """Detiene la precarga al cerrar la ventana"""
+        self.miniaturas.detener()
+        super().destroy()
+    
     def _imagen_anterior(self):
         """Muestra la imagen anterior"""
-        if self.imagenes and len(self.imagenes) > 0:
-            self.indice_actual = (self.indice_actual - 1) % len(self.imagenes)
+        if self.total > 0:
+            self.indice_actual = (self.indice_actual - 1) % self.total
             self._mostrar_imagen_actual()
     
     def _imagen_siguiente(self):
         """Muestra la imagen siguiente"""
-        if self.imagenes and len(self.imagenes) > 0:
-            self.indice_actual = (self.indice_actual + 1) % len(self.imagenes)
+        if self.total > 0:
+            self.indice_actual = (self.indice_actual + 1) % self.total
             self._mostrar_imagen_actual()
     
     def _eliminar_actual(self):
         """Elimina la imagen actual"""
-        if not self.imagenes:
+        if not self.total:
             return
         
-        ruta = self.imagenes[self.indice_actual]
+        captura = self._captura_en(self.indice_actual)
+        if captura is None:
+            self._mostrar_imagen_actual()
+            return
+        ruta = captura.ruta
         respuesta = messagebox.askyesno(
             "Confirmar eliminación",
             f"¿Deseas eliminar esta captura?\n\n{ruta.name}\n\nEsta acción no se puede deshacer."
@@ -199,16 +265,19 @@ class GaleriaWindow(tk.Toplevel):
         
         if respuesta:
             try:
-                ruta.unlink()  # Eliminar archivo
+                self.miniaturas.descartar(ruta)
+                ruta.unlink(missing_ok=True)  # Eliminar archivo
+                self.catalogo.eliminar(ruta)
                 print(f"🗑️ Eliminado: {ruta.name}")
                 
-                # Remover de la lista
-                self.imagenes.pop(self.indice_actual)
+                # Quitar del total y recargar la página en la próxima consulta
+                self.total -= 1
+                self._pagina = []
                 
-                if self.imagenes:
+                if self.total:
                     # Ajustar índice si es necesario
-                    if self.indice_actual >= len(self.imagenes):
-                        self.indice_actual = len(self.imagenes) - 1
+                    if self.indice_actual >= self.total:
+                        self.indice_actual = self.total - 1
                     self._mostrar_imagen_actual()
                 else:
                     # No quedan imágenes
@@ -327,10 +327,13 @@ class InterfazDetectorPlacas:
                     f"⚠️ Esta placa no está en la lista de autorizados"
                 )
                 
-                self.telegram_bot.send_message_to_user(
+                self.telegram_bot.send_alert_to_user_async(
                     self.user_manager.current_user,
+                    f"Placa {placa}",
+                    "plate",
+                    "Placa no autorizada",
                     mensaje,
-                    parse_mode='HTML'
+                    priority=2
                 )
                 
                 self.agregar_evento_sistema(f"✅ Notificación enviada por Telegram")
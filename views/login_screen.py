@@ -37,14 +37,17 @@ class LoginScreen(tk.Frame):
         self.password_entry.pack(pady=5)
 
         # Botón de inicio de sesión
-        tk.Button(
+        self.login_button = tk.Button(
             self, 
             text="Iniciar Sesión", 
             width=20, 
             bg=COLORS["primary"], 
             fg=COLORS["text_light"],
             command=self._iniciar_sesion
-        ).pack(pady=15)
+        )
+        self.login_button.pack(pady=15)
+        self.password_entry.bind("<Return>", lambda e: self._iniciar_sesion())
+        self._verificacion = None  # Future del login en curso
 
         # Link a registro
         tk.Label(
@@ -63,7 +66,10 @@ class LoginScreen(tk.Frame):
         ).pack(pady=5)
 
     def _iniciar_sesion(self):
-        """Procesa el inicio de sesión validando contra JSON"""
+        """Procesa el inicio de sesión; el hash se verifica fuera del thread de Tk"""
+        if self._verificacion is not None:
+            return  # Ya hay una verificación en curso
+        
         email = self.email_entry.get().strip()
         password = self.password_entry.get()
         
@@ -71,9 +77,28 @@ class LoginScreen(tk.Frame):
             messagebox.showwarning("Campos vacíos", "Por favor complete todos los campos")
             return
         
-        success, message = self.user_manager.login(email, password)
+        self.login_button.config(text="Verificando...", state="disabled")
+        self._verificacion = self.user_manager.login_async(email, password)
+        self._esperar_verificacion(email)
+
+    def _esperar_verificacion(self, email):
+        """Revisa el resultado del login sin bloquear la interfaz"""
+        if not self.winfo_exists():
+            return  # La pantalla se destruyó mientras se verificaba
+        if not self._verificacion.done():
+            self.after(20, self._esperar_verificacion, email)
+            return
+        
+        try:
+            success, message = self._verificacion.result()
+        except Exception as e:
+            success, message = False, f"Error verificando la contraseña: {e}"
+        self._verificacion = None
         
         if success:
+            # La sesión se abre aquí, en el thread de Tk
+            self.user_manager.current_user = email
             self.go_to_menu()
         else:
-            messagebox.showerror("Error", message)
\ No newline at end of file
+            self.login_button.config(text="Iniciar Sesión", state="normal")
+            messagebox.showerror("Error", message)
@@ -3,9 +3,12 @@ Menú principal de la aplicación con sistema de pestañas
 Incluye integración con Raspberry Pi y notificaciones Telegram
 """
 
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 from config import COLORS, DEVICE_TYPES
+from utils.protocol import is_system_message, parse_event_lines
 
 # Importar vistas
 from views.devices_frame import DevicesFrame
@@ -44,6 +47,25 @@ class MainMenu(tk.Frame):
         self.telegram_bot = None
         self._init_communications()
 
+        # Despacho de mensajes del hardware por lotes con intervalo adaptativo
+        self.intervalo_min_ms = 20
+        self.intervalo_max_ms = 250
+        self.presupuesto_lote_ms = 15
+        self.intervalo_actual_ms = 100
+        self._lote_historial = None
+        self._lote_alertas = None
+        
+        # Tabla de despacho: tipo de evento -> manejador
+        self._event_dispatch = {
+            "PIR": lambda e: self._handle_motion_event(e.info.device, e.estado),
+            "HUMO": lambda e: self._handle_smoke_event(e.info.device, e.estado),
+            "PANICO": lambda e: self._handle_alarm_event(e.info.device, e.estado),
+            "SILENCIO": lambda e: self._handle_alarm_event(e.info.device, e.estado),
+            "PUERTA": lambda e: self._handle_door_event(e.estado),
+            "LASER": lambda e: self._handle_laser_event(e.estado),
+            "CERRADURA": lambda e: self._handle_lock_event(e.estado),
+        }
+
         # Pestañas superiores
         self.tab_frame = tk.Frame(self, bg=COLORS["primary"])
         self.tab_frame.pack(fill="x")
@@ -156,6 +178,9 @@ class MainMenu(tk.Frame):
                 if bot_info.get('ok'):
                     bot_name = bot_info['result']['first_name']
                     print(f"✅ Bot de Telegram conectado: {bot_name}")
+                    
+                    # Los mensajes al bot se procesan al llegar (vinculación automática)
+                    self.telegram_bot.start_polling()
                 else:
                     print("⚠️ Error verificando bot de Telegram")
                     self.telegram_bot = None
@@ -164,22 +189,88 @@ class MainMenu(tk.Frame):
                 self.telegram_bot = None
     
     def _process_device_messages(self):
-        """Procesa mensajes del Raspberry Pi periódicamente"""
+        """
+        Drena los mensajes del Raspberry Pi en lotes.
+        Vacía la cola hasta agotar el presupuesto de tiempo, agrupa los mensajes
+        repetidos consecutivos y publica el historial en una sola actualización
+        de la UI.
+        El intervalo del siguiente ciclo se adapta al tráfico.
+        """
         if not self.serial_comm:
             return
         
+        agotado = False
+        recibidos = 0
         try:
-            # Obtener evento del SerialCommunicator
-            mensaje = self.serial_comm.get_event()
+            # Drenar la cola respetando el presupuesto de tiempo
+            limite = time.perf_counter() + self.presupuesto_lote_ms / 1000
+            rachas = []
+            while True:
+                mensaje = self.serial_comm.get_event()
+                if not mensaje:
+                    break
+                recibidos += 1
+                # Solo se agrupan repeticiones seguidas: así no cambia el orden de los estados
+                if rachas and rachas[-1][0] == mensaje:
+                    rachas[-1][1] += 1
+                else:
+                    rachas.append([mensaje, 1])
+                if time.perf_counter() >= limite:
+                    agotado = True
+                    break
             
-            if mensaje:
-                self._handle_device_event(mensaje)
+            if rachas:
+                self._dispatch_device_batch(rachas)
                 
         except Exception as e:
             print(f"Error procesando mensajes: {e}")
         
-        # Llamar de nuevo en 100ms
-        self.after(100, self._process_device_messages)
+        # Ajustar intervalo: rápido con tráfico, lento en reposo
+        if agotado:
+            self.intervalo_actual_ms = self.intervalo_min_ms
+        elif recibidos:
+            self.intervalo_actual_ms = max(self.intervalo_min_ms, self.intervalo_actual_ms // 2)
+        else:
+            self.intervalo_actual_ms = min(self.intervalo_max_ms, int(self.intervalo_actual_ms * 1.5))
+        
+        self.after(self.intervalo_actual_ms, self._process_device_messages)
+    
+    def _dispatch_device_batch(self, rachas):
+        """
+        Procesa un lote de mensajes ya agrupados.
+        
+        Args:
+            rachas: list - [mensaje, repeticiones] en orden de llegada; cada
+                    elemento agrupa repeticiones consecutivas de un mensaje
+        """
+        self._lote_historial = []
+        self._lote_alertas = []
+        try:
+            # Parsear todo el lote en una sola llamada
+            eventos = {e.raw: e for e in parse_event_lines([mensaje for mensaje, _ in rachas])}
+            for mensaje, repeticiones in rachas:
+                inicio = len(self._lote_historial)
+                self._handle_device_event(mensaje, eventos.get(mensaje))
+                
+                # Anotar repeticiones en las entradas generadas por este mensaje
+                if repeticiones > 1:
+                    for i in range(inicio, len(self._lote_historial)):
+                        timestamp, texto, tipo = self._lote_historial[i]
+                        self._lote_historial[i] = (timestamp, f"{texto} (x{repeticiones})", tipo)
+        finally:
+            lote, self._lote_historial = self._lote_historial, None
+            alertas, self._lote_alertas = self._lote_alertas, None
+            # Primero el historial: los diálogos modales bloquean hasta cerrarse
+            self._insert_history_entries(lote)
+            for mostrar, titulo, mensaje in alertas:
+                mostrar(titulo, mensaje)
+    
+    def _mostrar_alerta(self, mostrar, titulo, mensaje):
+        """Muestra un diálogo; durante un lote se difiere hasta publicar el historial"""
+        if self._lote_alertas is not None:
+            self._lote_alertas.append((mostrar, titulo, mensaje))
+            return
+        mostrar(titulo, mensaje)
         
     def _show_frame(self, frame_name):
         """Muestra un frame específico"""
@@ -195,8 +286,11 @@ class MainMenu(tk.Frame):
             if frame_name == "Telegram" and hasattr(self.frames[frame_name], '_update_status'):
                 self.frames[frame_name]._update_status()
 
-    def _handle_device_event(self, mensaje):
-        """Maneja evento recibido del dispositivo Raspberry Pi"""
+    def _handle_device_event(self, mensaje, evento=None):
+        """
+        Maneja evento recibido del dispositivo Raspberry Pi.
+        `evento` es el HardwareEvent ya parseado (None si el mensaje no es un evento)
+        """
         print(f"📨 Mensaje recibido: {mensaje}")
 
         # Detectar errores del serial
@@ -204,48 +298,22 @@ class MainMenu(tk.Frame):
             print(f"⚠️ Error de comunicación: {mensaje}")
             return
         
-        # Ignorar mensajes de sistema
-        if mensaje.startswith("SYSTEM:") or mensaje.startswith("SENSORES:") or mensaje.startswith("HEARTBEAT:"):
-            return
-        
-        # Ignorar respuestas OK (ya se procesan en otro lugar)
-        if mensaje.startswith("OK:"):
+        # Ignorar mensajes de sistema y respuestas OK (ya se procesan en otro lugar)
+        if is_system_message(mensaje):
             return
 
-        # Parsear eventos (formato: "EVENT:TIPO:ESTADO" o "EVENT:TIPO")
+        # Eventos (formato: "EVENT:TIPO:ESTADO" o "EVENT:TIPO")
         try:
-            parts = mensaje.split(":")
-            
-            if len(parts) >= 2 and parts[0] == "EVENT":
-                event_type = parts[1]  # PIR, HUMO, PUERTA, LASER, PANICO, SILENCIO, CERRADURA
-                event_state = parts[2] if len(parts) > 2 else ""
-
-                # Procesar según tipo de evento
-                if event_type == "PIR":
-                    self._handle_motion_event("Sensor PIR", event_state)
-                    
-                elif event_type == "HUMO":
-                    self._handle_smoke_event("Detector de Humo", event_state)
-                    
-                elif event_type == "PANICO":
-                    self._handle_alarm_event("Botón de Pánico", event_state)
-                    
-                elif event_type == "SILENCIO":
-                    self._handle_alarm_event("Alarma Silenciosa", event_state)
-                    
-                elif event_type == "PUERTA":
-                    self._handle_door_event(event_state)
-                    
-                elif event_type == "LASER":
-                    self._handle_laser_event(event_state)
-                    
-                elif event_type == "CERRADURA":
-                    self._handle_lock_event(event_state)
-                    
-                else:
-                    print(f"Tipo de evento desconocido: {event_type}")
-            else:
+            if evento is None:
                 print(f"Formato de mensaje no reconocido: {mensaje}")
+                return
+            
+            handler = self._event_dispatch.get(evento.tipo)
+            if handler is None:
+                print(f"Tipo de evento desconocido: {evento.tipo}")
+                return
+            
+            handler(evento)
 
         except Exception as e:
             print(f"Error parseando mensaje: {e}")
@@ -260,14 +328,17 @@ class MainMenu(tk.Frame):
         
         # Notificación por Telegram
         if self.telegram_bot and self.user_manager.current_user:
-            self.telegram_bot.send_message_to_user(
+            self.telegram_bot.send_alert_to_user_async(
                 self.user_manager.current_user,
+                device_id,
+                "motion",
+                "Sensor de Movimiento",
                 f"🔔 <b>Sensor de Movimiento</b>\n\n{mensaje}",
-                parse_mode='HTML'
+                priority=2
             )
         
         # Mostrar alerta visual
-        messagebox.showinfo("Sensor de Movimiento", mensaje)
+        self._mostrar_alerta(messagebox.showinfo, "Sensor de Movimiento", mensaje)
     
     def _handle_alarm_event(self, device_id, data):
         """Maneja evento de alarma"""
@@ -279,14 +350,17 @@ class MainMenu(tk.Frame):
         
         # Notificación urgente por Telegram
         if self.telegram_bot and self.user_manager.current_user:
-            self.telegram_bot.send_message_to_user(
+            self.telegram_bot.send_alert_to_user_async(
                 self.user_manager.current_user,
+                device_id,
+                "panic",
+                "¡ALERTA DE SEGURIDAD!",
                 f"🚨 <b>¡ALERTA DE SEGURIDAD!</b>\n\n{mensaje}\n\nDispositivo: {device_id}\nDatos: {data}",
-                parse_mode='HTML'
+                priority=1
             )
         
         # Mostrar mensaje en la aplicación
-        messagebox.showwarning("Alerta de Seguridad", mensaje)
+        self._mostrar_alerta(messagebox.showwarning, "Alerta de Seguridad", mensaje)
     
     def _handle_smoke_event(self, device_id, data):
         """Maneja evento de detector de humo"""
@@ -298,14 +372,17 @@ class MainMenu(tk.Frame):
         
         # Notificación por Telegram
         if self.telegram_bot and self.user_manager.current_user:
-            self.telegram_bot.send_message_to_user(
+            self.telegram_bot.send_alert_to_user_async(
                 self.user_manager.current_user,
+                device_id,
+                "smoke",
+                "Detector de Humo",
                 f"⚠️ <b>Detector de Humo</b>\n\n{mensaje}",
-                parse_mode='HTML'
+                priority=1
             )
         
         # Mostrar alerta visual
-        messagebox.showwarning("Detector de Humo", mensaje)
+        self._mostrar_alerta(messagebox.showwarning, "Detector de Humo", mensaje)
     
     def _handle_status_update(self, device_id, data):
         """Maneja actualización de estado de dispositivo"""
@@ -322,12 +399,15 @@ class MainMenu(tk.Frame):
             self._add_to_history(mensaje, "puerta")
             
             if self.telegram_bot and self.user_manager.current_user:
-                self.telegram_bot.send_message_to_user(
+                self.telegram_bot.send_alert_to_user_async(
                     self.user_manager.current_user,
+                    "Puerta/Ventana",
+                    "door",
+                    "Alerta de Acceso",
                     f"🚪 <b>Alerta de Acceso</b>\n\n{mensaje}",
-                    parse_mode='HTML'
+                    priority=3
                 )
-            messagebox.showwarning("Alerta de Acceso", mensaje)
+            self._mostrar_alerta(messagebox.showwarning, "Alerta de Acceso", mensaje)
         elif state == "CERRADA":
             mensaje = "🚪 Puerta/Ventana cerrada"
             print(mensaje)
@@ -343,12 +423,15 @@ class MainMenu(tk.Frame):
             self._add_to_history(mensaje, "laser")
             
             if self.telegram_bot and self.user_manager.current_user:
-                self.telegram_bot.send_message_to_user(
+                self.telegram_bot.send_alert_to_user_async(
                     self.user_manager.current_user,
+                    "Perímetro láser",
+                    "laser",
+                    "Alerta de Seguridad",
                     f"🔴 <b>Alerta de Seguridad</b>\n\n{mensaje}",
-                    parse_mode='HTML'
+                    priority=2
                 )
-            messagebox.showwarning("Alerta de Seguridad", mensaje)
+            self._mostrar_alerta(messagebox.showwarning, "Alerta de Seguridad", mensaje)
         elif state == "OK":
             mensaje = "🟢 Perímetro láser OK"
             print(mensaje)
@@ -456,14 +539,27 @@ class MainMenu(tk.Frame):
         # Obtener timestamp
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
+        # Durante un lote, acumular y publicar todo junto al final
+        if self._lote_historial is not None:
+            self._lote_historial.append((timestamp, mensaje, tipo))
+            return
+        
+        self._insert_history_entries([(timestamp, mensaje, tipo)])
+    
+    def _insert_history_entries(self, entradas):
+        """Inserta varias entradas (timestamp, mensaje, tipo) en una sola actualización"""
+        if not entradas or not hasattr(self, 'history_text'):
+            return
+        
         # Habilitar edición temporalmente
         self.history_text.config(state="normal")
         
-        # Agregar timestamp
-        self.history_text.insert("end", f"[{timestamp}] ", "timestamp")
-        
-        # Agregar mensaje con color según tipo
-        self.history_text.insert("end", f"{mensaje}\n", tipo)
+        for timestamp, mensaje, tipo in entradas:
+            # Agregar timestamp
+            self.history_text.insert("end", f"[{timestamp}] ", "timestamp")
+            
+            # Agregar mensaje con color según tipo
+            self.history_text.insert("end", f"{mensaje}\n", tipo)
         
         # Auto-scroll al final
         self.history_text.see("end")
@@ -585,7 +681,7 @@ class MainMenu(tk.Frame):
             messagebox.showerror("Error", "Bot de Telegram no disponible")
             return
         
-        # Obtener actualizaciones del bot
+        # Obtener actualizaciones del bot (inmediato si el long-polling está activo)
         self.telegram_bot.get_updates()
         
         # Verificar si el usuario ya está vinculado
@@ -634,7 +730,8 @@ class MainMenu(tk.Frame):
             # porque es un singleton global que se mantiene activo
             # y se cierra solo cuando se cierra la aplicación completa
             
-            # Hacer logout y volver a login
+            # Escribir cambios pendientes de dispositivos, hacer logout y volver a login
+            self.device_manager.flush()
             self.user_manager.logout()
             self.master.show_login()
             return
@@ -674,4 +771,11 @@ class MainMenu(tk.Frame):
         # No lo cerramos aquí porque puede estar siendo usado por otras partes
         # Se cierra automáticamente en app_controller cuando se cierra la app
         
+        # El bot sí es propio de este menú: detener long-polling y envíos.
+        # close() espera la cola de salida (cada envío con timeout propio),
+        # así que corre en otro thread para no congelar Tk con la red lenta;
+        # no es daemon para que las alertas pendientes salgan al cerrar la app
+        if self.telegram_bot:
+            threading.Thread(target=self.telegram_bot.close, name="cierre-telegram").start()
+        
         super().destroy()
@@ -69,16 +69,21 @@ class RegisterScreen(tk.Frame):
             ).pack(anchor="w", padx=80)
 
         # Botón de crear cuenta
-        tk.Button(
+        self.crear_button = tk.Button(
             self, 
             text="Crear cuenta", 
             bg=COLORS["danger"], 
             fg=COLORS["text_light"],
             command=self._crear_cuenta
-        ).pack(pady=12)
+        )
+        self.crear_button.pack(pady=12)
+        self._registro = None  # Future del registro en curso
 
     def _crear_cuenta(self):
-        """Procesa la creación de cuenta guardando en JSON"""
+        """Procesa la creación de cuenta; el hash se calcula fuera del thread de Tk"""
+        if self._registro is not None:
+            return  # Ya hay un registro en curso
+        
         email = self.email_entry.get().strip()
         telegram = self.telegram_entry.get().strip()
         password = self.password_entry.get()
@@ -92,7 +97,24 @@ class RegisterScreen(tk.Frame):
             messagebox.showerror("Error", "Las contraseñas no coinciden")
             return
         
-        success, message = self.user_manager.register(email, password, telegram)
+        self.crear_button.config(text="Creando...", state="disabled")
+        self._registro = self.user_manager.register_async(email, password, telegram)
+        self._esperar_registro()
+
+    def _esperar_registro(self):
+        """Revisa el resultado del registro sin bloquear la interfaz"""
+        if not self.winfo_exists():
+            return  # La pantalla se destruyó mientras se registraba
+        if not self._registro.done():
+            self.after(20, self._esperar_registro)
+            return
+        
+        try:
+            success, message = self._registro.result()
+        except Exception as e:
+            success, message = False, f"Error creando la cuenta: {e}"
+        self._registro = None
+        self.crear_button.config(text="Crear cuenta", state="normal")
         
         if success:
             messagebox.showinfo("Éxito", message)
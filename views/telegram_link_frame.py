@@ -33,6 +33,32 @@ class TelegramLinkFrame(tk.Frame):
         self._create_widgets()
         self._update_status()
 
+        # Refrescar el estado cuando el bot vincula la cuenta. El aviso llega
+        # desde el thread del bot: solo marca, y el thread de Tk lo revisa
+        self._profile_changed = False
+        self._profile_check_id = None
+        if self.user_manager:
+            self.user_manager.subscribe_profile(self._on_profile_changed)
+            self._check_profile_changed()
+
+    def _on_profile_changed(self, email, profile):
+        if email == self.current_user:
+            self._profile_changed = True
+
+    def _check_profile_changed(self):
+        if self._profile_changed:
+            self._profile_changed = False
+            self._update_status()
+        self._profile_check_id = self.after(500, self._check_profile_changed)
+
+    def destroy(self):
+        if self.user_manager:
+            self.user_manager.unsubscribe_profile(self._on_profile_changed)
+        if self._profile_check_id is not None:
+            self.after_cancel(self._profile_check_id)
+            self._profile_check_id = None
+        super().destroy()
+
     def _create_widgets(self):
         # Frame principal con dos columnas
         main_container = tk.Frame(self, bg=COLORS["background"])